@@ -0,0 +1,259 @@
+# core/ansi_parser.py
+import re
+from PyQt6.QtGui import QTextCharFormat, QColor, QFont
+
+# Operations produced by the parser. TEXT is (TEXT, text, format); the rest are (kind, count).
+TEXT = 0
+CARRIAGE_RETURN = 1
+BACKSPACE = 2
+CURSOR_UP = 3
+CURSOR_DOWN = 4
+CURSOR_FORWARD = 5
+CURSOR_BACK = 6
+CURSOR_COLUMN = 7
+ERASE_LINE = 8
+ERASE_DISPLAY = 9
+
+# Final byte of a CSI sequence -> operation
+CSI_OPERATIONS = {
+    "A": CURSOR_UP, "B": CURSOR_DOWN, "C": CURSOR_FORWARD, "D": CURSOR_BACK,
+    "G": CURSOR_COLUMN, "K": ERASE_LINE, "J": ERASE_DISPLAY,
+}
+# Count used when an operation's parameter is left out: erases default to 0, moves to 1
+CSI_DEFAULTS = {ERASE_LINE: 0, ERASE_DISPLAY: 0}
+
+# Style flags
+BOLD, DIM, ITALIC, UNDERLINE, INVERSE, STRIKE = 1, 2, 4, 8, 16, 32
+SGR_FLAGS = {1: BOLD, 2: DIM, 3: ITALIC, 4: UNDERLINE, 7: INVERSE, 9: STRIKE}
+SGR_CLEAR = {22: BOLD | DIM, 23: ITALIC, 24: UNDERLINE, 27: INVERSE, 29: STRIKE}
+# Colors are None for the default, 0-255 for the palette and TRUECOLOR | 0xRRGGBB
+TRUECOLOR = 1 << 24
+# (foreground, background, flags)
+PLAIN = (None, None, 0)
+
+# The 16 basic colors, matching the terminal's theme
+BASIC_COLORS = (
+    "#21222c", "#ff5555", "#50fa7b", "#f1fa8c", "#bd93f9", "#ff79c6", "#8be9fd", "#f8f8f2",
+    "#6272a4", "#ff6e6e", "#69ff94", "#ffffa5", "#d6acff", "#ff92df", "#a4ffff", "#ffffff",
+)
+DEFAULT_BACKGROUND = "#282a36"
+# Formats are cached by style; truecolor gradients could make unlimited styles, so the cache is reset past this
+MAX_CACHED_FORMATS = 4096
+# An unfinished escape sequence longer than this is dropped instead of waiting for its end
+MAX_SEQUENCE_LENGTH = 4096
+
+# A whole escape sequence or control character
+TOKEN = re.compile(
+    r"\x1b\[([0-?]*)[ -/]*([@-~])"           # CSI: parameters, final byte
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"     # OSC, e.g. a window title
+    r"|\x1b[ -/]*[0-~]"                      # other escapes, e.g. character sets
+    r"|[\r\b]|[\x00-\x07\x0b\x0c\x0e-\x1a\x1c-\x1f\x7f]+"
+)
+# The start of an escape sequence cut off at the end of a read
+PARTIAL = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?|[ -/]*)\Z")
+
+_colors = []
+_formats = {}
+
+
+def palette_color(index):
+    """Return the QColor of a 256-color palette index"""
+    if not _colors:
+        for name in BASIC_COLORS:
+            _colors.append(QColor(name))
+        levels = (0, 95, 135, 175, 215, 255)
+        for i in range(216):
+            _colors.append(QColor(levels[i // 36], levels[i // 6 % 6], levels[i % 6]))
+        for i in range(24):
+            _colors.append(QColor(8 + i * 10, 8 + i * 10, 8 + i * 10))
+    return _colors[index]
+
+
+def to_qcolor(color, default):
+    if color is None:
+        return default
+    if color >= TRUECOLOR:
+        return QColor((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+    return palette_color(color)
+
+
+def format_for(style, default_foreground):
+    """Return the cached QTextCharFormat for a style; the caller must not change it"""
+    key = (style, default_foreground.rgba())
+    text_format = _formats.get(key)
+    if text_format is not None:
+        return text_format
+    if len(_formats) >= MAX_CACHED_FORMATS:
+        _formats.clear()
+    foreground, background, flags = style
+    fg = to_qcolor(foreground, default_foreground)
+    bg = to_qcolor(background, None)
+    if flags & INVERSE:
+        fg, bg = bg or QColor(DEFAULT_BACKGROUND), fg
+    if flags & DIM:
+        fg = QColor(fg)
+        fg.setAlpha(160)
+    text_format = QTextCharFormat()
+    text_format.setForeground(fg)
+    if bg is not None:
+        text_format.setBackground(bg)
+    if flags & BOLD:
+        text_format.setFontWeight(QFont.Weight.Bold)
+    if flags & ITALIC:
+        text_format.setFontItalic(True)
+    if flags & UNDERLINE:
+        text_format.setFontUnderline(True)
+    if flags & STRIKE:
+        text_format.setFontStrikeOut(True)
+    _formats[key] = text_format
+    return text_format
+
+
+class AnsiParser:
+    """Turns a stream of terminal output into runs of styled text and cursor operations.
+
+    Output can be fed in pieces of any size: an escape sequence or a CRLF
+    cut off at the end of a piece is kept until the next one, and the
+    current style carries over. Text in the same style comes out as one
+    run, with newlines and tabs left in it, so it can be inserted in one
+    go. Understands SGR styles (bold, dim, italic, underline, inverse,
+    strike-through; basic, bright, 256 and truecolor colors), carriage
+    return, backspace, cursor movement within the output and erasing in
+    the line or display. Other sequences, such as window titles, are
+    dropped.
+    """
+
+    def __init__(self, default_foreground):
+        self.default_foreground = default_foreground
+        # (style, SGR parameters) -> (style, format): logs repeat the same few changes
+        self.transitions = {}
+        self.reset()
+
+    def reset(self):
+        self.style = PLAIN
+        self.format = format_for(PLAIN, self.default_foreground)
+        self.tail = ""
+
+    def feed(self, text, final=False):
+        """Parse the next piece of output and return its operations"""
+        if self.tail:
+            text = self.tail + text
+            self.tail = ""
+        if not final:
+            cut = text.rfind("\x1b", len(text) - MAX_SEQUENCE_LENGTH)
+            if cut != -1 and PARTIAL.match(text, cut):
+                text, self.tail = text[:cut], text[cut:]
+            elif text.endswith("\r"):
+                # Maybe the first half of a CRLF
+                text, self.tail = text[:-1], "\r"
+        if "\r\n" in text:
+            text = text.replace("\r\n", "\n")
+        operations = []
+        position = 0
+        for match in TOKEN.finditer(text):
+            start = match.start()
+            if start > position:
+                self.add_text(operations, text[position:start])
+            position = match.end()
+            final_byte = match.group(2)
+            if final_byte is not None:
+                self.control_sequence(operations, match.group(1), final_byte)
+                continue
+            token = match.group()
+            if token == "\r":
+                operations.append((CARRIAGE_RETURN, 1))
+            elif token == "\b":
+                operations.append((BACKSPACE, 1))
+        if position < len(text):
+            self.add_text(operations, text[position:])
+        return operations
+
+    def add_text(self, operations, text):
+        if "\x1b" in text:
+            # Left over from a sequence that was not well-formed
+            text = text.replace("\x1b", "")
+            if not text:
+                return
+        if operations and operations[-1][0] == TEXT and operations[-1][2] is self.format:
+            operations[-1] = (TEXT, operations[-1][1] + text, self.format)
+        else:
+            operations.append((TEXT, text, self.format))
+
+    def control_sequence(self, operations, parameters, final_byte):
+        if final_byte == "m":
+            key = (self.style, parameters)
+            transition = self.transitions.get(key)
+            if transition is None:
+                self.select_graphic_rendition(parameters)
+                if len(self.transitions) >= MAX_CACHED_FORMATS:
+                    self.transitions.clear()
+                self.transitions[key] = (self.style, self.format)
+            else:
+                self.style, self.format = transition
+            return
+        operation = CSI_OPERATIONS.get(final_byte)
+        if operation is None or parameters[:1] in ("?", ">", "<", "="):
+            # Private modes, scroll regions, absolute positions: no equivalent in a scrolling log
+            return
+        count = parameters.split(";")[0]
+        count = int(count) if count.isdigit() else CSI_DEFAULTS.get(operation, 1)
+        if operation not in CSI_DEFAULTS:
+            count = max(count, 1)
+        operations.append((operation, count))
+
+    def select_graphic_rendition(self, parameters):
+        foreground, background, flags = self.style
+        parameters = parameters.split(";") if parameters else ["0"]
+        i = 0
+        while i < len(parameters):
+            parameter = parameters[i]
+            i += 1
+            # Extended colors come as 38;5;n and 38;2;r;g;b or with sub-parameters, 38:2::r:g:b
+            code, _, extended = parameter.partition(":")
+            code = int(code) if code.isdigit() else 0
+            if code == 0:
+                foreground, background, flags = PLAIN
+            elif 30 <= code <= 37:
+                foreground = code - 30
+            elif 90 <= code <= 97:
+                foreground = code - 82
+            elif 40 <= code <= 47:
+                background = code - 40
+            elif 100 <= code <= 107:
+                background = code - 92
+            elif code == 39:
+                foreground = None
+            elif code == 49:
+                background = None
+            elif code in (38, 48):
+                if extended:
+                    values = extended.split(":")
+                else:
+                    mode = parameters[i] if i < len(parameters) else ""
+                    count = {"5": 2, "2": 4}.get(mode, 1)
+                    values = parameters[i:i + count]
+                    i += count
+                color = extended_color([int(value) if value.isdigit() else 0 for value in values])
+                if code == 38:
+                    foreground = color
+                else:
+                    background = color
+            elif code in SGR_FLAGS:
+                flags |= SGR_FLAGS[code]
+            elif code in SGR_CLEAR:
+                flags &= ~SGR_CLEAR[code]
+        self.style = (foreground, background, flags)
+        self.format = format_for(self.style, self.default_foreground)
+
+
+def extended_color(values):
+    """Return the color of 5;n or 2;r;g;b, or None if malformed"""
+    if len(values) >= 2 and values[0] == 5:
+        return values[1] & 0xFF
+    if values and values[0] == 2:
+        # A color space id may come before the components
+        components = values[2:5] if len(values) >= 5 else values[1:4]
+        if len(components) == 3:
+            r, g, b = (component & 0xFF for component in components)
+            return TRUECOLOR | r << 16 | g << 8 | b
+    return None
@@ -0,0 +1,73 @@
+# core/auto_save.py
+import time
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer
+from core.file_loader import is_loading
+
+
+class AutoSaveEngine(QObject):
+    """Saves modified documents once the user has stopped typing in them.
+
+    Each edit only records a deadline for its editor; a single shared timer
+    fires at the earliest deadline and hands every document that is due to
+    the save service as one background batch. The save service skips files
+    whose content is unchanged since its last write.
+    """
+
+    DEBOUNCE_MS = 1000
+
+    def __init__(self, save_service, path_for, parent=None):
+        super().__init__(parent)
+        self.save_service = save_service
+        # Returns the file path of an editor's tab, or None if it has none
+        self.path_for = path_for
+        self.enabled = False
+        self.deadlines = {}
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def watch(self, editor):
+        editor.document().contentsChanged.connect(lambda: self.touch(editor))
+
+    def forget(self, editor):
+        self.deadlines.pop(editor, None)
+
+    def set_enabled(self, enabled, editors=()):
+        self.enabled = enabled
+        self.deadlines.clear()
+        self.timer.stop()
+        if enabled:
+            # Pick up documents that were already modified
+            for editor in editors:
+                if editor.document().isModified():
+                    self.touch(editor)
+
+    def touch(self, editor):
+        if not self.enabled:
+            return
+        self.deadlines[editor] = time.monotonic() + self.DEBOUNCE_MS / 1000
+        if not self.timer.isActive():
+            self.timer.start(self.DEBOUNCE_MS)
+
+    def on_timeout(self):
+        now = time.monotonic()
+        due = [editor for editor, deadline in self.deadlines.items() if deadline <= now]
+        for editor in due:
+            del self.deadlines[editor]
+        self.flush(due)
+        if self.deadlines:
+            delay = min(self.deadlines.values()) - now
+            self.timer.start(max(0, int(delay * 1000) + 1))
+
+    def flush(self, editors):
+        targets = []
+        for editor in editors:
+            if sip.isdeleted(editor) or not editor.document().isModified() or is_loading(editor):
+                continue
+            path = self.path_for(editor)
+            if path:
+                targets.append((editor, path))
+        if targets:
+            self.save_service.save_many(targets, auto=True)
@@ -0,0 +1,263 @@
+# core/code_editor/bracket_index.py
+from bisect import bisect_right
+from itertools import accumulate
+from PyQt6.QtGui import QTextBlockUserData
+
+BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}', ')': '(', ']': '[', '}': '{'}
+OPENING = '([{'
+# Summary of a block without brackets of a type: (net depth change, lowest forward, lowest backward)
+NO_BRACKETS = (0, 0, 0)
+
+
+class BracketData(QTextBlockUserData):
+    """Brackets of one block outside strings and comments, set by the highlighter.
+
+    For each bracket type the block also keeps a summary: the net change in
+    nesting depth, the lowest depth reached scanning forward from the start,
+    and the lowest depth reached scanning backward from the end. A search
+    for a matching bracket uses these to skip whole blocks.
+    """
+
+    def __init__(self, brackets, revision):
+        super().__init__()
+        self.brackets = brackets
+        self.revision = revision
+        self._summaries = None
+
+    @property
+    def summaries(self):
+        # Built on first use; most blocks are never searched through
+        if self._summaries is None:
+            self._summaries = summarize(self.brackets)
+        return self._summaries
+
+
+def summarize(brackets):
+    summaries = {}
+    for opener in OPENING:
+        closer = BRACKET_PAIRS[opener]
+        if not any(char == opener or char == closer for _, char in brackets):
+            continue
+        depth = lowest = 0
+        for _, char in brackets:
+            if char == opener:
+                depth += 1
+            elif char == closer:
+                depth -= 1
+                lowest = min(lowest, depth)
+        # Scanning backward, closers open and openers close
+        back = back_lowest = 0
+        for _, char in reversed(brackets):
+            if char == closer:
+                back += 1
+            elif char == opener:
+                back -= 1
+                back_lowest = min(back_lowest, back)
+        summaries[opener] = (depth, lowest, back_lowest)
+    return summaries
+
+
+def block_brackets(block):
+    """Return the block's indexed brackets, or all bracket characters if it has no valid index"""
+    data = block.userData()
+    if isinstance(data, BracketData) and data.revision == block.revision():
+        return data.brackets, data.summaries
+    # Not highlighted yet (or highlighting is off): fall back to the raw text
+    brackets = [(position, char) for position, char in enumerate(block.text()) if char in BRACKET_PAIRS]
+    return brackets, None
+
+
+def bracket_at(block, position):
+    """Return the indexed bracket character at a position in the block, if any"""
+    brackets, _ = block_brackets(block)
+    for offset, char in brackets:
+        if offset == position:
+            return char
+    return None
+
+
+def find_matching_bracket(block, position, tree):
+    """Return (block, position) of the bracket matching the one at position, or None"""
+    char = bracket_at(block, position)
+    if char is None:
+        return None
+    forward = char in OPENING
+    opener = char if forward else BRACKET_PAIRS[char]
+
+    brackets, _ = block_brackets(block)
+    if forward:
+        candidates = [(offset, c) for offset, c in brackets if offset > position]
+    else:
+        candidates = [(offset, c) for offset, c in reversed(brackets) if offset < position]
+    offset, depth = scan(candidates, char, 0)
+    if offset is not None:
+        return block, offset
+    # The tree finds the block where the depth first drops below zero without visiting the others
+    found = tree.find_block(block.blockNumber(), opener, forward, depth)
+    if found is None:
+        return None
+    number, depth = found
+    block = block.document().findBlockByNumber(number)
+    brackets, _ = block_brackets(block)
+    offset, _ = scan(brackets if forward else reversed(brackets), char, depth)
+    return (block, offset) if offset is not None else None
+
+
+def scan(candidates, char, depth):
+    """Return (offset of the bracket closing depth, None) or (None, depth reached)"""
+    target = BRACKET_PAIRS[char]
+    for offset, c in candidates:
+        if c == char:
+            depth += 1
+        elif c == target:
+            if depth == 0:
+                return offset, depth
+            depth -= 1
+    return None, depth
+
+
+def merge(first, second):
+    """Summary of two runs of blocks, one after the other"""
+    net, lowest, back_lowest = first
+    second_net, second_lowest, second_back_lowest = second
+    return (net + second_net, min(lowest, net + second_lowest),
+            min(second_back_lowest, back_lowest - second_net))
+
+
+def block_summaries(block):
+    brackets, summaries = block_brackets(block)
+    return summaries if summaries is not None else summarize(brackets)
+
+
+class BracketTree:
+    """Bracket summaries of a document's blocks, grouped into runs of about RUN_SIZE blocks.
+
+    Each run keeps the merged summary of its blocks per bracket type, so a
+    search for a matching bracket skips whole runs that cannot hold the
+    match and only looks at single blocks in the run where it starts and
+    the run where the depth drops below zero: about RUN_SIZE + blocks /
+    RUN_SIZE steps, however far away the match is. Edits replace only the
+    summaries of the blocks they touch and of their run.
+
+    Block summaries are filled in when a search first needs them, and
+    dropped when the block is edited or highlighted again. Must be created
+    before the highlighter, so it has caught up with a contentsChange
+    before the highlighter reports any block by number.
+    """
+
+    RUN_SIZE = 256
+
+    def __init__(self, document):
+        self.document = document
+        self.reset()
+        document.contentsChange.connect(self.on_contents_change)
+
+    def reset(self):
+        self.count = self.document.blockCount()
+        self.runs = [[None] * min(self.RUN_SIZE, self.count - start)
+                     for start in range(0, self.count, self.RUN_SIZE)] or [[]]
+        self.run_summaries = [{} for _ in self.runs]
+        self.renumber()
+
+    def renumber(self):
+        # First block number of each run
+        self.starts = list(accumulate((len(run) for run in self.runs[:-1]), initial=0))
+
+    def locate(self, number):
+        """Return (run index, offset in the run) of a block number"""
+        index = bisect_right(self.starts, number) - 1
+        return index, number - self.starts[index]
+
+    def on_contents_change(self, position, removed, added):
+        document = self.document
+        count = document.blockCount()
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        first_number = first.blockNumber() if first.isValid() else count - 1
+        last_number = last.blockNumber() if last.isValid() else count - 1
+        changed = last_number - first_number + 1
+        # The same blocks before the edit, counted from the old block count
+        replaced = changed - (count - self.count)
+        if replaced < 0 or first_number + replaced > self.count:
+            self.reset()
+            return
+        self.replace(first_number, replaced, changed)
+        self.count = count
+
+    def replace(self, number, old, new):
+        """Replace old block summaries from number on with new unknown ones"""
+        first_run, offset = self.locate(number)
+        last_run = first_run
+        leaves = list(self.runs[first_run])
+        # Take in following runs until the replaced blocks are covered and small runs are merged
+        while (offset + old > len(leaves) or len(leaves) - old + new < self.RUN_SIZE // 2) \
+                and last_run + 1 < len(self.runs):
+            last_run += 1
+            leaves.extend(self.runs[last_run])
+        leaves[offset:offset + old] = [None] * new
+        size = self.RUN_SIZE
+        pieces = [leaves[start:start + size] for start in range(0, len(leaves), size)] or [[]]
+        self.runs[first_run:last_run + 1] = pieces
+        self.run_summaries[first_run:last_run + 1] = [{} for _ in pieces]
+        self.renumber()
+
+    def invalidate(self, number):
+        """Drop a block's summary, e.g. because it was highlighted again"""
+        if number >= self.count:
+            return
+        index, offset = self.locate(number)
+        self.runs[index][offset] = None
+        self.run_summaries[index] = {}
+
+    def leaves(self, index):
+        """The run's block summaries, filling in the unknown ones"""
+        run = self.runs[index]
+        if None in run:
+            block = self.document.findBlockByNumber(self.starts[index])
+            for offset in range(len(run)):
+                if run[offset] is None:
+                    run[offset] = block_summaries(block)
+                block = block.next()
+        return run
+
+    def run_summary(self, index, opener):
+        summaries = self.run_summaries[index]
+        summary = summaries.get(opener)
+        if summary is None:
+            summary = NO_BRACKETS
+            for leaf in self.leaves(index):
+                part = leaf.get(opener)
+                if part is not None:
+                    summary = merge(summary, part)
+            summaries[opener] = summary
+        return summary
+
+    def find_block(self, number, opener, forward, depth):
+        """Return (block number, depth on entering it) of the first block past number
+        where the depth falls below zero, or None"""
+        if self.count != self.document.blockCount():
+            self.reset()
+        step = 1 if forward else -1
+        index, offset = self.locate(number)
+        offset += step
+        while 0 <= index < len(self.runs):
+            if offset is None:
+                # A whole run: skip it if the depth stays at zero or above throughout
+                net, lowest, back_lowest = self.run_summary(index, opener)
+                if depth + (lowest if forward else back_lowest) >= 0:
+                    depth += net if forward else -net
+                    index += step
+                    continue
+                offset = 0 if forward else len(self.runs[index]) - 1
+            leaves = self.leaves(index)
+            while 0 <= offset < len(leaves):
+                part = leaves[offset].get(opener)
+                if part is not None:
+                    net, lowest, back_lowest = part
+                    if depth + (lowest if forward else back_lowest) < 0:
+                        return self.starts[index] + offset, depth
+                    depth += net if forward else -net
+                offset += step
+            index += step
+            offset = None
+        return None
@@ -4,12 +4,17 @@ from core.code_editor.completion import CodeCompleter
 import re
 from PyQt6.QtWidgets import QPlainTextEdit, QTextEdit
 from PyQt6.QtGui import (
-    QFont, QColor, QTextCursor, QTextFormat, QPainter,
+    QFont, QColor, QTextCursor, QTextFormat,
     QTextCharFormat, QKeySequence, QPalette
 )
-from PyQt6.QtCore import QRect, Qt, pyqtSignal
+from PyQt6.QtCore import QEvent, QRect, pyqtSignal
 from core.code_editor.syntax_highlighter import Highlighter
+from core.code_editor.highlight_scheduler import HighlightScheduler
+from core.code_editor.lexers import language_for_path
+from core.code_editor.bracket_index import BracketTree, bracket_at, find_matching_bracket
+from core.code_editor.extra_selections import ExtraSelectionManager
 from core.code_editor.line_number_area import LineNumberArea
+from core.code_editor.large_file_banner import LargeFileBanner
 from core.code_editor.settings_manager import SettingsManager
 
 
@@ -22,18 +27,31 @@ class CodeEditor(QPlainTextEdit):
         self.settings_manager = SettingsManager(settings_path)
         self.settings = self.settings_manager.settings
         self.completer = CodeCompleter(self)
+        self.completer.setWidget(self)
 
         # Initialize editor features
         self.bracket_matching = True
+        self.auto_close_brackets = True
         self.auto_indent = True
+        self.large_file_mode = False
+        # Written back on save; set by the file loader
+        self.encoding = "utf-8"
+        self.line_ending = "\n"
         self.bracket_pairs = {
             '(': ')', '[': ']', '{': '}', '"': '"', "'": "'"
         }
 
+        self.extra_selections = ExtraSelectionManager(self)
         self.setup_editor()
-        self.highlighter = Highlighter(self.document(), self.settings.get("syntax"))
+        self.extra_selections.set_builder("current_line", self.current_line_selections)
+        self.extra_selections.set_builder("bracket", self.bracket_selections)
+        self.bracket_tree = BracketTree(self.document())
+        self.highlight_scheduler = HighlightScheduler(self)
+        self.highlighter = Highlighter(self.document(), self.settings.get("syntax"), self.highlight_scheduler,
+                                       bracket_tree=self.bracket_tree)
 
         # Connect signals
+        self.settings_manager.watcher.fileChanged.connect(self.reload_settings)
         self.textChanged.connect(self.on_text_changed)
         self.cursorPositionChanged.connect(self.on_cursor_position_changed)
 
@@ -51,9 +69,9 @@ class CodeEditor(QPlainTextEdit):
 
         # Line number area
         self.lineNumberArea = LineNumberArea(self)
-        self.blockCountChanged.connect(self.update_line_number_area_width)
+        self.large_file_banner = LargeFileBanner(self)
+        self.blockCountChanged.connect(self.on_block_count_changed)
         self.updateRequest.connect(self.update_line_number_area)
-        self.cursorPositionChanged.connect(self.highlight_current_line)
         self.update_line_number_area_width(0)
 
         # Apply colors
@@ -69,10 +87,14 @@ class CodeEditor(QPlainTextEdit):
         palette.setColor(QPalette.ColorRole.Text, text_color)
         palette.setColor(QPalette.ColorRole.Highlight, selection_color)
         self.setPalette(palette)
+        self.lineNumberArea.update_style()
 
     def on_text_changed(self):
         self.contentChanged.emit()
+        # Edits that keep the cursor in place can still move a bracket's match
         if self.bracket_matching:
+            self.extra_selections.invalidate("bracket")
+        if self.auto_close_brackets:
             self.handle_bracket_insertion()
 
     def on_cursor_position_changed(self):
@@ -80,118 +102,84 @@ class CodeEditor(QPlainTextEdit):
         line = cursor.blockNumber() + 1
         column = cursor.positionInBlock() + 1
         self.cursorPositionUpdated.emit(line, column)
-        
-        self.highlight_current_line()
-        if self.bracket_matching:
-            self.highlight_matching_bracket()
 
-    def highlight_matching_bracket(self):
-        if not self.bracket_matching:
+        # Both layers are rebuilt and pushed together on the next loop turn
+        self.extra_selections.invalidate("current_line", "bracket")
+
+    def set_large_file_mode(self, enabled):
+        """Turn the per-keystroke features off for very large files, or back on"""
+        self.large_file_mode = enabled
+        self.bracket_matching = not enabled
+        self.auto_close_brackets = not enabled
+        if enabled:
+            self.highlighter.setDocument(None)
+            self.completer.setWidget(None)
+        else:
+            # Rehighlights through the scheduler, visible blocks first
+            self.highlighter.setDocument(self.document())
+            self.completer.setWidget(self)
+        self.large_file_banner.set_large_file_mode(enabled)
+        self.extra_selections.invalidate("bracket")
+        self.update_line_number_area_width(0)
+
+    def set_load_progress(self, loaded, total):
+        """Show file loading progress in the banner while a file is loading"""
+        hidden = self.large_file_banner.isHidden()
+        self.large_file_banner.set_progress(loaded, total)
+        if self.large_file_banner.isHidden() != hidden:
+            self.update_line_number_area_width(0)
+
+    def go_to_line(self, line, column=0):
+        """Move the cursor to a 0-based line and column and scroll it into view"""
+        block = self.document().findBlockByNumber(line)
+        if not block.isValid():
             return
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + min(column, block.length() - 1))
+        self.setTextCursor(cursor)
+        self.centerCursor()
+
+    def set_language_for_path(self, path):
+        """Pick the highlighting language from a file name's extension"""
+        self.highlighter.set_language(language_for_path(path))
+
+    def bracket_selections(self):
+        if not self.bracket_matching:
+            return []
 
-        # Clear previous bracket highlights while keeping current line highlight
-        current_selections = [sel for sel in self.extraSelections() 
-                            if not sel.format.background().color().name() == self.settings.get("bracket_highlight_bg", "#3E4451")]
-        
         cursor = self.textCursor()
-        block_text = cursor.block().text()
+        block = cursor.block()
         pos_in_block = cursor.positionInBlock()
 
-        # Check for brackets before and at cursor position
+        # Check for brackets before and at cursor position. Brackets inside
+        # strings and comments are not in the block's bracket index.
         check_positions = [pos_in_block - 1, pos_in_block] if pos_in_block > 0 else [pos_in_block]
-        
+
         for pos in check_positions:
-            if pos < 0 or pos >= len(block_text):
-                continue
-
-            char = block_text[pos]
-            if char in '([{':
-                self.highlight_bracket_pair(cursor.block(), pos, 1)
-                break
-            elif char in ')]}':
-                self.highlight_bracket_pair(cursor.block(), pos, -1)
-                break
-
-    def highlight_bracket_pair(self, block, pos, direction):
-        pairs = {'(': ')', '[': ']', '{': '}', ')': '(', ']': '[', '}': '{'}
-        stack = []
-        
-        char = block.text()[pos]
-        target = pairs.get(char)
-        if not target:
-            return
+            if bracket_at(block, pos) is not None:
+                return self.bracket_pair_selections(block, pos)
+        return []
 
+    def bracket_pair_selections(self, block, pos):
         # Create format for highlighting
         format = QTextCharFormat()
         format.setBackground(QColor(self.settings.get("bracket_highlight_bg", "#3E4451")))
-        
-        # Highlight the opening/closing bracket
-        cursor = self.textCursor()
-        cursor.setPosition(block.position() + pos)
-        cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
-        
-        selection = QTextEdit.ExtraSelection()
-        selection.format = format
-        selection.cursor = cursor
-        
-        current_selections = [sel for sel in self.extraSelections() 
-                            if sel.format.background().color().name() != self.settings.get("bracket_highlight_bg", "#3E4451")]
-        current_selections.append(selection)
-
-        # Find and highlight matching bracket
-        if direction > 0:  # Search forward
-            current_block = block
-            current_pos = pos + 1
-            while current_block.isValid():
-                text = current_block.text()
-                while current_pos < len(text):
-                    if text[current_pos] == char:
-                        stack.append(current_pos)
-                    elif text[current_pos] == target:
-                        if not stack:
-                            # Found matching bracket
-                            cursor = self.textCursor()
-                            cursor.setPosition(current_block.position() + current_pos)
-                            cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
-                            selection = QTextEdit.ExtraSelection()
-                            selection.format = format
-                            selection.cursor = cursor
-                            current_selections.append(selection)
-                            self.setExtraSelections(current_selections)
-                            return
-                        stack.pop()
-                    current_pos += 1
-                current_block = current_block.next()
-                current_pos = 0
-        else:  # Search backward
-            current_block = block
-            current_pos = pos - 1
-            while current_block.isValid():
-                text = current_block.text()
-                while current_pos >= 0:
-                    if text[current_pos] == char:
-                        stack.append(current_pos)
-                    elif text[current_pos] == target:
-                        if not stack:
-                            # Found matching bracket
-                            cursor = self.textCursor()
-                            cursor.setPosition(current_block.position() + current_pos)
-                            cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
-                            selection = QTextEdit.ExtraSelection()
-                            selection.format = format
-                            selection.cursor = cursor
-                            current_selections.append(selection)
-                            self.setExtraSelections(current_selections)
-                            return
-                        stack.pop()
-                    current_pos -= 1
-                current_block = current_block.previous()
-                if current_block is not None:
-                    current_pos = len(current_block.text()) - 1
-                else:
-                    break
-
-        self.setExtraSelections(current_selections)
+        selections = []
+
+        # Highlight the bracket and, if there is one, its match
+        positions = [(block, pos)]
+        match = find_matching_bracket(block, pos, self.bracket_tree)
+        if match is not None:
+            positions.append(match)
+        for bracket_block, bracket_pos in positions:
+            cursor = self.textCursor()
+            cursor.setPosition(bracket_block.position() + bracket_pos)
+            cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.KeepAnchor)
+            selection = QTextEdit.ExtraSelection()
+            selection.format = format
+            selection.cursor = cursor
+            selections.append(selection)
+        return selections
 
     def handle_bracket_insertion(self):
         cursor = self.textCursor()
@@ -208,53 +196,51 @@ class CodeEditor(QPlainTextEdit):
                 self.setTextCursor(cursor)
 
     def lineNumberAreaWidth(self) -> int:
-        digits = len(str(max(1, self.blockCount())))
-        num_width = 8 + self.fontMetrics().horizontalAdvance('9') * digits
-        return num_width + 20
+        return self.lineNumberArea.gutter_width
+
+    def bannerHeight(self) -> int:
+        if self.large_file_banner.isHidden():
+            return 0
+        return self.large_file_banner.sizeHint().height()
 
     def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
+        self.setViewportMargins(self.lineNumberAreaWidth(), self.bannerHeight(), 0, 0)
+        self.update_margin_widgets()
+
+    def on_block_count_changed(self, count):
+        # The gutter only gets wider or narrower when the digit count changes
+        if self.lineNumberArea.update_width(count):
+            self.update_line_number_area_width(0)
 
     def update_line_number_area(self, rect, dy):
         if dy:
             self.lineNumberArea.scroll(0, dy)
         else:
             self.lineNumberArea.update(0, rect.y(), self.lineNumberArea.width(), rect.height())
-        if rect.contains(self.viewport().rect()):
-            self.update_line_number_area_width(0)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        self.update_margin_widgets()
+        self.highlight_scheduler.on_viewport_changed()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # The gutter caches its font metrics; setup sets the font before creating it
+        if event.type() == QEvent.Type.FontChange and hasattr(self, "lineNumberArea"):
+            self.lineNumberArea.update_style()
+            self.update_line_number_area_width(0)
+
+    def update_margin_widgets(self):
         cr = self.contentsRect()
+        banner_height = self.bannerHeight()
+        self.large_file_banner.setGeometry(
+            QRect(cr.left(), cr.top(), cr.width(), banner_height)
+        )
         self.lineNumberArea.setGeometry(
-            QRect(cr.left(), cr.top(), self.lineNumberAreaWidth(), cr.height())
+            QRect(cr.left(), cr.top() + banner_height, self.lineNumberAreaWidth(), cr.height() - banner_height)
         )
 
-    def lineNumberAreaPaintEvent(self, event):
-        painter = QPainter(self.lineNumberArea)
-        painter.fillRect(event.rect(), QColor(self.settings.get("line_number_bg", "#21252B")))
-
-        block = self.firstVisibleBlock()
-        blockNumber = block.blockNumber()
-        top = int(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
-        bottom = top + int(self.blockBoundingRect(block).height())
-
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(blockNumber + 1)
-                painter.setPen(QColor(self.settings.get("line_number_color", "#636D83")))
-                painter.drawText(
-                    0, top, self.lineNumberArea.width()-4,
-                    self.fontMetrics().height(),
-                    Qt.AlignmentFlag.AlignRight,
-                    number
-                )
-            block = block.next()
-            top = bottom
-            bottom = top + int(self.blockBoundingRect(block).height())
-            blockNumber += 1
-
-    def highlight_current_line(self):
+    def current_line_selections(self):
         extraSelections = []
         if not self.isReadOnly():
             selection = QTextEdit.ExtraSelection()
@@ -265,7 +251,7 @@ class CodeEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extraSelections.append(selection)
-        self.setExtraSelections(extraSelections)
+        return extraSelections
 
     def reload_settings(self, path=None):
         if path:
@@ -282,12 +268,12 @@ class CodeEditor(QPlainTextEdit):
         tab_width = self.fontMetrics().horizontalAdvance(' ') * self.settings.get("tab_width", 4)
         self.setTabStopDistance(tab_width)
         
-        if hasattr(self, 'highlighter'):
-            self.highlighter.deleteLater()
-        self.highlighter = Highlighter(self.document(), self.settings.get("syntax"))
+        # Only rehighlights when the syntax colors actually changed
+        self.highlighter.apply_syntax_settings(self.settings.get("syntax"))
         
         self.apply_color_scheme()
         self.update_line_number_area_width(0)
+        self.extra_selections.invalidate()
         self.viewport().update()
 
     def load_settings(self):
@@ -0,0 +1,65 @@
+# core/code_editor/extra_selections.py
+from PyQt6.QtCore import QObject, QTimer
+
+# Bottom to top: later layers paint over earlier ones
+LAYERS = ("current_line", "occurrences", "search", "bracket", "diagnostics")
+
+
+class ExtraSelectionManager(QObject):
+    """Merges the editor's extra selections from named layers.
+
+    A layer either has a builder, called to recompute its selections after
+    `invalidate`, or is filled directly with `set_layer`. Changes only mark
+    layers dirty; the merged list is pushed with a single
+    `setExtraSelections` on the next event-loop turn, so a cursor move costs
+    one relayout however many layers changed.
+    """
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.layers = {name: [] for name in LAYERS}
+        self.builders = {}
+        self.dirty = set()
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def set_builder(self, name, builder):
+        """Compute the layer's selections with builder() whenever it is invalidated"""
+        self.builders[name] = builder
+        self.invalidate(name)
+
+    def invalidate(self, *names):
+        """Rebuild the given layers, or all layers with a builder, on the next flush"""
+        self.dirty.update(names or self.builders)
+        self.flush_timer.start()
+
+    def set_layer(self, name, selections):
+        self.layers[name] = list(selections)
+        self.dirty.add(name)
+        self.flush_timer.start()
+
+    def clear_layer(self, name):
+        if self.layers[name]:
+            self.set_layer(name, [])
+
+    def layer(self, name):
+        return self.layers[name]
+
+    def flush(self):
+        """Rebuild the dirty layers and push the merged selections"""
+        self.flush_timer.stop()
+        if not self.dirty:
+            return
+        for name in self.dirty:
+            builder = self.builders.get(name)
+            if builder is not None:
+                self.layers[name] = builder()
+        self.dirty.clear()
+        merged = []
+        for name in LAYERS:
+            merged.extend(self.layers[name])
+        self.editor.setExtraSelections(merged)
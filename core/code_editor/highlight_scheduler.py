@@ -0,0 +1,145 @@
+# core/code_editor/highlight_scheduler.py
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+
+class HighlightScheduler(QObject):
+    """Highlights the visible blocks first and the rest of the document when idle.
+
+    The highlighter asks `admit` before highlighting a block. Blocks outside
+    the viewport are deferred and tracked as a pending range of block numbers.
+    That range is highlighted in order, in short time slices, once the user
+    has stopped typing. A deferred block keeps its previous state, so an edit
+    cascade stops at the edge of the viewport. It resumes later from that
+    block-state boundary.
+    """
+
+    SLICE_SECONDS = 0.008
+    CHUNK_BLOCKS = 250
+    TYPING_PAUSE_MS = 300
+    MIN_VISIBLE_BLOCKS = 60
+    VIEWPORT_MARGIN = 10
+
+    def __init__(self, editor):
+        # Must be created before the highlighter so that contentsChange
+        # reaches the scheduler before the highlighter reformats any block.
+        super().__init__(editor)
+        self.editor = editor
+        self.document = editor.document()
+        self.highlighter = None
+        self.pending_from = None
+        self.pending_to = None
+        self.working = False
+        self.work_limit = 0
+        self.last_highlighted = -1
+        self.visible_first = 0
+        self.visible_last = self.MIN_VISIBLE_BLOCKS
+        self.highlighted_ahead = set()
+        self.block_count = self.document.blockCount()
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(0)
+        self.idle_timer.timeout.connect(self.run_slice)
+
+        self.typing_timer = QTimer(self)
+        self.typing_timer.setSingleShot(True)
+        self.typing_timer.setInterval(self.TYPING_PAUSE_MS)
+        self.typing_timer.timeout.connect(self.resume)
+
+        self.document.contentsChange.connect(self.on_contents_change)
+        editor.verticalScrollBar().valueChanged.connect(self.on_viewport_changed)
+
+    def admit(self, block):
+        """Return True if the highlighter should highlight this block now"""
+        number = block.blockNumber()
+        if self.working:
+            if number < self.work_limit:
+                self.last_highlighted = number
+                return True
+        elif self.visible_first <= number <= self.visible_last:
+            if self.pending_from is not None and number >= self.pending_from:
+                self.highlighted_ahead.add(number)
+            return True
+        self.defer(number)
+        return False
+
+    def defer(self, number):
+        """Mark a block as still to be highlighted in the background"""
+        if self.pending_from is None:
+            self.pending_from = self.pending_to = number
+        else:
+            self.pending_from = min(self.pending_from, number)
+            self.pending_to = max(self.pending_to, number)
+        if not self.working and not self.typing_timer.isActive():
+            self.idle_timer.start()
+
+    def on_contents_change(self, position, removed, added):
+        """Shift the pending range by the lines an edit inserted or removed"""
+        self.highlighted_ahead.clear()
+        count = self.document.blockCount()
+        delta = count - self.block_count
+        self.block_count = count
+        if delta and self.pending_from is not None:
+            edited = self.document.findBlock(position).blockNumber()
+            if self.pending_from > edited:
+                self.pending_from = max(edited, self.pending_from + delta)
+            if self.pending_to > edited:
+                self.pending_to = max(edited, self.pending_to + delta)
+        # Pause background work while the user is typing
+        self.idle_timer.stop()
+        self.typing_timer.start()
+
+    def resume(self):
+        if self.pending_from is not None:
+            self.idle_timer.start()
+
+    def on_viewport_changed(self, *_):
+        """Highlight blocks that scrolled into view before the background pass"""
+        self.update_visible_range()
+        if self.pending_from is None or self.highlighter is None:
+            return
+        last = min(self.visible_last, self.pending_to)
+        block = self.document.findBlockByNumber(max(self.visible_first, self.pending_from))
+        while block.isValid() and block.blockNumber() <= last:
+            if block.blockNumber() not in self.highlighted_ahead:
+                self.highlighter.rehighlightBlock(block)
+            block = block.next()
+
+    def update_visible_range(self):
+        first = self.editor.firstVisibleBlock().blockNumber()
+        line_height = max(1, self.editor.fontMetrics().height())
+        count = max(self.MIN_VISIBLE_BLOCKS, self.editor.viewport().height() // line_height)
+        self.visible_first = max(0, first - self.VIEWPORT_MARGIN)
+        self.visible_last = first + count + self.VIEWPORT_MARGIN
+
+    def run_slice(self):
+        """Highlight pending blocks in order until the time slice runs out"""
+        if self.pending_from is None or self.highlighter is None or self.typing_timer.isActive():
+            return
+        deadline = time.perf_counter() + self.SLICE_SECONDS
+        self.working = True
+        try:
+            while self.pending_from is not None and time.perf_counter() < deadline:
+                block = self.document.findBlockByNumber(self.pending_from)
+                if not block.isValid():
+                    self.pending_from = self.pending_to = None
+                    break
+                self.work_limit = self.pending_from + self.CHUNK_BLOCKS
+                self.last_highlighted = self.pending_from
+                # The highlighter cascades into following blocks while their
+                # state changes; carry on after the last block it reached.
+                self.highlighter.rehighlightBlock(block)
+                next_block = self.last_highlighted + 1
+                if next_block > self.pending_to:
+                    self.pending_from = self.pending_to = None
+                else:
+                    self.pending_from = next_block
+        finally:
+            self.working = False
+        if self.pending_from is not None:
+            self.idle_timer.start()
+
+    def is_idle(self):
+        """Return True once every block has been highlighted"""
+        return self.pending_from is None
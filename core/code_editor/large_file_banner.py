@@ -0,0 +1,42 @@
+# core/code_editor/large_file_banner.py
+from PyQt6.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton
+
+LARGE_FILE_MESSAGE = "Large file: highlighting and bracket matching are off."
+
+
+class LargeFileBanner(QFrame):
+    """Bar shown above the editor while a file loads, and above a large file
+    offering to turn editing features back on"""
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.codeEditor = editor
+        self.large_file_mode = False
+        self.setStyleSheet("QFrame { background-color: #3a3d41; } QLabel { font-size: 10pt; }")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 2, 8, 2)
+        self.label = QLabel(self)
+        self.enable_button = QPushButton("Enable Features", self)
+        self.enable_button.clicked.connect(lambda: self.codeEditor.set_large_file_mode(False))
+        layout.addWidget(self.label, 1)
+        layout.addWidget(self.enable_button)
+        self.set_message(LARGE_FILE_MESSAGE)
+        self.hide()
+
+    def set_message(self, message):
+        self.label.setText(message)
+
+    def set_large_file_mode(self, enabled):
+        self.large_file_mode = enabled
+        self.set_message(LARGE_FILE_MESSAGE)
+        self.enable_button.show()
+        self.setVisible(enabled)
+
+    def set_progress(self, loaded, total):
+        percent = loaded * 100 // total if total else 100
+        if percent < 100:
+            self.set_message(f"Loading file… {percent}%")
+            self.enable_button.hide()
+            self.show()
+        else:
+            self.set_large_file_mode(self.large_file_mode)
@@ -0,0 +1,337 @@
+# core/code_editor/lexers.py
+import os
+from collections import OrderedDict
+from core.code_editor.tokenizer import (
+    LITERAL_FORMATS, RuleTokenizer, utf16_offsets, utf16_runs, utf16_brackets
+)
+
+try:
+    from pygments.lexer import RegexLexer
+    from pygments.lexers import get_lexer_by_name
+    from pygments.token import (
+        Comment, String, Number, Keyword, Name, Operator, Punctuation,
+        Error, Whitespace, _TokenType
+    )
+except ImportError:  # Pygments is optional; every language then uses the rule lexer
+    RegexLexer = None
+
+# File extensions the explorer has icons for, and their lexer names
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".java": "java",
+    ".css": "css",
+    ".html": "html",
+}
+
+DEFAULT_LANGUAGE = "python"
+
+# Languages highlighted with the built-in rule set rather than Pygments
+RULE_LANGUAGES = {"python"}
+
+# Block comments Pygments only recognises when they close on the same line
+BLOCK_COMMENTS = {
+    "javascript": ("/*", "*/"),
+    "typescript": ("/*", "*/"),
+    "java": ("/*", "*/"),
+    "css": ("/*", "*/"),
+    "html": ("<!--", "-->"),
+}
+
+TOKEN_CACHE_SIZE = 20000
+
+BRACKET_CHARS = "()[]{}"
+
+
+def language_for_path(path):
+    """Return the highlighting language for a file name or path"""
+    if not path:
+        return DEFAULT_LANGUAGE
+    extension = os.path.splitext(path)[1].lower()
+    return LANGUAGE_BY_EXTENSION.get(extension, DEFAULT_LANGUAGE)
+
+
+def create_lexer(language):
+    """Return a new lexer for the language, falling back to the rule lexer"""
+    if language in RULE_LANGUAGES or RegexLexer is None:
+        return RuleLexer()
+    try:
+        lexer = get_lexer_by_name(language)
+    except Exception:
+        return RuleLexer()
+    if not isinstance(lexer, RegexLexer):
+        return RuleLexer()
+    return PygmentsLexer(lexer, BLOCK_COMMENTS.get(language))
+
+
+class Lexer:
+    """Lexes one line at a time, caching the result per line.
+
+    `lex` takes the line text and the state the previous line ended in (the
+    previous block's user state, -1 for none). It returns a tuple of
+    (start, length, format_name) runs, the line's end state and a tuple of
+    (offset, char) brackets outside strings and comments, with offsets in
+    UTF-16 code units. Results are cached by line content and incoming state, in an LRU
+    cache of at most `cache_size` lines shared by every editor using this
+    lexer.
+    """
+
+    def __init__(self, cache_size=TOKEN_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def lex(self, text, state):
+        key = (text, state)
+        cache = self.cache
+        result = cache.get(key)
+        if result is not None:
+            cache.move_to_end(key)
+            return result
+        result = self.lex_line(text, state)
+        if self.cache_size:
+            cache[key] = result
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return result
+
+    def lex_line(self, text, state):
+        raise NotImplementedError
+
+
+class RuleLexer(Lexer):
+    """The built-in rules plus triple-quoted strings spanning lines"""
+
+    def __init__(self, cache_size=TOKEN_CACHE_SIZE):
+        super().__init__(cache_size)
+        self.tokenizer = RuleTokenizer()
+
+    def lex_line(self, text, state):
+        runs, brackets = self.tokenizer.tokenize(text)
+        docstrings, state = multiline_string_runs(text, state)
+        if docstrings:
+            runs = runs + docstrings
+            if brackets:
+                brackets = [
+                    (position, char) for position, char in brackets
+                    if not any(start <= position < start + length for start, length, _ in docstrings)
+                ]
+        offsets = utf16_offsets(text)
+        return tuple(utf16_runs(text, runs, offsets)), state, tuple(utf16_brackets(text, brackets, offsets))
+
+
+def multiline_string_runs(text, previous_state):
+    """Return docstring runs and the end state for triple-quoted strings"""
+    for delimiter in ('"""', "'''"):
+        result = _multiline_block(text, delimiter, previous_state)
+        if result is not None:
+            return result
+    return [], 0
+
+
+def _multiline_block(text, delimiter, previous_state):
+    """Process a multi-line block with the given delimiter"""
+    if previous_state == 1:
+        start_index = 0
+        add_length = 0
+    else:
+        start_index = text.find(delimiter)
+        if start_index == -1:
+            return None
+        add_length = len(delimiter)
+
+    runs = []
+    state = 0
+    end_index = text.find(delimiter, start_index + add_length)
+    while start_index >= 0:
+        if end_index == -1:
+            state = 1
+            length = len(text) - start_index
+        else:
+            # Include the closing delimiter so the search moves past it
+            length = end_index - start_index + len(delimiter)
+        runs.append((start_index, length, "docstring"))
+
+        start_index = text.find(delimiter, start_index + length)
+        if start_index == -1:
+            break
+        end_index = text.find(delimiter, start_index + len(delimiter))
+    return runs, state
+
+
+if RegexLexer is not None:
+    # Pygments token type -> format name, most specific first
+    TOKEN_FORMATS = {
+        Comment.Preproc: "preprocessor",
+        Comment: "comment",
+        String.Doc: "docstring",
+        String.Escape: "string_escape",
+        String.Regex: "regex",
+        String.Char: "char",
+        String: "string",
+        Number: "number",
+        Keyword.Constant: "constant",
+        Keyword.Type: "type",
+        Keyword: "keyword",
+        Name.Builtin.Pseudo: "special_var",
+        Name.Builtin: "type",
+        Name.Function: "function",
+        Name.Class: "class",
+        Name.Decorator: "decorator",
+        Name.Exception: "class",
+        Name.Tag: "keyword",
+        Name.Attribute: "property",
+        Name.Property: "property",
+        Name.Constant: "constant",
+        Name.Variable: "variable",
+        Operator.Word: "keyword",
+        Operator: "operator",
+        Punctuation: "bracket",
+        Error: "error",
+    }
+
+
+class PygmentsLexer(Lexer):
+    """Line-by-line lexing with a Pygments RegexLexer.
+
+    The lexer's state stack at the end of a line is interned to a small int
+    so it fits in the block's user state.
+    """
+
+    def __init__(self, lexer, block_comment=None, cache_size=TOKEN_CACHE_SIZE):
+        super().__init__(cache_size)
+        self.lexer = lexer
+        self.block_comment = block_comment
+        self.states = [(("root",), False)]
+        self.state_ids = {self.states[0]: 0}
+        self.format_names = {}
+
+    def intern_state(self, state):
+        state_id = self.state_ids.get(state)
+        if state_id is None:
+            state_id = self.state_ids[state] = len(self.states)
+            self.states.append(state)
+        return state_id
+
+    def format_for(self, token_type):
+        name = self.format_names.get(token_type, False)
+        if name is False:
+            name = None
+            ancestor = token_type
+            while ancestor is not None:
+                if ancestor in TOKEN_FORMATS:
+                    name = TOKEN_FORMATS[ancestor]
+                    break
+                ancestor = ancestor.parent
+            self.format_names[token_type] = name
+        return name
+
+    def lex_line(self, text, state):
+        stack, in_comment = self.states[state] if 0 <= state < len(self.states) else self.states[0]
+        runs = []
+        offset = 0
+        if in_comment:
+            closer = self.block_comment[1]
+            end = text.find(closer)
+            if end == -1:
+                return ((0, len(text), "comment"),) if text else (), state, ()
+            offset = end + len(closer)
+            runs.append((0, offset, "comment"))
+
+        tokens, end_stack = self.tokens(text[offset:], stack)
+        in_comment = False
+        if self.block_comment:
+            cut = self.unclosed_comment(text, offset, tokens)
+            if cut is not None:
+                # Only the code before the comment decides the state stack
+                tokens, end_stack = self.tokens(text[offset:cut], stack)
+                in_comment = True
+        brackets = []
+        for start, token_type, value in tokens:
+            name = self.format_for(token_type)
+            if name and value:
+                runs.append((offset + start, len(value), name))
+            if name not in LITERAL_FORMATS:
+                brackets.extend(
+                    (offset + start + index, char) for index, char in enumerate(value) if char in BRACKET_CHARS
+                )
+        if in_comment:
+            runs.append((cut, len(text) - cut, "comment"))
+        offsets = utf16_offsets(text)
+        return (
+            tuple(utf16_runs(text, runs, offsets)),
+            self.intern_state((end_stack, in_comment)),
+            tuple(utf16_brackets(text, brackets, offsets)),
+        )
+
+    def unclosed_comment(self, text, offset, tokens):
+        """Return where a block comment left open at the end of the line starts"""
+        opener = self.block_comment[0]
+        position = text.find(opener, offset)
+        while position != -1:
+            token_type = None
+            for start, candidate, value in tokens:
+                if offset + start <= position < offset + start + len(value):
+                    token_type = candidate
+                    break
+            if token_type is not None and token_type not in String and token_type not in Comment:
+                return position
+            position = text.find(opener, position + len(opener))
+        return None
+
+    def tokens(self, text, stack):
+        """Lex one line from the given state stack; return tokens and the end stack.
+
+        This is RegexLexer.get_tokens_unprocessed, which does not expose the
+        stack it finishes with.
+        """
+        lexer = self.lexer
+        tokendefs = lexer._tokens
+        line = text + "\n"
+        statestack = list(stack)
+        statetokens = tokendefs[statestack[-1]]
+        tokens = []
+        pos = 0
+        while pos < len(line):
+            for rexmatch, action, new_state in statetokens:
+                m = rexmatch(line, pos)
+                if m:
+                    if action is not None:
+                        if type(action) is _TokenType:
+                            tokens.append((pos, action, m.group()))
+                        else:
+                            tokens.extend(action(lexer, m))
+                    pos = m.end()
+                    if new_state is not None:
+                        if isinstance(new_state, tuple):
+                            for item in new_state:
+                                if item == "#pop":
+                                    if len(statestack) > 1:
+                                        statestack.pop()
+                                elif item == "#push":
+                                    statestack.append(statestack[-1])
+                                else:
+                                    statestack.append(item)
+                        elif isinstance(new_state, int):
+                            if abs(new_state) >= len(statestack):
+                                del statestack[1:]
+                            else:
+                                del statestack[new_state:]
+                        elif new_state == "#push":
+                            statestack.append(statestack[-1])
+                        statetokens = tokendefs[statestack[-1]]
+                    break
+            else:
+                if line[pos] == "\n":
+                    # At EOL with no match: back to the root state
+                    statestack = ["root"]
+                    statetokens = tokendefs["root"]
+                    tokens.append((pos, Whitespace, "\n"))
+                else:
+                    tokens.append((pos, Error, line[pos]))
+                pos += 1
+        # Drop the newline that was only added so end-of-line rules match
+        length = len(text)
+        tokens = [(start, token_type, value[:length - start]) for start, token_type, value in tokens
+                  if start < length]
+        return tokens, tuple(statestack)
@@ -1,14 +1,113 @@
 # core/code_editor/line_number_area.py
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QSize, QPointF, QRect, Qt
+from PyQt6.QtGui import QColor, QPainter, QPen, QStaticText
+
+# Laid-out line numbers kept between paints
+STATIC_TEXT_CACHE_SIZE = 4096
+
+
+class GutterLane:
+    """A column of per-line markers (folds, diffs...) drawn right of the line numbers"""
+
+    width = 0
+
+    def paint(self, painter, rect, block, block_number):
+        """Paint the marker for one visible block inside rect"""
+
 
 class LineNumberArea(QWidget):
+    """The editor's gutter: line numbers plus optional marker lanes.
+
+    Colors, pens and font metrics are cached by `update_style`, each line
+    number's layout is cached as a QStaticText, and the width only changes
+    when the number of digits in the line count does.
+    """
+
     def __init__(self, editor):
         super().__init__(editor)
         self.codeEditor = editor
+        self.lanes = []
+        self.digits = 1
+        self.number_width = 0
+        self.gutter_width = 0
+        self.static_texts = {}
+        self.update_style()
 
     def sizeHint(self) -> QSize:
-        return QSize(self.codeEditor.lineNumberAreaWidth(), 0)
+        return QSize(self.gutter_width, 0)
+
+    def update_style(self):
+        """Cache colors and metrics after the editor's font or settings change"""
+        settings = self.codeEditor.settings
+        self.background = QColor(settings.get("line_number_bg", "#21252B"))
+        self.pen = QPen(QColor(settings.get("line_number_color", "#636D83")))
+        self.number_font = self.codeEditor.font()
+        metrics = self.codeEditor.fontMetrics()
+        self.digit_advance = metrics.horizontalAdvance('9')
+        self.line_height = metrics.height()
+        self.static_texts.clear()
+        self.update_width(self.codeEditor.blockCount(), force=True)
+
+    def update_width(self, block_count, force=False):
+        """Recompute the gutter width; return True if it changed"""
+        digits = len(str(max(1, block_count)))
+        if digits == self.digits and not force:
+            return False
+        self.digits = digits
+        self.number_width = 8 + self.digit_advance * digits + 20
+        width = self.number_width + sum(lane.width for lane in self.lanes)
+        changed = width != self.gutter_width
+        self.gutter_width = width
+        return changed
+
+    def add_lane(self, lane):
+        self.lanes.append(lane)
+        self.update_width(self.codeEditor.blockCount(), force=True)
+        self.codeEditor.update_line_number_area_width(0)
+
+    def remove_lane(self, lane):
+        self.lanes.remove(lane)
+        self.update_width(self.codeEditor.blockCount(), force=True)
+        self.codeEditor.update_line_number_area_width(0)
+
+    def static_text(self, number):
+        text = self.static_texts.get(number)
+        if text is None:
+            if len(self.static_texts) >= STATIC_TEXT_CACHE_SIZE:
+                self.static_texts.clear()
+            text = QStaticText(str(number))
+            text.setTextFormat(Qt.TextFormat.PlainText)
+            text.prepare(font=self.number_font)
+            self.static_texts[number] = text
+        return text
 
     def paintEvent(self, event):
-        self.codeEditor.lineNumberAreaPaintEvent(event)
+        editor = self.codeEditor
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.background)
+        painter.setPen(self.pen)
+        painter.setFont(self.number_font)
+
+        block = editor.firstVisibleBlock()
+        blockNumber = block.blockNumber()
+        top = editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
+        paint_top = event.rect().top()
+        paint_bottom = event.rect().bottom()
+        right = self.number_width - 4
+        lanes = self.lanes
+
+        while block.isValid() and top <= paint_bottom:
+            height = editor.blockBoundingRect(block).height()
+            bottom = top + height
+            if block.isVisible() and bottom >= paint_top:
+                text = self.static_text(blockNumber + 1)
+                painter.drawStaticText(QPointF(right - text.size().width(), int(top)), text)
+                if lanes:
+                    x = self.number_width
+                    for lane in lanes:
+                        lane.paint(painter, QRect(x, int(top), lane.width, int(height)), block, blockNumber)
+                        x += lane.width
+            block = block.next()
+            top = bottom
+            blockNumber += 1
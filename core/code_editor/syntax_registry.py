@@ -0,0 +1,141 @@
+# core/code_editor/syntax_registry.py
+from types import MappingProxyType
+from PyQt6.QtGui import QTextCharFormat, QColor, QFont
+from core.code_editor.lexers import DEFAULT_LANGUAGE, create_lexer
+
+# One Dark Pro theme colors, overridden by the "syntax" section of settings.json
+DEFAULT_COLORS = {
+    "chalky": "#e5c07b",
+    "coral": "#e06c75",
+    "dark": "#5c6370",
+    "error": "#f44747",
+    "fountainBlue": "#56b6c2",
+    "green": "#98c379",
+    "invalid": "#ffffff",
+    "lightDark": "#7f848e",
+    "lightWhite": "#abb2bf",
+    "malibu": "#61afef",
+    "purple": "#c678dd",
+    "whiskey": "#d19a66",
+    "deepRed": "#be5046"
+}
+
+# Format name -> (color name, bold, italic, underline)
+FORMAT_STYLES = {
+    # Variables and identifiers
+    "variable": ("lightWhite", False, False, False),
+    "property": ("coral", False, False, False),
+    "special_var": ("whiskey", False, False, False),
+
+    # Functions and methods
+    "function": ("malibu", False, False, False),
+    "method": ("malibu", False, False, False),
+    "decorator": ("coral", False, True, False),
+
+    # Keywords and control
+    "keyword": ("purple", True, False, False),
+    "control": ("purple", False, False, False),
+    "conditional": ("purple", False, False, False),
+
+    # Types and classes
+    "class": ("chalky", True, False, False),
+    "type": ("chalky", False, False, False),
+    "interface": ("chalky", False, False, False),
+
+    # Constants and values
+    "constant": ("whiskey", False, False, False),
+    "number": ("whiskey", False, False, False),
+    "boolean": ("whiskey", False, False, False),
+    "null": ("whiskey", False, False, False),
+
+    # Strings
+    "string": ("green", False, False, False),
+    "string_escape": ("fountainBlue", False, False, False),
+    "char": ("green", False, False, False),
+
+    # Comments
+    "comment": ("lightDark", False, True, False),
+    "docstring": ("lightDark", False, True, False),
+
+    # Operators and symbols
+    "operator": ("fountainBlue", False, False, False),
+    "bracket": ("lightWhite", False, False, False),
+
+    # Special
+    "regex": ("green", False, False, False),
+    "annotation": ("coral", False, False, False),
+    "preprocessor": ("purple", False, False, False),
+    "url": ("malibu", False, False, True),
+    "error": ("error", False, False, True)
+}
+
+
+class RuleSet:
+    """Lexer and formats for one language and theme, shared by reference.
+
+    Rule sets are built once per process and must not be modified; editors
+    switch to a different instance instead.
+    """
+
+    __slots__ = ("language", "theme", "lexer", "formats")
+
+    def __init__(self, language, theme, lexer, formats):
+        self.language = language
+        self.theme = theme
+        self.lexer = lexer
+        self.formats = formats
+
+
+_lexers = {}
+_formats = {}
+_rule_sets = {}
+
+
+def theme_key(syntax_settings=None):
+    """Return a hashable key for the effective syntax colors"""
+    colors = dict(DEFAULT_COLORS)
+    colors.update(syntax_settings or {})
+    return tuple(sorted(colors.items()))
+
+
+def get_rule_set(language=DEFAULT_LANGUAGE, syntax_settings=None):
+    """Return the shared rule set for a language and the given syntax colors"""
+    theme = theme_key(syntax_settings)
+    rule_set = _rule_sets.get((language, theme))
+    if rule_set is None:
+        lexer = _lexers.get(language)
+        if lexer is None:
+            lexer = _lexers[language] = create_lexer(language)
+        formats = _formats.get(theme)
+        if formats is None:
+            # The colors changed: drop everything built for the old theme
+            _formats.clear()
+            for key in [key for key in _rule_sets if key[1] != theme]:
+                del _rule_sets[key]
+            formats = _formats[theme] = MappingProxyType(create_formats(dict(theme)))
+        rule_set = RuleSet(language, theme, lexer, formats)
+        _rule_sets[(language, theme)] = rule_set
+    return rule_set
+
+
+def create_formats(colors):
+    """Initialize text formats for different syntax elements"""
+    return {
+        name: create_format(colors[color], bold, italic, underline)
+        for name, (color, bold, italic, underline) in FORMAT_STYLES.items()
+    }
+
+
+def create_format(color, bold=False, italic=False, underline=False):
+    """Create a text format with specified properties"""
+    text_format = QTextCharFormat()
+    text_format.setForeground(QColor(color))
+
+    if bold:
+        text_format.setFontWeight(QFont.Weight.Bold)
+    if italic:
+        text_format.setFontItalic(True)
+    if underline:
+        text_format.setFontUnderline(True)
+
+    return text_format
@@ -0,0 +1,244 @@
+# core/code_editor/tokenizer.py
+import re
+from operator import itemgetter
+
+# Keywords and built-in types, highlighted as whole words
+KEYWORDS = [
+    # Python keywords
+    "and", "as", "assert", "async", "await", "break", "class", "continue",
+    "def", "del", "elif", "else", "except", "finally", "for", "from",
+    "global", "if", "import", "in", "is", "lambda", "nonlocal", "not",
+    "or", "pass", "raise", "return", "try", "while", "with", "yield",
+    # Additional keywords for other languages
+    "function", "var", "let", "const", "static", "public", "private",
+    "protected", "void", "int", "string", "bool", "float", "double"
+]
+
+TYPES = [
+    "bool", "int", "float", "str", "list", "dict", "set", "tuple",
+    "object", "None", "True", "False"
+]
+
+# Regular expressions for various patterns. Rules are painted in order, so
+# a later rule overrides the format of an earlier one where they overlap.
+PATTERN_RULES = [
+    # Docstrings
+    (r'"""(?:.|\n)*?"""', "docstring"),
+    (r"'''(?:.|\n)*?'''", "docstring"),
+
+    # Single-line comments
+    (r"#[^\n]*", "comment"),
+
+    # Function definitions
+    (r"\bdef\s+(\w+)", "function"),
+
+    # Class definitions
+    (r"\bclass\s+(\w+)", "class"),
+
+    # Decorators
+    (r"@\w+", "decorator"),
+
+    # String literals
+    (r'"[^"\\]*(\\.[^"\\]*)*"', "string"),
+    (r"'[^'\\]*(\\.[^'\\]*)*'", "string"),
+
+    # Numbers
+    (r"\b\d+\b", "number"),
+    (r"\b0x[0-9A-Fa-f]+\b", "number"),
+    (r"\b\d+\.\d*\b", "number"),
+
+    # Special variables
+    (r"\bself\b", "special_var"),
+    (r"\bcls\b", "special_var"),
+
+    # Function calls
+    (r"\b\w+(?=\s*\()", "function"),
+
+    # Operators
+    (r"[+\-*/=<>!&|^~]", "operator"),
+
+    # Brackets
+    (r"[\[\]{}()]", "bracket"),
+
+    # Regular expressions
+    (r"r'[^'\\]*(\\.[^'\\]*)*'", "regex"),
+    (r'r"[^"\\]*(\\.[^"\\]*)*"', "regex"),
+
+    # URLs
+    (r"https?://\S+", "url"),
+
+    # String escape sequences
+    (r"\\[abfnrtv'\"\\]", "string_escape"),
+
+    # Property access
+    (r"\.\w+", "property")
+]
+
+
+def rule_list(keywords=KEYWORDS, types=TYPES, rules=PATTERN_RULES):
+    """Return the full ordered (pattern, format_name) rule list"""
+    ordered = [(f"\\b{keyword}\\b", "keyword") for keyword in keywords]
+    ordered += [(f"\\b{type_name}\\b", "type") for type_name in types]
+    ordered += list(rules)
+    return ordered
+
+
+# QRegularExpression only treats ASCII as \w, \d and \s unless asked to use
+# Unicode properties, so the tokenizer compiles with re.ASCII to match it.
+_WORD = re.compile(r"\w+", re.ASCII)
+_LITERAL_WORD = re.compile(r"\\b(\w+)\\b")
+_HEX = re.compile(r"0x[0-9A-Fa-f]+", re.ASCII)
+_CALL = re.compile(r"\s*\(", re.ASCII)
+_RUNS = re.compile(rb"(.)\1*", re.DOTALL)
+
+# Formats whose text is not code; brackets inside them are not indexed
+LITERAL_FORMATS = {"string", "comment", "docstring", "regex", "char"}
+
+# Rules that can only ever match one whole identifier token. Each maps to a
+# test on (text, token_start, token_end) equivalent to running the regex.
+_WORD_TESTS = {
+    r"\b\d+\b": lambda text, start, end: text[start:end].isdigit(),
+    r"\b0x[0-9A-Fa-f]+\b": lambda text, start, end: _HEX.fullmatch(text, start, end) is not None,
+    r"\b\w+(?=\s*\()": lambda text, start, end: _CALL.match(text, end) is not None,
+}
+
+# A substring that must be present for a span rule to match at all; rules
+# without an anchor are always scanned.
+_SPAN_ANCHORS = {
+    r'"""(?:.|\n)*?"""': '"""',
+    r"'''(?:.|\n)*?'''": "'''",
+    r"#[^\n]*": "#",
+    r"\bdef\s+(\w+)": "def",
+    r"\bclass\s+(\w+)": "class",
+    r"@\w+": "@",
+    r'"[^"\\]*(\\.[^"\\]*)*"': '"',
+    r"'[^'\\]*(\\.[^'\\]*)*'": "'",
+    r"\b\d+\.\d*\b": ".",
+    r"r'[^'\\]*(\\.[^'\\]*)*'": "r'",
+    r'r"[^"\\]*(\\.[^"\\]*)*"': 'r"',
+    r"https?://\S+": "http",
+    r"\\[abfnrtv'\"\\]": "\\",
+    r"\.\w+": ".",
+}
+
+
+class RuleTokenizer:
+    """Single-pass tokenizer equivalent to painting each rule in order.
+
+    Whole-word rules (keywords, types, numbers, calls, ...) are resolved with
+    one identifier scan and a lookup per token instead of one regex each.
+    The remaining span rules are only scanned when their anchor is present.
+    """
+
+    def __init__(self, rules=None):
+        rules = rule_list() if rules is None else rules
+        self.format_names = [None]
+        format_ids = {}
+        self.literal_words = {}
+        self.word_tests = []
+        self.span_rules = []
+        for priority, (pattern, format_name) in enumerate(rules):
+            if format_name not in format_ids:
+                format_ids[format_name] = len(self.format_names)
+                self.format_names.append(format_name)
+            format_id = format_ids[format_name]
+            literal = _LITERAL_WORD.fullmatch(pattern)
+            if literal:
+                # Later rules win, so a repeated word keeps its last entry
+                self.literal_words[literal.group(1)] = (priority, format_id)
+            elif pattern in _WORD_TESTS:
+                self.word_tests.append((priority, format_id, _WORD_TESTS[pattern]))
+            else:
+                expression = re.compile(pattern, re.ASCII)
+                self.span_rules.append((priority, format_id, expression, _SPAN_ANCHORS.get(pattern)))
+        # Highest priority first so the first passing test wins
+        self.word_tests.sort(key=itemgetter(0), reverse=True)
+        self.bracket_id = format_ids.get("bracket")
+        self.literal_ids = {format_ids[name] for name in LITERAL_FORMATS if name in format_ids}
+
+    def tokenize(self, text):
+        """Return (start, length, format_name) runs and the code brackets of a line.
+
+        Brackets are (offset, char) pairs for bracket characters outside of
+        strings and comments. Offsets are code points; see utf16_runs.
+        """
+        if not text:
+            return [], []
+        spans = []
+        literal_words = self.literal_words
+        word_tests = self.word_tests
+        for match in _WORD.finditer(text):
+            start, end = match.span()
+            best = literal_words.get(match.group())
+            for priority, format_id, test in word_tests:
+                if best is not None and best[0] > priority:
+                    break
+                if test(text, start, end):
+                    best = (priority, format_id)
+                    break
+            if best is not None:
+                spans.append((best[0], start, end, best[1]))
+
+        for priority, format_id, expression, anchor in self.span_rules:
+            if anchor is not None and anchor not in text:
+                continue
+            for match in expression.finditer(text):
+                start, end = match.span()
+                if end > start:
+                    spans.append((priority, start, end, format_id))
+
+        if not spans:
+            return [], []
+        spans.sort(key=itemgetter(0))
+        painted = bytearray(len(text))
+        for _, start, end, format_id in spans:
+            painted[start:end] = bytes((format_id,)) * (end - start)
+
+        names = self.format_names
+        runs = [
+            (match.start(), match.end() - match.start(), names[painted[match.start()]])
+            for match in _RUNS.finditer(painted)
+            if painted[match.start()]
+        ]
+
+        brackets = []
+        positions = [start for _, start, _, format_id in spans if format_id == self.bracket_id]
+        if positions:
+            literal = bytearray(len(text))
+            for _, start, end, format_id in spans:
+                if format_id in self.literal_ids:
+                    literal[start:end] = b"\x01" * (end - start)
+            brackets = [(position, text[position]) for position in positions if not literal[position]]
+        return runs, brackets
+
+
+def utf16_offsets(text):
+    """Map code point offsets to UTF-16 offsets, or None if they are the same"""
+    if text.isascii() or max(text) <= "\uffff":
+        return None
+    offsets = [0] * (len(text) + 1)
+    position = 0
+    for index, char in enumerate(text):
+        offsets[index] = position
+        position += 2 if char > "\uffff" else 1
+    offsets[len(text)] = position
+    return offsets
+
+
+def utf16_runs(text, runs, offsets=None):
+    """Convert run offsets from code points to UTF-16 code units"""
+    offsets = offsets or utf16_offsets(text)
+    if offsets is None:
+        return runs
+    return [
+        (offsets[start], offsets[start + length] - offsets[start], name)
+        for start, length, name in runs
+    ]
+
+
+def utf16_brackets(text, brackets, offsets=None):
+    """Convert bracket offsets from code points to UTF-16 code units"""
+    offsets = offsets or utf16_offsets(text)
+    if offsets is None:
+        return brackets
+    return [(offsets[position], char) for position, char in brackets]
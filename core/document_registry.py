@@ -0,0 +1,70 @@
+# core/document_registry.py
+import os
+from PyQt6.QtCore import QObject
+
+
+def canonical_path(path):
+    """Resolve symlinks and case so every path to a file gives the same key"""
+    return os.path.normcase(os.path.realpath(path))
+
+
+class DocumentRegistry(QObject):
+    """The open editors, their tabs and the files they belong to.
+
+    Editors are keyed by canonical path, so checking whether a file is open
+    is a dict lookup, and tabs are always found from their editor, never
+    by index, so reordering tabs cannot break the mapping. Untitled editors
+    are registered without a path.
+    """
+
+    def __init__(self, tab_widget, parent=None):
+        super().__init__(parent)
+        self.tabs = tab_widget
+        self.by_path = {}
+        self.paths = {}
+
+    def find(self, path):
+        """Return the editor that has the file open, or None"""
+        return self.by_path.get(canonical_path(path))
+
+    def path_for(self, editor):
+        """Return the path of the editor's file, or None if it is untitled"""
+        return self.paths.get(editor)
+
+    def editors(self):
+        return list(self.paths)
+
+    def add(self, editor, path=None, title=None):
+        """Add a tab for the editor and make it current"""
+        self.paths[editor] = None
+        index = self.tabs.addTab(editor, title or "untitled")
+        if path:
+            self.rename(editor, path)
+        self.tabs.setCurrentIndex(index)
+        return index
+
+    def rename(self, editor, path):
+        """Point the editor at a new file, e.g. after Save As"""
+        old = self.paths.get(editor)
+        if old is not None:
+            del self.by_path[old]
+        path = canonical_path(path)
+        other = self.by_path.get(path)
+        if other is not None and other is not editor:
+            # The other tab's file was just overwritten by this one
+            self.paths[other] = None
+        self.by_path[path] = editor
+        self.paths[editor] = path
+        index = self.tabs.indexOf(editor)
+        self.tabs.setTabText(index, os.path.basename(path))
+        self.tabs.setTabToolTip(index, path)
+
+    def remove(self, editor):
+        """Close the editor's tab and forget it"""
+        path = self.paths.pop(editor, None)
+        if path is not None:
+            del self.by_path[path]
+        index = self.tabs.indexOf(editor)
+        if index >= 0:
+            self.tabs.removeTab(index)
+        editor.deleteLater()
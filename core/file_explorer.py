@@ -7,7 +7,7 @@ from core.lazy_file_model import LazyFileModel
 def get_main_window(widget):
     from PyQt6.QtWidgets import QMainWindow
     while widget is not None:
-        if isinstance(widget, QMainWindow) and hasattr(widget, "open_file_in_editor"):
+        if isinstance(widget, QMainWindow) and hasattr(widget, "open_file_with_path"):
             return widget
         widget = widget.parentWidget()
     return QApplication.instance().activeWindow()
@@ -22,18 +22,17 @@ class FileExplorer(QTreeView):
         self.setHeaderHidden(False)
         self.file_model = LazyFileModel()
         self.setModel(self.file_model)
+        # Expanding a folder makes the view call the model's fetchMore, which lists it
         self.expanded.connect(self.on_item_expanded)
+        self.collapsed.connect(self.on_item_collapsed)
         self.clicked.connect(self.on_item_clicked)
 
     def on_item_expanded(self, index):
-        is_folder = index.data(Qt.ItemDataRole.UserRole + 1)
-        if is_folder:
-            model = index.model()
-            item = model.itemFromIndex(index)
-            if item.hasChildren() and item.rowCount() == 1 and not item.child(0).data(Qt.ItemDataRole.UserRole):
-                item.removeRow(0)
-                folder_path = item.data(Qt.ItemDataRole.UserRole)
-                model.populate_folder(folder_path, item)
+        # Expanded folders follow changes on disk
+        self.file_model.set_expanded(index, True)
+
+    def on_item_collapsed(self, index):
+        self.file_model.set_expanded(index, False)
 
     def on_item_clicked(self, index):
         is_folder = index.data(Qt.ItemDataRole.UserRole + 1)
@@ -50,17 +49,11 @@ class FileExplorer(QTreeView):
         if is_folder:
             # Let double-click handle folder expansion.
             return
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            main_window = get_main_window(self)
-            if main_window:
-                filename = os.path.basename(path)
-                main_window.open_file_in_editor(filename, content)
-            else:
-                print("Error: Unable to find main window reference.")
-        except Exception as e:
-            print(f"Error opening file: {str(e)}")
+        main_window = get_main_window(self)
+        if main_window:
+            main_window.open_file_with_path(path)
+        else:
+            print("Error: Unable to find main window reference.")
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -80,15 +73,9 @@ class FileExplorer(QTreeView):
                 self.setModel(self.file_model)
                 print(f"File explorer updated to directory: {local_path}")
             else:
-                try:
-                    with open(local_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    main_window = get_main_window(self)
-                    if main_window:
-                        filename = os.path.basename(local_path)
-                        main_window.open_file_in_editor(filename, content)
-                    else:
-                        print("Error: Unable to find main window reference.")
-                except Exception as e:
-                    print(f"Error opening dropped file: {str(e)}")
+                main_window = get_main_window(self)
+                if main_window:
+                    main_window.open_file_with_path(local_path)
+                else:
+                    print("Error: Unable to find main window reference.")
             event.acceptProposedAction()
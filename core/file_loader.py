@@ -0,0 +1,233 @@
+# core/file_loader.py
+import os
+import io
+import queue
+import codecs
+import threading
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+
+# Files at least this big open in large-file mode
+LARGE_FILE_THRESHOLD = 10 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Decoded chunks waiting for the GUI; the reader blocks when this many are queued
+MAX_QUEUED_CHUNKS = 4
+SNIFF_SIZE = 64 * 1024
+
+# Where decoding starts over when a file turns out not to be in the detected encoding
+# after all; latin-1 decodes any bytes, and saving writes them back unchanged
+FALLBACK_ENCODINGS = {
+    "utf-8": "cp1252", "utf-8-sig": "cp1252", "cp1252": "latin-1",
+    "utf-16": "latin-1", "utf-32": "latin-1",
+}
+# Queued instead of a chunk when decoding starts over
+RESTART = (None, 0, 0, False)
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class BinaryFileError(ValueError):
+    pass
+
+
+def is_loading(editor):
+    """Whether the editor's file is still being read into it; its text is only part of the file"""
+    loader = getattr(editor, "file_loader", None)
+    return loader is not None and loader.is_loading()
+
+
+def detect_encoding(sample):
+    """Guess the encoding of a file from its first bytes"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if b"\0" in sample:
+        raise BinaryFileError("cannot open as text (binary file?)")
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def detect_line_ending(text):
+    """Return the most common line ending in the text, "\\n" if there are none"""
+    crlf = text.count("\r\n")
+    cr = text.count("\r") - crlf
+    lf = text.count("\n") - crlf
+    if crlf > lf and crlf >= cr:
+        return "\r\n"
+    if cr > lf:
+        return "\r"
+    return "\n"
+
+
+class LoaderSignals(QObject):
+    # Lives as long as the read task, so a closed tab never deletes it under the reader
+    sized = pyqtSignal(int)
+    detected = pyqtSignal(str, str)
+    chunk_ready = pyqtSignal()
+    failed = pyqtSignal(str)
+
+
+class ReadTask(QRunnable):
+    """Reads and decodes a file on the thread pool, queueing text chunks for the GUI"""
+
+    def __init__(self, file_path, chunks, cancelled):
+        super().__init__()
+        self.file_path = file_path
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.signals = LoaderSignals()
+
+    def run(self):
+        try:
+            self.read()
+        except Exception as e:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(str(e))
+
+    def read(self):
+        with open(self.file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.signals.sized.emit(size)
+            encoding = detect_encoding(f.read(SNIFF_SIZE))
+            while True:
+                f.seek(0)
+                try:
+                    self.decode(f, encoding, size)
+                    return
+                except UnicodeDecodeError:
+                    # Only the start was sniffed; rather than replace what does not
+                    # decode, and save the replacements, start over in the fallback
+                    encoding = FALLBACK_ENCODINGS[encoding]
+                    if not self.put(RESTART):
+                        return
+
+    def decode(self, f, encoding, size):
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+        data = f.read(max(CHUNK_SIZE, SNIFF_SIZE))
+        sample = codecs.decode(data[:SNIFF_SIZE], encoding, errors="replace")
+        self.signals.detected.emit(encoding, detect_line_ending(sample))
+        loaded = 0
+        while not self.cancelled.is_set():
+            loaded += len(data)
+            final = len(data) == 0
+            text = decoder.decode(data, final=final)
+            if not self.put((text, loaded, size, final)) or final:
+                return
+            data = f.read(CHUNK_SIZE)
+
+    def put(self, item):
+        # Block while the GUI is behind, waking up regularly to check for cancel
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self.signals.chunk_ready.emit()
+            return True
+        return False
+
+
+class FileLoader(QObject):
+    """Loads a file into an editor's document without blocking the GUI thread.
+
+    The file is read and decoded on the global thread pool. Text arrives in
+    chunks that are appended to the document as they come in, with undo off
+    so the undo stack never holds a copy of the file, and the editor is
+    read-only until the last one, so nothing typed is lost. The encoding and line
+    ending are detected from the first bytes and kept on the editor, so a
+    save writes them back. If a later chunk does not decode, the document
+    is loaded again in a fallback encoding instead.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, file_path, editor):
+        super().__init__(editor)
+        self.file_path = file_path
+        self.editor = editor
+        self.chunks = queue.Queue(MAX_QUEUED_CHUNKS)
+        self.cancelled = threading.Event()
+        self.loading = False
+        self.size = 0
+
+    def start(self):
+        task = ReadTask(self.file_path, self.chunks, self.cancelled)
+        task.signals.sized.connect(self.on_sized)
+        task.signals.detected.connect(self.on_detected)
+        task.signals.chunk_ready.connect(self.load_chunk)
+        task.signals.failed.connect(self.on_failed)
+        self.loading = True
+        self.editor.setUndoRedoEnabled(False)
+        self.editor.setReadOnly(True)
+        self.editor.clear()
+        QThreadPool.globalInstance().start(task)
+
+    def on_sized(self, size):
+        self.size = size
+        if size >= LARGE_FILE_THRESHOLD:
+            self.editor.set_large_file_mode(True)
+
+    def on_detected(self, encoding, line_ending):
+        self.editor.encoding = encoding
+        self.editor.line_ending = line_ending
+
+    def load_chunk(self):
+        try:
+            text, loaded, size, final = self.chunks.get_nowait()
+        except queue.Empty:
+            return
+        if not self.loading:
+            return
+        if text is None:
+            # Decoding starts over in another encoding
+            self.editor.clear()
+            return
+        if text:
+            editor = self.editor
+            # Loaded text is not typed: nothing gets auto-closed, and a cursor
+            # at the start is not carried along to the end of the chunk
+            auto_close, editor.auto_close_brackets = editor.auto_close_brackets, False
+            at_start = editor.textCursor().position() == 0
+            cursor = QTextCursor(editor.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text)
+            editor.auto_close_brackets = auto_close
+            if at_start:
+                editor.moveCursor(QTextCursor.MoveOperation.Start)
+        # The file may have grown since it was opened
+        self.progress.emit(min(loaded, size), size)
+        if final:
+            self.loading = False
+            self.editor.setUndoRedoEnabled(True)
+            self.editor.setReadOnly(False)
+            self.editor.document().setModified(False)
+            self.finished.emit()
+
+    def on_failed(self, message):
+        self.cancel()
+        self.failed.emit(message)
+
+    def cancel(self):
+        """Stop loading, e.g. because the tab was closed"""
+        self.loading = False
+        self.cancelled.set()
+
+    def is_loading(self):
+        return self.loading
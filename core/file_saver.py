@@ -0,0 +1,190 @@
+# core/file_saver.py
+import os
+import stat
+import hashlib
+import tempfile
+from PyQt6 import sip
+from PyQt6.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal
+from core.file_loader import is_loading
+
+# Mode for files that did not exist yet, as open() would have created them
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+
+
+class SaveJob:
+    """A snapshot of a document to be written to a path.
+
+    Auto-save jobs are skipped when the encoded content hashes the same as
+    the last write of the path.
+    """
+
+    __slots__ = ("path", "text", "encoding", "line_ending", "editor", "revision", "auto", "digest", "skipped")
+
+    def __init__(self, path, text, encoding, line_ending, editor, revision, auto=False, digest=None):
+        self.path = path
+        self.text = text
+        self.encoding = encoding
+        self.line_ending = line_ending
+        self.editor = editor
+        self.revision = revision
+        self.auto = auto
+        # Digest of the last write going in, of this snapshot coming out
+        self.digest = digest
+        self.skipped = False
+
+
+def write_atomic(path, data):
+    """Write data to a temp file next to path, fsync it and rename it over path"""
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = NEW_FILE_MODE
+    fd, temp_path = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable; not possible on every platform
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class SaveSignals(QObject):
+    done = pyqtSignal(object, str)
+
+
+class WriteTask(QRunnable):
+    """Writes one or more snapshots, one after another, on a pool thread"""
+
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs
+        self.signals = SaveSignals()
+
+    def run(self):
+        for job in self.jobs:
+            try:
+                self.write(job)
+                error = ""
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            self.signals.done.emit(job, error)
+
+    def write(self, job):
+        text = job.text
+        job.text = None
+        if job.line_ending != "\n":
+            text = text.replace("\n", job.line_ending)
+        data = text.encode(job.encoding)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if job.auto and digest == job.digest:
+            job.skipped = True
+        else:
+            write_atomic(job.path, data)
+        job.digest = digest
+
+
+class SaveService(QObject):
+    """Saves documents atomically on a thread pool of its own.
+
+    `save` snapshots the editor's text on the GUI thread; the file is written
+    by a worker. While a path is being written, further saves of it are
+    coalesced: only the newest snapshot is written once the current write
+    finishes. Every job that is written reports its result, including one
+    already superseded by a newer snapshot; snapshots replaced before they
+    were written report nothing.
+    """
+
+    # Both carry the SaveJob; its editor is None if the tab was closed meanwhile
+    saved = pyqtSignal(object)
+    failed = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.writing = set()
+        self.pending = {}
+        self.digests = {}
+        # Not the global pool: waiting for saves must not wait for file loads
+        self.pool = QThreadPool(self)
+
+    def save(self, editor, path):
+        return self.save_many([(editor, path)])
+
+    def save_many(self, targets, auto=False):
+        """Save several (editor, path) pairs in one background task; returns whether any was saved"""
+        jobs = []
+        saved = False
+        for editor, path in targets:
+            if is_loading(editor):
+                # Only part of the file is in the editor yet
+                continue
+            saved = True
+            path = os.path.realpath(path)
+            job = SaveJob(
+                path, editor.toPlainText(), editor.encoding, editor.line_ending,
+                editor, editor.document().revision(), auto, self.digests.get(path)
+            )
+            if path in self.writing:
+                self.pending[path] = job
+            else:
+                self.writing.add(path)
+                jobs.append(job)
+        if jobs:
+            self.start(jobs)
+        return saved
+
+    def start(self, jobs):
+        task = WriteTask(jobs)
+        task.signals.done.connect(self.on_done)
+        self.pool.start(task)
+
+    def on_done(self, job, error):
+        self.writing.discard(job.path)
+        if not error:
+            self.digests[job.path] = job.digest
+        newer = self.pending.pop(job.path, None)
+        if newer is not None:
+            self.writing.add(newer.path)
+            newer.digest = self.digests.get(newer.path)
+            self.start([newer])
+        if sip.isdeleted(job.editor):
+            job.editor = None
+        if error:
+            self.failed.emit(job, error)
+            return
+        if job.editor is not None and job.editor.document().revision() == job.revision:
+            job.editor.document().setModified(False)
+        self.saved.emit(job)
+
+    def is_saving(self, path=None):
+        if path is None:
+            return bool(self.writing)
+        return os.path.realpath(path) in self.writing
+
+    def wait(self):
+        """Block until every save has been written, e.g. before quitting"""
+        while self.writing:
+            self.pool.waitForDone()
+            # Deliver the queued results so pending snapshots get started
+            QCoreApplication.processEvents()
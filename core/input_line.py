@@ -0,0 +1,91 @@
+# core/input_line.py
+
+# Commands kept for Up and Down
+MAX_HISTORY = 100
+
+
+def is_word(char):
+    return char.isalnum() or char == "_"
+
+
+class InputLine:
+    """The command being typed at the prompt: its text, cursor and history.
+
+    Kept apart from the terminal's document, so editing never reads the
+    output back and every key costs the same however long the session has
+    run; the terminal redraws just this line after a change. Words are
+    letters, digits and underscores, as in readline.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.cursor = 0
+        # Newest first; -1 is the line being typed, kept in draft while browsing
+        self.history = []
+        self.history_index = -1
+        self.draft = ""
+
+    def set_text(self, text):
+        self.text = text
+        self.cursor = len(text)
+
+    def clear(self):
+        self.set_text("")
+        self.history_index = -1
+
+    def insert(self, text):
+        self.text = self.text[:self.cursor] + text + self.text[self.cursor:]
+        self.cursor += len(text)
+
+    def move(self, position):
+        self.cursor = max(0, min(position, len(self.text)))
+
+    def word_start(self):
+        """Where the word before the cursor starts"""
+        position = self.cursor
+        while position > 0 and not is_word(self.text[position - 1]):
+            position -= 1
+        while position > 0 and is_word(self.text[position - 1]):
+            position -= 1
+        return position
+
+    def word_end(self):
+        """Where the word after the cursor ends"""
+        position = self.cursor
+        while position < len(self.text) and not is_word(self.text[position]):
+            position += 1
+        while position < len(self.text) and is_word(self.text[position]):
+            position += 1
+        return position
+
+    def delete(self, start, end):
+        """Remove the text between two positions and put the cursor there"""
+        start, end = sorted((max(0, start), min(end, len(self.text))))
+        self.text = self.text[:start] + self.text[end:]
+        self.cursor = start
+
+    def backspace(self):
+        self.delete(self.cursor - 1, self.cursor)
+
+    def delete_forward(self):
+        self.delete(self.cursor, self.cursor + 1)
+
+    def add_history(self, command):
+        if command and (not self.history or self.history[0] != command):
+            self.history.insert(0, command)
+            del self.history[MAX_HISTORY:]
+        self.history_index = -1
+
+    def previous(self):
+        """Show the command before the one shown"""
+        if self.history_index < len(self.history) - 1:
+            if self.history_index == -1:
+                self.draft = self.text
+            self.history_index += 1
+            self.set_text(self.history[self.history_index])
+
+    def next(self):
+        """Show the command after the one shown, ending with the line being typed"""
+        if self.history_index > -1:
+            self.history_index -= 1
+            self.set_text(self.draft if self.history_index == -1 else self.history[self.history_index])
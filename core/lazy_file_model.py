@@ -1,65 +1,619 @@
 # core/lazy_file_model.py
 import os
-from PyQt6.QtGui import QIcon, QStandardItemModel, QStandardItem
-from PyQt6.QtCore import QDir, Qt, QFileInfo  # Added QDir import
+import sys
+import stat
+import time
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import repeat
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import (
+    QDir, Qt, QObject, QRunnable, QThreadPool, QTimer, QAbstractItemModel, QModelIndex,
+    QPersistentModelIndex, QFileSystemWatcher, pyqtSignal
+)
+
+# Rows first added to a folder per fetchMore; the view asks for more when scrolled to the end
+FETCH_BATCH_SIZE = 500
+# Changes to watched folders are gathered this long before the folders are listed again
+REFRESH_DELAY_MS = 300
+# Watch descriptors are shared with the rest of the system; the oldest expanded folders give theirs up
+MAX_WATCHED_FOLDERS = 256
+# Bigger changes to a folder are applied as one layout change instead of row by row
+MAX_ROW_CHANGES = 64
+# Folder listings kept across models, so changing the explorer root does not list everything again
+MAX_CACHED_FOLDERS = 2048
+MAX_CACHED_ENTRIES = 500_000
+# A folder changed this recently may change again within the same mtime tick, so it is not cached
+RACY_MTIME_NS = 2_000_000_000
+
+FILE_ICONS = {
+    ".py": "assets/icons/python.svg",
+    ".js": "assets/icons/javascriptX.svg",
+    ".java": "assets/icons/java.svg",
+    ".css": "assets/icons/css.svg",
+    ".html": "assets/icons/html.svg",
+    ".ts": "assets/icons/typescript.svg",
+}
+_icons = {}
+
+# Node kinds
+FILE, FOLDER, PARENT_LINK, PLACEHOLDER, REMOVED = 0, 1, 2, 3, 4
+# Folder states
+UNLISTED, LISTING, LISTED = 0, 1, 2
+ROOT = 0
+
+_SELECTABLE = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+# Indexed by kind. Saying which rows never have children spares the view
+# asking every file whether it has any.
+KIND_FLAGS = (
+    _SELECTABLE | Qt.ItemFlag.ItemNeverHasChildren,
+    _SELECTABLE,
+    _SELECTABLE | Qt.ItemFlag.ItemNeverHasChildren,
+    Qt.ItemFlag.ItemNeverHasChildren,
+    Qt.ItemFlag.ItemNeverHasChildren,
+)
+
+
+def icon_for(name, is_dir):
+    if is_dir:
+        path = "assets/icons/folder.svg"
+    else:
+        path = FILE_ICONS.get(os.path.splitext(name)[1].lower(), "assets/icons/file2.svg")
+    icon = _icons.get(path)
+    if icon is None:
+        icon = _icons[path] = QIcon(path)
+    return icon
+
+
+def sort_key(name):
+    # By name, case-sensitive, as QDir.SortFlag.Name sorts
+    return name
+
+
+def is_listed(entry):
+    """Whether QDir would list the entry by default: no hidden files, sockets,
+    devices or broken symlinks"""
+    if entry.name.startswith("."):
+        return False
+    if sys.platform == "win32":
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        if attributes & stat.FILE_ATTRIBUTE_HIDDEN:
+            return False
+    try:
+        return entry.is_dir() or entry.is_file()
+    except OSError:
+        return False
+
+
+_listings = OrderedDict()
+_listings_lock = threading.Lock()
+_cached_entries = 0
+
+
+def scan_folder(folder_path):
+    """Return [(name, is_dir)] for a folder sorted by name; symlinked folders count as files.
+
+    Hidden entries are left out, as the explorer has always done.
+
+    Listings are cached by path and reused while the folder's mtime is
+    unchanged, which it is until an entry is added, removed or renamed.
+    """
+    folder_path = os.path.normpath(folder_path)
+    try:
+        mtime = os.stat(folder_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime is not None:
+        with _listings_lock:
+            cached = _listings.get(folder_path)
+            if cached is not None and cached[0] == mtime:
+                _listings.move_to_end(folder_path)
+                return cached[1]
+    entries = []
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if not is_listed(entry):
+                    continue
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+    except (FileNotFoundError, NotADirectoryError):
+        # Removed since it was expanded; its parent drops it once listed again
+        forget_listing(folder_path)
+        return entries
+    except OSError as e:
+        print(f"Error listing {folder_path}: {e}")
+        return entries
+    entries.sort()
+    entries = tuple(entries)
+    if mtime is not None and time.time_ns() - mtime > RACY_MTIME_NS:
+        cache_listing(folder_path, mtime, entries)
+    else:
+        forget_listing(folder_path)
+    return entries
+
+
+def cache_listing(folder_path, mtime, entries):
+    global _cached_entries
+    with _listings_lock:
+        previous = _listings.pop(folder_path, None)
+        if previous is not None:
+            _cached_entries -= len(previous[1])
+        if len(entries) > MAX_CACHED_ENTRIES:
+            return
+        _listings[folder_path] = (mtime, entries)
+        _cached_entries += len(entries)
+        while len(_listings) > MAX_CACHED_FOLDERS or _cached_entries > MAX_CACHED_ENTRIES:
+            _, (_, evicted) = _listings.popitem(last=False)
+            _cached_entries -= len(evicted)
+
+
+def forget_listing(folder_path):
+    global _cached_entries
+    with _listings_lock:
+        previous = _listings.pop(folder_path, None)
+        if previous is not None:
+            _cached_entries -= len(previous[1])
+
+
+class ScanSignals(QObject):
+    # folder node, its path, entries
+    done = pyqtSignal(int, str, object)
+
+
+class ScanTask(QRunnable):
+    """Lists a folder on the thread pool"""
+
+    def __init__(self, node, folder_path):
+        super().__init__()
+        self.node = node
+        self.folder_path = folder_path
+        self.signals = ScanSignals()
+
+    def run(self):
+        self.signals.done.emit(self.node, self.folder_path, scan_folder(self.folder_path))
+
+
+
+def runs(positions):
+    """Group ascending positions into (first, last) runs of consecutive ones"""
+    grouped = []
+    for position in positions:
+        if grouped and grouped[-1][1] == position - 1:
+            grouped[-1][1] = position
+        else:
+            grouped.append([position, position])
+    return grouped
+
+
+class LazyFileModel(QAbstractItemModel):
+    """File tree that lists a folder the first time it is expanded.
+
+    Entries are numbered nodes, taking the numbers of removed entries
+    before new ones, stored in parallel arrays rather than as objects: name, parent node, kind, row
+    within the parent and, for folders, the listing state. A listed folder
+    keeps the array of its child nodes. Model indexes carry the node
+    number; paths, icons and the rest are worked out in `data()`. Like the
+    item based model before it, UserRole holds the path and UserRole + 1
+    whether the entry is a folder.
+
+    Listing runs on the global thread pool while the folder shows a
+    "Loading…" row. Rows are then added in batches through the
+    canFetchMore/fetchMore protocol. The view asks for more when scrolled
+    to the end of a big folder, and the rest trickles in one batch per
+    event loop turn.
+
+    Expanded folders are watched, up to MAX_WATCHED_FOLDERS. Changes are
+    collected for REFRESH_DELAY_MS, then the changed folders are listed
+    again and only the entries that came or went are inserted or removed,
+    so nodes, and with them expansion and selection, survive.
+    """
 
-class LazyFileModel(QStandardItemModel):
     def __init__(self, root_path=""):
         super().__init__()
         self.root_path = root_path if root_path else QDir.homePath()
-        self.loaded_folders = set()
-        folder_name = QDir(self.root_path).dirName() or self.root_path
-        self.setHorizontalHeaderLabels([folder_name])
-        self.populate_top_level(self.root_path, self.invisibleRootItem())
-
-    def populate_top_level(self, path, parent_item):
+        self.header = QDir(self.root_path).dirName() or self.root_path
         # Add ".." entry if not at system root.
-        if os.path.abspath(path) != os.path.abspath(QDir.rootPath()):
-            parent_dir = os.path.dirname(os.path.abspath(path.rstrip("/")))
-            parent_item_ = QStandardItem("..")
-            parent_item_.setIcon(QIcon("assets/icons/folder.svg"))
-            parent_item_.setData(parent_dir, Qt.ItemDataRole.UserRole)
-            parent_item_.setData(True, Qt.ItemDataRole.UserRole + 1)  # isFolder
-            self.appendRow(parent_item_)
-        self.populate_folder(path, self.invisibleRootItem())
-
-    def populate_folder(self, folder_path, parent_item):
-        folder_path = os.path.abspath(folder_path)
-        if folder_path in self.loaded_folders:
+        self.has_parent_link = os.path.abspath(self.root_path) != os.path.abspath(QDir.rootPath())
+        self.names = [self.root_path]
+        self.parents = array("i", [ROOT])
+        self.kinds = bytearray([FOLDER])
+        self.states = bytearray([UNLISTED])
+        self.rows = array("i", [0])
+        # Rows the view has been told about; the rest are still to be fetched
+        self.child_shown = array("i", [0])
+        # Folder node -> array of child nodes, for folders being or been listed
+        self.children = {}
+        # Folders with rows left to add
+        self.partial = set()
+        # Nodes of removed entries, reused for new ones
+        self.free = []
+        # Views may ask for more rows while being told about a change
+        self.changing = False
+        self.fetch_timer = QTimer(self)
+        self.fetch_timer.setInterval(0)
+        self.fetch_timer.timeout.connect(self.fetch_pending)
+
+        # Watched folder path -> node, oldest first
+        self.watched = OrderedDict()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY_MS)
+        self.refresh_timer.timeout.connect(self.refresh_changed)
+        self.list_folder(ROOT)
+        self.watch(ROOT)
+
+    def add_nodes(self, parent, entries):
+        """Add (name, kind) nodes under parent, in removed nodes first; return the new nodes"""
+        reused = min(len(self.free), len(entries))
+        nodes = array("i", self.free[len(self.free) - reused:])
+        del self.free[len(self.free) - reused:]
+        for node, (name, kind) in zip(nodes, entries):
+            self.names[node] = name
+            self.kinds[node] = kind
+            self.parents[node] = parent
+            self.states[node] = UNLISTED
+            self.rows[node] = 0
+            self.child_shown[node] = 0
+        entries = entries[reused:]
+        first = len(self.names)
+        count = len(entries)
+        self.names.extend(name for name, _ in entries)
+        self.kinds.extend(kind for _, kind in entries)
+        self.parents.extend(repeat(parent, count))
+        self.states.extend(repeat(UNLISTED, count))
+        self.rows.extend(repeat(0, count))
+        self.child_shown.extend(repeat(0, count))
+        nodes.extend(range(first, first + count))
+        return nodes
+
+    def set_children(self, folder, nodes):
+        self.children[folder] = nodes
+        self.renumber(folder)
+
+    def renumber(self, folder, start=0):
+        rows = self.rows
+        nodes = self.children[folder]
+        for row in range(start, len(nodes)):
+            rows[nodes[row]] = row
+
+    def node_index(self, node, column=0):
+        if node == ROOT:
+            return QModelIndex()
+        return self.createIndex(self.rows[node], column, node)
+
+    def path_of(self, node):
+        parts = []
+        while node != ROOT:
+            parts.append(self.names[node])
+            node = self.parents[node]
+        return os.path.join(self.root_path, *reversed(parts))
+
+    def list_folder(self, folder):
+        """Start listing a folder in the background; its rows replace a placeholder"""
+        self.states[folder] = LISTING
+        rows = [("Loading…", PLACEHOLDER)]
+        if folder == ROOT and self.has_parent_link:
+            rows.insert(0, ("..", PARENT_LINK))
+        self.changing = True
+        self.beginInsertRows(self.node_index(folder), 0, len(rows) - 1)
+        self.set_children(folder, self.add_nodes(folder, rows))
+        self.child_shown[folder] = len(rows)
+        self.endInsertRows()
+        self.changing = False
+        self.scan(folder)
+
+    def scan(self, folder):
+        task = ScanTask(folder, self.path_of(folder))
+        task.signals.done.connect(self.on_scanned)
+        QThreadPool.globalInstance().start(task)
+
+    def on_scanned(self, folder, folder_path, entries):
+        state = self.states[folder]
+        if self.kinds[folder] != FOLDER or self.path_of(folder) != folder_path:
+            # Removed while it was being listed, and maybe its node reused since
+            return
+        entries = [(name, FOLDER if is_dir else FILE) for name, is_dir in entries]
+        if state == LISTED:
+            self.apply_listing(folder, entries)
+            return
+        if state != LISTING:
+            return
+        parent = self.node_index(folder)
+        self.changing = True
+        self.beginRemoveRows(parent, 0, self.child_shown[folder] - 1)
+        # The placeholder and "..": their nodes go back on the free list
+        for node in self.children[folder]:
+            self.forget(node)
+        self.children[folder] = array("i")
+        self.child_shown[folder] = 0
+        self.endRemoveRows()
+        self.changing = False
+        if folder == ROOT and self.has_parent_link:
+            entries.insert(0, ("..", PARENT_LINK))
+        self.set_children(folder, self.add_nodes(folder, entries))
+        self.states[folder] = LISTED
+        self.add_rows(folder)
+
+    def apply_listing(self, folder, entries):
+        """Insert and remove rows so a listed folder matches a fresh listing"""
+        nodes = self.children[folder]
+        names, kinds = self.names, self.kinds
+        # ".." is not part of the listing
+        first = 1 if folder == ROOT and self.has_parent_link else 0
+        removed = []
+        added = []
+        old, new = first, 0
+        while old < len(nodes) or new < len(entries):
+            if new == len(entries):
+                removed.append(old)
+                old += 1
+                continue
+            if old == len(nodes):
+                added.append(new + first)
+                new += 1
+                continue
+            old_key, new_key = sort_key(names[nodes[old]]), sort_key(entries[new][0])
+            if old_key < new_key:
+                removed.append(old)
+                old += 1
+            elif new_key < old_key:
+                added.append(new + first)
+                new += 1
+            else:
+                if kinds[nodes[old]] != entries[new][1]:
+                    # A file replaced by a folder or the other way round
+                    removed.append(old)
+                    added.append(new + first)
+                old += 1
+                new += 1
+        if not removed and not added:
             return
-        self.loaded_folders.add(folder_path)
-        directory = QDir(folder_path)
-        entries = directory.entryList(
-            QDir.Filter(QDir.Filter.AllEntries | QDir.Filter.NoDotAndDotDot),
-            QDir.SortFlag.Name
-        )
-        for entry in entries:
-            full_path = directory.filePath(entry)
-            fi = QFileInfo(full_path)
-            item = QStandardItem(entry)
-            if fi.isDir() and not fi.isSymLink():
-                item.setIcon(QIcon("assets/icons/folder.svg"))
-                item.setData(full_path, Qt.ItemDataRole.UserRole)
-                item.setData(True, Qt.ItemDataRole.UserRole + 1)  # isFolder
-                # Add a dummy child so the folder is expandable.
-                dummy = QStandardItem("")
-                item.appendRow(dummy)
+        parent = self.node_index(folder)
+        self.changing = True
+        if len(removed) + len(added) > MAX_ROW_CHANGES:
+            self.relayout(folder, parent, removed, added, entries, first)
+        else:
+            # Last run first so earlier row numbers stay valid
+            for start, end in reversed(runs(removed)):
+                self.remove_rows(folder, parent, start, end)
+            for start, end in runs(added):
+                new_nodes = self.add_nodes(folder, entries[start - first:end - first + 1])
+                self.insert_rows(folder, parent, start, new_nodes)
+        self.changing = False
+
+    def remove_rows(self, folder, parent, start, end):
+        nodes = self.children[folder]
+        shown = self.child_shown[folder]
+        gone = nodes[start:end + 1]
+        visible = start < shown
+        if visible:
+            last = min(end, shown - 1)
+            self.beginRemoveRows(parent, start, last)
+            self.child_shown[folder] = shown - (last - start + 1)
+        del nodes[start:end + 1]
+        self.renumber(folder, start)
+        if visible:
+            self.endRemoveRows()
+        for node in gone:
+            self.forget(node)
+
+    def insert_rows(self, folder, parent, start, new_nodes):
+        nodes = self.children[folder]
+        shown = self.child_shown[folder]
+        visible = start < shown or shown == len(nodes)
+        if visible:
+            self.beginInsertRows(parent, start, start + len(new_nodes) - 1)
+            self.child_shown[folder] = shown + len(new_nodes)
+        nodes[start:start] = new_nodes
+        self.renumber(folder, start)
+        if visible:
+            self.endInsertRows()
+
+    def relayout(self, folder, parent, removed, added, entries, first):
+        """Apply a big change to a folder at once, carrying persistent indexes over by node"""
+        # No parents means the whole model
+        parents = [QPersistentModelIndex(parent)] if parent.isValid() else []
+        self.layoutAboutToBeChanged.emit(parents)
+        nodes = self.children[folder]
+        shown = self.child_shown[folder]
+        removed_set = set(removed)
+        kept = [node for row, node in enumerate(nodes) if row not in removed_set]
+        merged = array("i")
+        added_iter = iter(added)
+        next_added = next(added_iter, None)
+        kept_iter = iter(kept)
+        for row in range(len(kept) + len(added)):
+            if row == next_added:
+                merged.extend(self.add_nodes(folder, [entries[row - first]]))
+                next_added = next(added_iter, None)
             else:
-                item.setData(full_path, Qt.ItemDataRole.UserRole)
-                item.setData(False, Qt.ItemDataRole.UserRole + 1)  # isFolder
-                lower = entry.lower()
-                if lower.endswith(".py"):
-                    item.setIcon(QIcon("assets/icons/python.svg"))
-                elif lower.endswith(".js"):
-                    item.setIcon(QIcon("assets/icons/javascriptX.svg"))
-                elif lower.endswith(".java"):
-                    item.setIcon(QIcon("assets/icons/java.svg"))
-                elif lower.endswith(".css"):
-                    item.setIcon(QIcon("assets/icons/css.svg"))
-                elif lower.endswith(".html"):
-                    item.setIcon(QIcon("assets/icons/html.svg"))
-                elif lower.endswith(".ts"):
-                    item.setIcon(QIcon("assets/icons/typescript.svg"))
-                else:
-                    item.setIcon(QIcon("assets/icons/file2.svg"))
-            parent_item.appendRow(item)
+                merged.append(next(kept_iter))
+        self.child_shown[folder] = len(merged) if shown == len(nodes) else min(shown, len(merged))
+        for row in removed:
+            self.forget(nodes[row])
+        self.set_children(folder, merged)
+        old_indexes = self.persistentIndexList()
+        new_indexes = []
+        for index in old_indexes:
+            node = index.internalId()
+            if self.kinds[node] == REMOVED or self.rows[node] >= self.child_shown[self.parents[node]]:
+                new_indexes.append(QModelIndex())
+            else:
+                new_indexes.append(self.node_index(node, index.column()))
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit(parents)
+
+    def forget(self, node):
+        """Drop a removed node and everything below it"""
+        path = self.path_of(node)
+        for watched in [watched for watched in self.watched if watched == path or watched.startswith(path + os.sep)]:
+            del self.watched[watched]
+            self.watcher.removePath(watched)
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self.partial.discard(node)
+            self.changed.discard(node)
+            stack.extend(self.children.pop(node, ()))
+            self.kinds[node] = REMOVED
+            self.names[node] = ""
+            self.free.append(node)
+
+    def watch(self, folder):
+        """Follow changes to a folder, e.g. because it was expanded"""
+        path = self.path_of(folder)
+        if path in self.watched:
+            self.watched.move_to_end(path)
+            return
+        if len(self.watched) >= MAX_WATCHED_FOLDERS:
+            # The oldest watch other than the root's makes room
+            for oldest in self.watched:
+                if self.watched[oldest] != ROOT:
+                    del self.watched[oldest]
+                    self.watcher.removePath(oldest)
+                    break
+        self.watched[path] = folder
+        self.watcher.addPath(path)
+        if self.states[folder] == LISTED:
+            # It may have changed while nobody was watching
+            self.changed.add(folder)
+            if not self.refresh_timer.isActive():
+                self.refresh_timer.start()
+
+    def set_expanded(self, index, expanded):
+        """Watch a folder while it is expanded in the view"""
+        folder = self.folder_of(index)
+        if folder is None or folder == ROOT:
+            return
+        if expanded:
+            self.watch(folder)
+        else:
+            self.unwatch(folder)
+
+    def unwatch(self, folder):
+        path = self.path_of(folder)
+        if path in self.watched:
+            del self.watched[path]
+            self.watcher.removePath(path)
+
+    def on_directory_changed(self, path):
+        folder = self.watched.get(path)
+        if folder is None:
+            return
+        self.changed.add(folder)
+        # Not restarted by later changes: a long burst is still applied every REFRESH_DELAY_MS
+        if not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
+    def refresh_changed(self):
+        changed, self.changed = self.changed, set()
+        for folder in changed:
+            if self.kinds[folder] == FOLDER and self.states[folder] == LISTED:
+                self.scan(folder)
+
+    def add_rows(self, folder):
+        shown = self.child_shown[folder]
+        # Every batch makes the view lay out all expanded rows again, so
+        # batches grow with the folder to keep that from going quadratic
+        count = min(max(FETCH_BATCH_SIZE, shown), len(self.children[folder]) - shown)
+        if count > 0:
+            self.changing = True
+            self.beginInsertRows(self.node_index(folder), shown, shown + count - 1)
+            self.child_shown[folder] = shown + count
+            self.endInsertRows()
+            self.changing = False
+        if self.child_shown[folder] < len(self.children[folder]):
+            self.partial.add(folder)
+            self.fetch_timer.start()
+        else:
+            self.partial.discard(folder)
+
+    def fetch_pending(self):
+        if self.partial:
+            self.add_rows(next(iter(self.partial)))
+        else:
+            self.fetch_timer.stop()
+
+    def folder_of(self, parent):
+        """Return the folder node for a parent index, or None if it can have no children"""
+        node = parent.internalId() if parent.isValid() else ROOT
+        return node if self.kinds[node] == FOLDER else None
+
+    def index(self, row, column, parent=QModelIndex()):
+        folder = self.folder_of(parent)
+        if folder is None or column != 0 or not 0 <= row < self.child_shown[folder]:
+            return QModelIndex()
+        return self.createIndex(row, column, self.children[folder][row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.node_index(self.parents[index.internalId()])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        folder = self.folder_of(parent)
+        return 0 if folder is None else self.child_shown[folder]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        folder = self.folder_of(parent)
+        if folder is None:
+            return False
+        return self.states[folder] != LISTED or len(self.children[folder]) > 0
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalId()
+        kind = self.kinds[node]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.names[node]
+        if kind == PLACEHOLDER:
+            return None
+        if role == Qt.ItemDataRole.DecorationRole:
+            return icon_for(self.names[node], kind != FILE)
+        if role == Qt.ItemDataRole.UserRole:
+            if kind == PARENT_LINK:
+                return os.path.dirname(os.path.abspath(self.root_path.rstrip("/")))
+            return self.path_of(node)
+        if role == Qt.ItemDataRole.UserRole + 1:  # isFolder
+            return kind != FILE
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return KIND_FLAGS[self.kinds[index.internalId()]]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole and section == 0:
+            return self.header
+        return None
+
+    def canFetchMore(self, parent):
+        folder = self.folder_of(parent)
+        if folder is None or self.changing:
+            return False
+        state = self.states[folder]
+        return state == UNLISTED or (state == LISTED and self.child_shown[folder] < len(self.children[folder]))
+
+    def fetchMore(self, parent):
+        folder = self.folder_of(parent)
+        if folder is None or self.changing:
+            return
+        if self.states[folder] == UNLISTED:
+            self.list_folder(folder)
+        elif self.states[folder] == LISTED:
+            self.add_rows(folder)
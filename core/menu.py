@@ -19,6 +19,11 @@ def create_menu_bar(parent):
     open_action.triggered.connect(parent.open_file)
     file_menu.addAction(open_action)
 
+    go_to_file_action = QAction("&Go to File...", parent)
+    go_to_file_action.setShortcut("Ctrl+P")
+    go_to_file_action.triggered.connect(parent.go_to_file)
+    file_menu.addAction(go_to_file_action)
+
     save_action = QAction("&Save", parent)
     save_action.setShortcut("Ctrl+S")
     save_action.setIcon(QIcon("assets/icons/arrowdown.svg"))
@@ -70,6 +75,12 @@ def create_menu_bar(parent):
     paste_action.setShortcut("Ctrl+V")
     paste_action.triggered.connect(lambda: parent.code_tabs.currentWidget().paste() if parent.code_tabs.currentWidget() else None)
     edit_menu.addAction(paste_action)
+    edit_menu.addSeparator()
+
+    find_in_files_action = QAction("Find in &Files", parent)
+    find_in_files_action.setShortcut("Ctrl+Shift+F")
+    find_in_files_action.triggered.connect(parent.search_in_files)
+    edit_menu.addAction(find_in_files_action)
     menu_bar.addMenu(edit_menu)
 
     # View Menu
@@ -103,6 +114,9 @@ def create_menu_bar(parent):
     clear_term_action = QAction("&Clear Terminal", parent)
     clear_term_action.triggered.connect(parent.clear_terminal)
     terminal_menu.addAction(clear_term_action)
+    kill_term_action = QAction("&Kill Running Command", parent)
+    kill_term_action.triggered.connect(parent.kill_terminal_command)
+    terminal_menu.addAction(kill_term_action)
     menu_bar.addMenu(terminal_menu)
 
     # Settings as a standalone action in the menu bar
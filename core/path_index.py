@@ -0,0 +1,304 @@
+# core/path_index.py
+import os
+import re
+import heapq
+import string
+import threading
+from bisect import bisect_right
+from itertools import accumulate, compress, repeat
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from core.project_search import SKIP_DIRS
+
+# inotify watches are a shared, limited resource; the shallowest folders get them
+MAX_WATCHED_DIRS = 4000
+# Folders handed from the walker to the index at a time
+WALK_SLICE = 2000
+# Loose matches collected, shortest paths first, before ranking stops looking;
+# paths whose file name contains the query are always all found
+MAX_RANKED = 2000
+# Paths, shortest first, whose candidates go through one regex run
+CHUNK_SIZE = 16384
+# Characters whose masks are built ahead of typing
+WARM_CHARS = string.ascii_lowercase + string.digits + "._-/"
+
+
+def walk_dirs(root, stop, start=""):
+    """Yield (relative folder, file names) for every folder under root/start, skipping SKIP_DIRS"""
+    stack = [start]
+    while stack and not stop.is_set():
+        rel = stack.pop()
+        names = []
+        try:
+            with os.scandir(os.path.join(root, rel) if rel else root) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                stack.append(f"{rel}/{entry.name}" if rel else entry.name)
+                        elif entry.is_file():
+                            names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        yield rel, names
+
+
+def fuzzy_source(query):
+    """Regex source matching the query's characters in order within one line.
+
+    Each gap only skips characters other than the next one wanted, so the
+    regex never backtracks into a gap.
+    """
+    return "".join(f"[^\\n{re.escape(char)}]*{re.escape(char)}" for char in query)
+
+
+class PathIndex(QObject):
+    """Every file path under a folder, for quick open.
+
+    Paths are kept per folder, relative to the root, and flattened into a
+    list sorted by length when first searched. For each character the index
+    lazily builds a mask with one byte per path, set if the path contains
+    it, packed into an int. A query ANDs the masks of its characters, so
+    typing one more character costs at most one new mask. The surviving
+    paths are then checked for the characters' order with one regex over
+    chunks of them, shortest first, until MAX_RANKED match. Paths whose
+    file name contains the query, which rank first, are looked for in all
+    the surviving paths, so a deep one is never cut off by the limit.
+
+    Folders are walked on a background thread. Watched folders are rescanned
+    when they change, so the index is only built once per root.
+    """
+
+    ready = pyqtSignal()
+    # Emitted from walker threads: generation, {relative folder: file names}, or None when done
+    folders_loaded = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.generation = 0
+        self.stop = threading.Event()
+        self.folders = {}
+        self.loading = False
+        self.lines = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.folders_loaded.connect(self.on_folders_loaded)
+        self.warm_timer = QTimer(self)
+        self.warm_timer.setInterval(0)
+        self.warm_timer.timeout.connect(self.warm_step)
+        self.invalidate()
+
+    def set_root(self, root):
+        """Index a folder; does nothing if it already is the root"""
+        root = os.path.abspath(root)
+        if root == self.root:
+            return
+        self.stop.set()
+        self.stop = threading.Event()
+        self.generation += 1
+        self.root = root
+        self.folders = {}
+        self.invalidate()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.loading = True
+        self.load("", initial=True)
+
+    def load(self, start, initial=False):
+        root, generation, stop = self.root, self.generation, self.stop
+
+        def run():
+            folders = {}
+            for rel, names in walk_dirs(root, stop, start):
+                folders[rel] = names
+                # Hand over in slices so the first paths are searchable early
+                if len(folders) >= WALK_SLICE:
+                    self.folders_loaded.emit(generation, folders)
+                    folders = {}
+            if not stop.is_set():
+                self.folders_loaded.emit(generation, folders)
+                if initial:
+                    self.folders_loaded.emit(generation, None)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_folders_loaded(self, generation, folders):
+        if generation != self.generation:
+            return
+        if folders is None:
+            self.loading = False
+            self.watch_folders(self.folders)
+            self.ready.emit()
+            return
+        self.folders.update(folders)
+        if not self.loading:
+            # New folders found after the initial walk
+            self.watch_folders(folders)
+        self.invalidate()
+
+    def watch_folders(self, folders):
+        room = MAX_WATCHED_DIRS - len(self.watcher.directories())
+        if room <= 0:
+            return
+        folders = sorted(folders, key=lambda rel: rel.count("/"))[:room]
+        if folders:
+            self.watcher.addPaths([os.path.join(self.root, rel) if rel else self.root for rel in folders])
+
+    def on_directory_changed(self, path):
+        rel = os.path.relpath(path, self.root)
+        rel = "" if rel == "." else rel.replace(os.sep, "/")
+        names = []
+        subfolders = set()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                subfolders.add(f"{rel}/{entry.name}" if rel else entry.name)
+                        elif entry.is_file():
+                            names.append(entry.name)
+                    except OSError:
+                        # Gone since it was listed; the folder itself is still there
+                        continue
+        except OSError:
+            # Removed along with everything below it
+            self.drop_folder(rel)
+            self.invalidate()
+            return
+        self.folders[rel] = names
+        prefix = f"{rel}/" if rel else ""
+        depth = prefix.count("/")
+        known = {
+            folder for folder in self.folders
+            if folder and folder.startswith(prefix) and folder.count("/") == depth
+        }
+        for folder in known - subfolders:
+            self.drop_folder(folder)
+        for folder in subfolders - known:
+            self.load(folder)
+        self.invalidate()
+
+    def drop_folder(self, rel):
+        prefix = f"{rel}/"
+        for folder in [folder for folder in self.folders if folder == rel or folder.startswith(prefix)]:
+            del self.folders[folder]
+
+    def invalidate(self):
+        self.lines = None
+        self.lowered = None
+        self.masks = {}
+        # The last query, the indices of its matches, where its scan of the paths stopped
+        # and the indices of the paths whose file name contains it
+        self.last = ("", [], 0, [])
+
+    def paths(self):
+        """Return every relative path, shortest first"""
+        if self.lines is None:
+            lines = [
+                f"{folder}/{name}" if folder else name
+                for folder, names in self.folders.items() for name in names
+            ]
+            lines.sort(key=len)
+            self.lines = lines
+            self.lowered = [line.lower() for line in lines]
+        return self.lines
+
+    def __len__(self):
+        return len(self.paths())
+
+    def mask(self, char):
+        mask = self.masks.get(char)
+        if mask is None:
+            self.paths()
+            present = bytes(map(str.__contains__, self.lowered, repeat(char)))
+            mask = self.masks[char] = int.from_bytes(present, "little")
+        return mask
+
+    def warm(self):
+        """Build the masks of common characters over the next event loop turns"""
+        self.warm_timer.start()
+
+    def warm_step(self):
+        for char in WARM_CHARS:
+            if char not in self.masks:
+                self.mask(char)
+                return
+        self.warm_timer.stop()
+
+    def search(self, query, limit=50):
+        """Return up to limit relative paths fuzzily matching the query, best first"""
+        query = query.strip().lower().replace("\\", "/").replace("\n", "")
+        lines = self.paths()
+        if not query:
+            return lines[:limit]
+        count = len(lines)
+        combined = -1
+        for char in set(query):
+            combined &= self.mask(char)
+            if not combined:
+                return []
+        present = combined.to_bytes(count, "little")
+        source = fuzzy_source(query)
+        # A newline, then a whole line matching
+        pattern = re.compile(f"\\n({source}[^\\n]*)")
+        # The query, then the rest of a file name
+        in_name = re.compile(f"{re.escape(query)}[^\\n/]*$", re.MULTILINE)
+        previous, matches, start, names = self.last
+        if previous and query.startswith(previous):
+            # Everything scanned for the shorter query only needs its matches checked again
+            matches = self.matching(pattern, matches)
+            names = self.matching(in_name, names)
+        else:
+            matches, start, names = [], 0, None
+        while start < count and len(matches) < MAX_RANKED:
+            ids = compress(range(start, start + CHUNK_SIZE), present[start:start + CHUNK_SIZE])
+            matches.extend(self.matching(pattern, list(ids)))
+            start += CHUNK_SIZE
+        if names is None:
+            names = []
+            if "/" not in query:
+                for first in range(0, count, CHUNK_SIZE):
+                    ids = compress(range(first, first + CHUNK_SIZE), present[first:first + CHUNK_SIZE])
+                    names.extend(self.matching(in_name, list(ids)))
+        self.last = (query, matches, start, names)
+        name_pattern = re.compile(source)
+        lowered = self.lowered
+        candidates = set(matches).union(names)
+        best = heapq.nsmallest(limit, candidates, key=lambda i: self.score(lowered[i], query, name_pattern) + (i,))
+        # By index: paths differing only in case lowercase the same
+        return [lines[i] for i in best]
+
+    def matching(self, pattern, ids):
+        """Return the indices among ids whose lowercased path the pattern matches"""
+        if not ids:
+            return []
+        lowered = self.lowered
+        chunk = "\n" + "\n".join(map(lowered.__getitem__, ids))
+        # Where each path's newline is in the chunk
+        starts = list(accumulate((len(lowered[i]) + 1 for i in ids[:-1]), initial=0))
+        return [ids[bisect_right(starts, match.start()) - 1] for match in pattern.finditer(chunk)]
+
+    @staticmethod
+    def score(line, query, name_pattern):
+        """Sort key: matches in the file name first, then shorter paths"""
+        name = line[line.rfind("/") + 1:]
+        if name.startswith(query):
+            rank = 0
+        elif query in name:
+            rank = 1
+        elif name_pattern.match(name):
+            rank = 2
+        elif query in line:
+            rank = 3
+        else:
+            rank = 4
+        return rank, len(line), line
+
+    def absolute(self, rel):
+        return os.path.join(self.root, rel)
+
+    def shutdown(self):
+        self.stop.set()
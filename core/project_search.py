@@ -0,0 +1,238 @@
+# core/project_search.py
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+from core.search_worker import compile_query, search_batch
+from core.trigram_index import TrigramIndex
+
+# Folders that never hold anything worth searching
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv",
+    ".mypy_cache", ".pytest_cache", ".tox",
+}
+# Batches start small so the first hits come back quickly, then grow
+FIRST_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 256
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+# Batches submitted ahead of the workers
+MAX_IN_FLIGHT = MAX_WORKERS * 4
+# A search starts an index update at most this often
+INDEX_REFRESH_SECONDS = 30
+
+
+def walk_files(root, stop):
+    """Yield file paths under root depth-first, skipping SKIP_DIRS and symlinked folders"""
+    stack = [root]
+    while stack and not stop.is_set():
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                subfolders = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                subfolders.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        stack.extend(reversed(sorted(subfolders)))
+
+
+class ProjectSearch(QObject):
+    """Searches every file under a folder on a process pool.
+
+    Files are walked on a background thread and searched in batches by
+    worker processes; each finished batch is reported through `results`
+    as soon as it is done. Every search gets a new generation number.
+    Starting a search or calling `cancel` stops the previous one, and late
+    results from an old generation are dropped.
+
+    Literal queries only search the files the folder's trigram index lists
+    as candidates, once the index has been built. Searches keep the index
+    fresh by starting a background update every INDEX_REFRESH_SECONDS.
+    A rebuild reports its progress through `index_progress`, and every
+    update that was not stopped reports through `index_finished`.
+    """
+
+    results = pyqtSignal(int, object)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(int, int)
+    # Emitted from the index thread: files indexed, files to index
+    index_progress = pyqtSignal(int, int)
+    # Whether it was a rebuild, and an error message or ""
+    index_finished = pyqtSignal(bool, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.executor = None
+        self.stop = threading.Event()
+        self.futures = set()
+        self.lock = threading.Lock()
+        self.index = None
+        self.index_stop = threading.Event()
+        # Indexing gets its own worker so it never holds up searches
+        self.index_executor = None
+        self.index_thread = None
+
+    def start(self, root, query, regex=False, case_sensitive=False, whole_word=False):
+        """Start searching; raises re.error for an invalid regex. Returns the generation."""
+        options = {"regex": regex, "case_sensitive": case_sensitive, "whole_word": whole_word}
+        compile_query(query, **options)
+        self.cancel()
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(MAX_WORKERS)
+        index = self.index_for(root)
+        candidates = None if regex else index.candidates(query, case_sensitive)
+        stop = self.stop = threading.Event()
+        generation = self.generation
+        thread = threading.Thread(
+            target=self.run, args=(generation, stop, root, query, options, candidates), daemon=True
+        )
+        thread.start()
+        if time.monotonic() - index.last_update > INDEX_REFRESH_SECONDS:
+            self.refresh_index()
+        return generation
+
+    def index_for(self, root):
+        if self.index is None or self.index.root != root:
+            # Stop updating the previous folder's index
+            self.index_stop.set()
+            self.index_stop = threading.Event()
+            self.index = TrigramIndex(root)
+        return self.index
+
+    def refresh_index(self, rebuild=False):
+        """Bring the index up to date on a background thread"""
+        index = self.index
+        if index is None or index.updating:
+            return
+        if self.index_executor is None:
+            self.index_executor = ProcessPoolExecutor(1)
+        index.updating = True
+        previous = self.index_thread
+        self.index_thread = threading.Thread(
+            target=self.update_index, args=(index, self.index_executor, self.index_stop, rebuild, previous),
+            daemon=True
+        )
+        self.index_thread.start()
+
+    def update_index(self, index, executor, stop, rebuild=False, previous=None):
+        try:
+            if rebuild:
+                # The previous updater may still save its index; only delete the file once it has stopped
+                if previous is not None:
+                    previous.join()
+                index.delete()
+            listing = []
+            for path in walk_files(index.root, stop):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                listing.append((path, st.st_mtime_ns, st.st_size))
+            if not stop.is_set():
+                index.update(listing, executor, stop, self.index_progress.emit if rebuild else None)
+        except Exception as e:
+            if not stop.is_set():
+                self.index_finished.emit(rebuild, str(e))
+        else:
+            if not stop.is_set():
+                self.index_finished.emit(rebuild, "")
+        finally:
+            index.updating = False
+
+    def rebuild_index(self, root):
+        """Throw the folder's index away and build it again"""
+        self.index_stop.set()
+        self.index_stop = threading.Event()
+        self.index = TrigramIndex(root)
+        self.refresh_index(rebuild=True)
+
+    def mark_saved(self, path):
+        """Let the index know the editor wrote a file"""
+        if self.index is not None:
+            self.index.mark_dirty(path)
+
+    def cancel(self):
+        self.generation += 1
+        self.stop.set()
+        with self.lock:
+            futures, self.futures = self.futures, set()
+        # Outside the lock: cancelling runs the done callbacks right away
+        for future in futures:
+            future.cancel()
+
+    def run(self, generation, stop, root, query, options, candidates=None):
+        slots = threading.Semaphore(MAX_IN_FLIGHT)
+        # Batches submitted and done, files searched, and whether the walk is over
+        state = {"submitted": 0, "done": 0, "searched": 0, "walked": False}
+        batch = []
+        batch_size = FIRST_BATCH_SIZE
+
+        def finish_if_done():
+            with self.lock:
+                done = state["walked"] and state["done"] == state["submitted"]
+                if done:
+                    # Only report once
+                    state["walked"] = False
+            if done and not stop.is_set():
+                self.finished.emit(generation, state["searched"])
+
+        def on_done(future):
+            slots.release()
+            with self.lock:
+                self.futures.discard(future)
+            if not future.cancelled() and not stop.is_set() and future.exception() is None:
+                count, results = future.result()
+                state["searched"] += count
+                if results:
+                    self.results.emit(generation, results)
+                self.progress.emit(generation, state["searched"])
+            with self.lock:
+                state["done"] += 1
+            finish_if_done()
+
+        def submit(paths):
+            while not slots.acquire(timeout=0.1):
+                if stop.is_set():
+                    return False
+            with self.lock:
+                if stop.is_set():
+                    slots.release()
+                    return False
+                future = self.executor.submit(search_batch, paths, query, options)
+                self.futures.add(future)
+                state["submitted"] += 1
+            future.add_done_callback(on_done)
+            return True
+
+        paths = walk_files(root, stop) if candidates is None else candidates
+        for path in paths:
+            if stop.is_set():
+                return
+            batch.append(path)
+            if len(batch) >= batch_size:
+                if not submit(batch):
+                    return
+                batch = []
+                batch_size = min(batch_size * 2, MAX_BATCH_SIZE)
+        if batch and not submit(batch):
+            return
+        with self.lock:
+            state["walked"] = True
+        finish_if_done()
+
+    def shutdown(self):
+        self.cancel()
+        self.index_stop.set()
+        for executor in (self.executor, self.index_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self.index_executor = None
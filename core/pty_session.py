@@ -0,0 +1,299 @@
+# core/pty_session.py
+import os
+import re
+import sys
+import signal
+from PyQt6.QtCore import QObject, QProcess, QSocketNotifier, QTimer, pyqtSignal
+
+if sys.platform != "win32":
+    import fcntl
+    import struct
+    import termios
+
+# The shell prints this after every command, with the exit code and working folder
+MARKER = b"\x1b]777;open-code;"
+MARKER_PATTERN = re.compile(rb"\x1b\]777;open-code;(-?\d*);([^\x07\x1b]*)(?:\x07|\x1b\\)")
+# A marker longer than this is taken for ordinary output
+MAX_MARKER_LENGTH = 4096
+# Bytes read from the pty at a time, and reads per wake-up before the event loop gets a turn
+READ_SIZE = 64 * 1024
+MAX_READS = 16
+# How often an exited shell is checked for until it can be reaped
+REAP_INTERVAL_MS = 50
+
+# Sourced by the shell when it starts: the user's settings, then the marker instead of a prompt
+BASH_INIT = (
+    "[ -f ~/.bashrc ] && . ~/.bashrc; PS1=''; PS2=''; "
+    "PROMPT_COMMAND='printf \"\\033]777;open-code;%s;%s\\007\" \"$?\" \"$PWD\"'\n"
+)
+# cmd.exe has no exit code in its prompt; it is reported as 0
+CMD_PROMPT = "$E]777;open-code;;$P$E\\"
+
+
+def quote_lines(command):
+    """Quote a multi-line command as one line the shell runs as a whole"""
+    escaped = command.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
+    return f"eval $'{escaped}'"
+
+
+class ShellSession(QObject):
+    """A long-lived shell that runs the terminal's commands one after another.
+
+    Exported variables, aliases and the working folder carry over from one
+    command to the next. Rather than a prompt, the shell prints a marker
+    after each command, which is taken out of the output and reported
+    through `command_finished`. Output up to the first marker, from the
+    shell starting up, is dropped.
+    """
+
+    output = pyqtSignal(bytes)
+    ready = pyqtSignal(str)
+    # exit code, working folder
+    command_finished = pyqtSignal(int, str)
+    exited = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.started = False
+        # Cleared while the terminal is behind on drawing
+        self.reading = True
+        self.carry = b""
+        # The terminal's own echo of the last command line, taken out of the output
+        self.expected_echo = b""
+
+    def run(self, command):
+        """Send a command line to the shell"""
+        line = quote_lines(command) if "\n" in command else command
+        if self.echoes_input:
+            self.expected_echo = (line + "\r\n").encode("utf-8")
+        self.write((line + "\n").encode("utf-8"))
+
+    def process_data(self, data):
+        """Split data read from the shell into output and markers"""
+        data = self.carry + data
+        self.carry = b""
+        while True:
+            start = data.find(MARKER)
+            if start == -1:
+                break
+            match = MARKER_PATTERN.match(data, start)
+            if match is None:
+                if len(data) - start < MAX_MARKER_LENGTH and not re.search(rb"[\x07\x1b]", data[start + len(MARKER):]):
+                    # The rest of the marker is still to come
+                    self.carry = data[start:]
+                    data = data[:start]
+                    break
+                self.emit_output(data[:start + 1])
+                data = data[start + 1:]
+                continue
+            self.emit_output(data[:start])
+            data = data[match.end():]
+            self.on_marker(int(match.group(1) or 0), os.fsdecode(match.group(2)))
+        # Keep the start of a marker cut off at the end
+        for length in range(min(len(MARKER) - 1, len(data)), 0, -1):
+            if data.endswith(MARKER[:length]):
+                self.carry = data[-length:] + self.carry
+                data = data[:-length]
+                break
+        self.emit_output(data)
+
+    def emit_output(self, data):
+        if not data or not self.started:
+            return
+        if self.expected_echo:
+            expected = self.expected_echo
+            length = min(len(data), len(expected))
+            if data[:length] == expected[:length]:
+                self.expected_echo = expected[length:]
+                data = data[length:]
+            else:
+                self.expected_echo = b""
+            if not data:
+                return
+        self.output.emit(data)
+
+    def on_marker(self, exit_code, folder):
+        self.expected_echo = b""
+        if not self.started:
+            self.started = True
+            self.ready.emit(folder)
+        else:
+            self.command_finished.emit(exit_code, folder)
+
+
+class PtySession(ShellSession):
+    """bash on a pseudo-terminal, read through a QSocketNotifier on the pty master.
+
+    Programs see a real terminal, so they keep their colors and can ask for
+    input, and Ctrl+C reaches them as SIGINT through the terminal driver.
+    """
+
+    echoes_input = True
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pid = None
+        self.fd = None
+        self.pending_input = b""
+        self.read_notifier = None
+        self.write_notifier = None
+        self.reap_timer = QTimer(self)
+        self.reap_timer.setInterval(REAP_INTERVAL_MS)
+        self.reap_timer.timeout.connect(self.reap)
+
+    def start(self, folder):
+        # No pager: nobody would be there to quit it
+        env = dict(os.environ, TERM="xterm-256color", PAGER="cat", GIT_PAGER="cat")
+        pid, fd = os.forkpty()
+        if pid == 0:
+            try:
+                os.chdir(folder)
+                os.execvpe("bash", ["bash", "--norc", "--noediting", "-i"], env)
+            finally:
+                os._exit(127)
+        self.pid, self.fd = pid, fd
+        os.set_blocking(fd, False)
+        self.read_notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read, self)
+        self.read_notifier.activated.connect(self.on_readable)
+        self.write_notifier = QSocketNotifier(fd, QSocketNotifier.Type.Write, self)
+        self.write_notifier.setEnabled(False)
+        self.write_notifier.activated.connect(self.flush_input)
+        self.write(BASH_INIT.encode("utf-8"))
+
+    def write(self, data):
+        if self.fd is None:
+            return
+        self.pending_input += data
+        self.flush_input()
+
+    def flush_input(self):
+        try:
+            written = os.write(self.fd, self.pending_input)
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            written = len(self.pending_input)
+        self.pending_input = self.pending_input[written:]
+        # The terminal driver's input queue is full; go on once it has room
+        self.write_notifier.setEnabled(bool(self.pending_input))
+
+    def set_reading(self, reading):
+        """Stop or go on reading; unread output waits in the pty, which blocks the program once full"""
+        self.reading = reading
+        if self.fd is not None:
+            self.read_notifier.setEnabled(reading)
+
+    def on_readable(self):
+        for _ in range(MAX_READS):
+            if self.fd is None or not self.reading:
+                return
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                return
+            except OSError:
+                # EIO: the shell and everything it started are gone
+                data = b""
+            if not data:
+                self.close()
+                return
+            self.process_data(data)
+
+    def interrupt(self):
+        """Ctrl+C: the terminal driver sends SIGINT to the running program"""
+        self.write(b"\x03")
+
+    def kill(self):
+        """SIGKILL the running program's process group, leaving the shell"""
+        if self.fd is None:
+            return
+        try:
+            group = os.tcgetpgrp(self.fd)
+            if group != self.pid:
+                os.killpg(group, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def resize(self, rows, columns):
+        if self.fd is not None:
+            fcntl.ioctl(self.fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+
+    def close(self):
+        """Hang up on the shell; `exited` is emitted once it is reaped"""
+        if self.fd is None:
+            return
+        self.read_notifier.setEnabled(False)
+        self.write_notifier.setEnabled(False)
+        os.close(self.fd)
+        self.fd = None
+        try:
+            os.kill(self.pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+        self.reap()
+
+    def reap(self):
+        try:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            pid, status = self.pid, 0
+        if pid == 0:
+            # Not gone yet; poll rather than wait
+            self.reap_timer.start()
+            return
+        self.reap_timer.stop()
+        self.exited.emit(os.waitstatus_to_exitcode(status))
+
+
+class ProcessSession(ShellSession):
+    """cmd.exe through QProcess pipes, where there are no pseudo-terminals.
+
+    Programs see pipes rather than a terminal, and cannot be interrupted on
+    their own: Ctrl+C ends the whole shell, and a new one is started.
+    """
+
+    echoes_input = False
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.process = QProcess(self)
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.process.readyReadStandardOutput.connect(self.read_output)
+        self.process.finished.connect(lambda code, _: self.exited.emit(code))
+
+    def read_output(self):
+        if self.reading:
+            self.process_data(bytes(self.process.readAllStandardOutput()))
+
+    def set_reading(self, reading):
+        """Stop or go on taking output; QProcess keeps what arrives meanwhile"""
+        self.reading = reading
+        if reading and self.process.bytesAvailable():
+            self.read_output()
+
+    def start(self, folder):
+        self.process.setWorkingDirectory(folder)
+        self.process.start("cmd.exe", ["/Q", "/K", f"prompt {CMD_PROMPT}"])
+
+    def write(self, data):
+        # Keys come as a terminal would send them, with Enter as a carriage return
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        self.process.write(data.replace(b"\n", b"\r\n"))
+
+    def interrupt(self):
+        self.process.kill()
+
+    def kill(self):
+        self.process.kill()
+
+    def resize(self, rows, columns):
+        pass
+
+    def close(self):
+        self.process.kill()
+
+
+def create_session(parent=None):
+    if sys.platform == "win32":
+        return ProcessSession(parent)
+    return PtySession(parent)
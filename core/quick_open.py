@@ -0,0 +1,82 @@
+# core/quick_open.py
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PyQt6.QtCore import Qt, pyqtSignal
+
+MAX_SHOWN = 50
+
+
+class QuickOpen(QFrame):
+    """Ctrl+P popup: type part of a file's path, Enter opens the best match"""
+
+    fileChosen = pyqtSignal(str)
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent, Qt.WindowType.Popup)
+        self.index = index
+        self.index.ready.connect(self.on_index_ready)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.query_edit = QLineEdit(self)
+        self.query_edit.setPlaceholderText("Go to file...")
+        self.query_edit.textChanged.connect(self.refresh)
+        self.query_edit.returnPressed.connect(self.open_current)
+        self.query_edit.installEventFilter(self)
+        layout.addWidget(self.query_edit)
+        self.status_label = QLabel(self)
+        layout.addWidget(self.status_label)
+        self.results = QListWidget(self)
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results)
+
+    def popup(self, root):
+        """Show over the top of the parent window, reusing the index if root has not changed"""
+        self.index.set_root(root)
+        window = self.parentWidget().window()
+        width = min(600, window.width() - 40)
+        top_left = window.mapToGlobal(window.rect().topLeft())
+        self.setGeometry(top_left.x() + (window.width() - width) // 2, top_left.y() + 60, width, 360)
+        self.query_edit.selectAll()
+        self.refresh()
+        self.show()
+        self.query_edit.setFocus()
+        self.index.warm()
+
+    def on_index_ready(self):
+        if self.isVisible():
+            self.refresh()
+
+    def refresh(self):
+        query = self.query_edit.text()
+        self.results.clear()
+        for rel in self.index.search(query, MAX_SHOWN):
+            item = QListWidgetItem(rel)
+            item.setToolTip(rel)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        if self.index.loading:
+            self.status_label.setText(f"Indexing… {len(self.index)} files so far")
+        elif query and not self.results.count():
+            self.status_label.setText("No matching files")
+        else:
+            self.status_label.setText(f"{len(self.index)} files")
+
+    def eventFilter(self, obj, event):
+        # Up/Down in the query field move through the results
+        if obj is self.query_edit and event.type() == event.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+                self.results.keyPressEvent(event)
+                return True
+        return super().eventFilter(obj, event)
+
+    def open_current(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.open_item(item)
+
+    def open_item(self, item):
+        self.hide()
+        self.fileChosen.emit(self.index.absolute(item.text()))
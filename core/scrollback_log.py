@@ -0,0 +1,132 @@
+# core/scrollback_log.py
+import re
+import zlib
+import tempfile
+from array import array
+
+# Spilled lines are gathered into segments of about this many bytes before being compressed
+SEGMENT_SIZE = 256 * 1024
+# Bits in each segment's filter of the trigrams it contains: 8 KiB a segment
+FILTER_BITS = 1 << 16
+TRIGRAM = re.compile(b"...", re.DOTALL)
+
+
+def trigram_filter(data):
+    """Return a bit set with one bit for every lowercased trigram in data; others can share it"""
+    data = data.lower()
+    trigrams = set(TRIGRAM.findall(data))
+    trigrams.update(TRIGRAM.findall(data, 1))
+    trigrams.update(TRIGRAM.findall(data, 2))
+    bits = bytearray(FILTER_BITS // 8)
+    for trigram in trigrams:
+        bit = hash(trigram) % FILTER_BITS
+        bits[bit >> 3] |= 1 << (bit & 7)
+    return bytes(bits)
+
+
+def may_contain(bits, trigrams):
+    for trigram in trigrams:
+        bit = hash(trigram) % FILTER_BITS
+        if not bits[bit >> 3] >> (bit & 7) & 1:
+            return False
+    return True
+
+
+class ScrollbackLog:
+    """Terminal lines that no longer fit in the terminal, kept in a temporary file.
+
+    Lines are appended as UTF-8 and written out in zlib-compressed segments
+    of about SEGMENT_SIZE bytes. For each segment its file offset, the
+    number of its first line and a filter of the trigrams it contains are
+    kept in memory, about 3% of its text. A search only reads and
+    decompresses the segments whose filter has every trigram of the query,
+    newest first, and stops once it has enough lines; a match's line
+    number comes from its segment instead of counting from the start.
+    """
+
+    def __init__(self):
+        self.file = None
+        self.clear()
+
+    def clear(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        # Per segment: offset in the file, and the number of its first line
+        self.offsets = array("q")
+        self.first_lines = array("q")
+        self.filters = []
+        self.size = 0
+        self.pending = bytearray()
+        self.pending_first_line = 0
+        self.line_count = 0
+
+    def __len__(self):
+        return self.line_count
+
+    def append(self, text):
+        """Add whole lines"""
+        if not text.endswith("\n"):
+            text += "\n"
+        data = text.encode("utf-8", errors="replace")
+        self.pending += data
+        self.line_count += data.count(b"\n")
+        if len(self.pending) >= SEGMENT_SIZE:
+            self.write_segment()
+
+    def write_segment(self):
+        if self.file is None:
+            self.file = tempfile.TemporaryFile(prefix="open-code-terminal-", suffix=".log")
+        compressed = zlib.compress(bytes(self.pending), 1)
+        self.file.seek(self.size)
+        self.file.write(compressed)
+        self.offsets.append(self.size)
+        self.first_lines.append(self.pending_first_line)
+        self.filters.append(trigram_filter(self.pending))
+        self.size += len(compressed)
+        self.pending = bytearray()
+        self.pending_first_line = self.line_count
+
+    def segments(self, trigrams):
+        """Yield (first line number, text bytes) for the segments that may contain all trigrams, newest first"""
+        if self.pending:
+            yield self.pending_first_line, bytes(self.pending)
+        if self.offsets:
+            self.file.flush()
+        for index in range(len(self.offsets) - 1, -1, -1):
+            if not may_contain(self.filters[index], trigrams):
+                continue
+            offset = self.offsets[index]
+            end = self.offsets[index + 1] if index + 1 < len(self.offsets) else self.size
+            self.file.seek(offset)
+            yield self.first_lines[index], zlib.decompress(self.file.read(end - offset))
+
+    def search(self, query, limit):
+        """Return the last limit (line index, line) pairs containing query, ignoring ASCII case"""
+        data = query.encode("utf-8")
+        pattern = re.compile(re.escape(data), re.IGNORECASE)
+        data = data.lower()
+        trigrams = {data[i:i + 3] for i in range(len(data) - 2)}
+        # Newest segment first; each one's lines are in order
+        found = []
+        count = 0
+        for first_line, data in self.segments(trigrams):
+            lines = []
+            line, counted = first_line, 0
+            match = pattern.search(data)
+            while match:
+                start = data.rfind(b"\n", 0, match.start()) + 1
+                end = data.find(b"\n", match.end())
+                if end == -1:
+                    end = len(data)
+                line += data.count(b"\n", counted, start)
+                counted = start
+                lines.append((line, data[start:end].decode("utf-8", errors="replace")))
+                # One result per line
+                match = pattern.search(data, end + 1)
+            found.append(lines)
+            count += len(lines)
+            if count >= limit:
+                break
+        found = [pair for lines in reversed(found) for pair in lines]
+        return found[max(0, len(found) - limit):]
@@ -0,0 +1,172 @@
+# core/search_panel.py
+import os
+import re
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QToolButton, QTreeWidget, QTreeWidgetItem
+)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from core.search_bar import SearchBar
+from core.project_search import ProjectSearch
+
+# Typing pause before a search starts; the running one stops at once
+SEARCH_DELAY_MS = 150
+MAX_SHOWN_MATCHES = 20000
+
+
+class SearchPanel(QWidget):
+    """Find in files: a search bar, options and results streamed in as files finish"""
+
+    # path, line (0-based), column
+    resultActivated = pyqtSignal(str, int, int)
+
+    def __init__(self, root_for, parent=None):
+        super().__init__(parent)
+        # Returns the folder to search, i.e. the file explorer's root
+        self.root_for = root_for
+        self.search = ProjectSearch(self)
+        self.search.results.connect(self.on_results)
+        self.search.progress.connect(self.on_progress)
+        self.search.finished.connect(self.on_finished)
+        self.search.index_progress.connect(self.on_index_progress)
+        self.search.index_finished.connect(self.on_index_finished)
+        self.generation = None
+        # A search is running; index news waits rather than replace its status
+        self.searching = False
+        self.root = ""
+        self.match_count = 0
+        self.file_count = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        bar_layout = QHBoxLayout()
+        self.search_bar = SearchBar(self)
+        self.search_bar.textChanged.connect(self.on_query_changed)
+        self.search_bar.returnPressed.connect(self.start_search)
+        bar_layout.addWidget(self.search_bar, 1)
+        self.case_button = self.option_button("Aa", "Match Case")
+        self.word_button = self.option_button("ab", "Match Whole Word")
+        self.regex_button = self.option_button(".*", "Use Regular Expression")
+        for button in (self.case_button, self.word_button, self.regex_button):
+            bar_layout.addWidget(button)
+        self.rebuild_button = QToolButton(self)
+        self.rebuild_button.setText("⟳")
+        self.rebuild_button.setToolTip("Rebuild Search Index")
+        self.rebuild_button.clicked.connect(self.rebuild_index)
+        bar_layout.addWidget(self.rebuild_button)
+        layout.addLayout(bar_layout)
+
+        self.status_label = QLabel(self)
+        layout.addWidget(self.status_label)
+        self.results_tree = QTreeWidget(self)
+        self.results_tree.setHeaderHidden(True)
+        self.results_tree.setUniformRowHeights(True)
+        self.results_tree.itemActivated.connect(self.on_item_activated)
+        layout.addWidget(self.results_tree, 1)
+
+        self.delay_timer = QTimer(self)
+        self.delay_timer.setSingleShot(True)
+        self.delay_timer.setInterval(SEARCH_DELAY_MS)
+        self.delay_timer.timeout.connect(self.start_search)
+
+    def option_button(self, text, tooltip):
+        button = QToolButton(self)
+        button.setText(text)
+        button.setToolTip(tooltip)
+        button.setCheckable(True)
+        button.toggled.connect(self.on_query_changed)
+        return button
+
+    def focus_search(self):
+        self.search_bar.setFocus()
+        self.search_bar.selectAll()
+
+    def on_query_changed(self):
+        self.search.cancel()
+        self.generation = None
+        self.searching = False
+        self.delay_timer.start()
+
+    def start_search(self):
+        self.delay_timer.stop()
+        self.searching = False
+        self.results_tree.clear()
+        self.match_count = 0
+        self.file_count = 0
+        query = self.search_bar.text()
+        if not query:
+            self.search.cancel()
+            self.generation = None
+            self.status_label.clear()
+            return
+        self.root = self.root_for()
+        try:
+            self.generation = self.search.start(
+                self.root, query,
+                regex=self.regex_button.isChecked(),
+                case_sensitive=self.case_button.isChecked(),
+                whole_word=self.word_button.isChecked(),
+            )
+        except re.error as e:
+            self.generation = None
+            self.status_label.setText(f"Invalid regular expression: {e}")
+            return
+        self.searching = True
+        self.status_label.setText("Searching…")
+
+    def rebuild_index(self):
+        self.search.rebuild_index(self.root_for())
+        self.status_label.setText("Rebuilding search index…")
+
+    def on_results(self, generation, results):
+        if generation != self.generation or self.match_count >= MAX_SHOWN_MATCHES:
+            return
+        self.results_tree.setUpdatesEnabled(False)
+        for path, matches in results:
+            file_item = QTreeWidgetItem([f"{os.path.relpath(path, self.root)} ({len(matches)})"])
+            file_item.setData(0, Qt.ItemDataRole.UserRole, (path, 0, 0))
+            file_item.setToolTip(0, path)
+            children = []
+            for line, column, length, preview in matches:
+                child = QTreeWidgetItem([f"{line + 1}: {preview.strip()}"])
+                child.setData(0, Qt.ItemDataRole.UserRole, (path, line, column))
+                children.append(child)
+            file_item.addChildren(children)
+            self.results_tree.addTopLevelItem(file_item)
+            file_item.setExpanded(True)
+            self.match_count += len(matches)
+            self.file_count += 1
+            if self.match_count >= MAX_SHOWN_MATCHES:
+                break
+        self.results_tree.setUpdatesEnabled(True)
+
+    def on_progress(self, generation, searched):
+        if generation == self.generation:
+            self.status_label.setText(
+                f"Searching… {self.match_count} results in {self.file_count} files ({searched} searched)"
+            )
+
+    def on_finished(self, generation, searched):
+        if generation != self.generation:
+            return
+        self.searching = False
+        more = "+" if self.match_count >= MAX_SHOWN_MATCHES else ""
+        self.status_label.setText(f"{self.match_count}{more} results in {self.file_count} files ({searched} searched)")
+
+    def on_index_progress(self, indexed, total):
+        if not self.searching:
+            self.status_label.setText(f"Rebuilding search index… {indexed} of {total} files")
+
+    def on_index_finished(self, rebuild, error):
+        if self.searching:
+            return
+        if error:
+            self.status_label.setText(f"Could not update search index: {error}")
+        elif rebuild:
+            self.status_label.setText("Search index rebuilt")
+
+    def on_item_activated(self, item, column):
+        path, line, text_column = item.data(0, Qt.ItemDataRole.UserRole)
+        self.resultActivated.emit(path, line, text_column)
+
+    def shutdown(self):
+        self.search.shutdown()
@@ -0,0 +1,117 @@
+# core/search_worker.py
+# Runs in the project search worker processes; keep it free of Qt imports.
+import os
+import re
+from array import array
+
+BINARY_SNIFF_SIZE = 8192
+MAX_FILE_SIZE = 20 * 1024 * 1024
+MAX_MATCHES_PER_FILE = 1000
+MAX_PREVIEW_LENGTH = 200
+
+_patterns = {}
+_TRIGRAM = re.compile(rb"...", re.DOTALL)
+
+# File states reported by index_batch
+INDEXED, SKIPPED, UNREADABLE = 0, 1, 2
+
+
+def compile_query(query, regex=False, case_sensitive=False, whole_word=False):
+    """Compile the search text and options to a pattern; raises re.error for a bad regex"""
+    key = (query, regex, case_sensitive, whole_word)
+    pattern = _patterns.get(key)
+    if pattern is None:
+        source = query if regex else re.escape(query)
+        if whole_word:
+            source = r"\b(?:%s)\b" % source
+        flags = re.MULTILINE
+        if not case_sensitive:
+            flags |= re.IGNORECASE
+        if len(_patterns) > 64:
+            _patterns.clear()
+        pattern = _patterns[key] = re.compile(source, flags)
+    return pattern
+
+
+def search_file(path, pattern):
+    """Return [(line, column, length, preview)] for a file, or None if it is binary or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(MAX_FILE_SIZE + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_FILE_SIZE or b"\0" in data[:BINARY_SNIFF_SIZE]:
+        return None
+    text = data.decode("utf-8", errors="replace")
+    if pattern.search(text) is None:
+        return []
+    matches = []
+    line = 0
+    counted_to = 0
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        line += text.count("\n", counted_to, start)
+        counted_to = start
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end == -1:
+            line_end = len(text)
+        preview = text[line_start:line_end].rstrip("\r")[:MAX_PREVIEW_LENGTH]
+        matches.append((line, start - line_start, min(end, line_end) - start, preview))
+        if len(matches) >= MAX_MATCHES_PER_FILE:
+            break
+    return matches
+
+
+def search_batch(paths, query, options):
+    """Search a batch of files; return the number searched and [(path, matches)] with hits"""
+    pattern = compile_query(query, **options)
+    results = []
+    for path in paths:
+        matches = search_file(path, pattern)
+        if matches:
+            results.append((path, matches))
+    return len(paths), results
+
+
+def file_trigrams(data):
+    """Return the set of lowercased 3-byte sequences in data"""
+    data = data.lower()
+    trigrams = set(_TRIGRAM.findall(data))
+    trigrams.update(_TRIGRAM.findall(data, 1))
+    trigrams.update(_TRIGRAM.findall(data, 2))
+    return trigrams
+
+
+def index_batch(items):
+    """Index (file_id, path) pairs, given in ascending id order, for the trigram index.
+
+    Returns {trigram: (first file id, array of gaps to the following ids)}
+    for the batch and a list of (file_id, mtime, size, state) for every file.
+    """
+    postings = {}
+    files = []
+    for file_id, path in items:
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read(MAX_FILE_SIZE + 1)
+        except OSError:
+            files.append((file_id, 0, 0, UNREADABLE))
+            continue
+        if len(data) > MAX_FILE_SIZE or b"\0" in data[:BINARY_SNIFF_SIZE]:
+            # Never searched, so never a candidate
+            files.append((file_id, st.st_mtime_ns, st.st_size, SKIPPED))
+            continue
+        for trigram in file_trigrams(data):
+            posting = postings.get(trigram)
+            if posting is None:
+                postings[trigram] = [file_id, array("H"), file_id]
+            else:
+                # Batches are small, so gaps always fit
+                posting[1].append(file_id - posting[2])
+                posting[2] = file_id
+        files.append((file_id, st.st_mtime_ns, st.st_size, INDEXED))
+    return {trigram: (first, gaps) for trigram, (first, gaps, _) in postings.items()}, files
@@ -1,30 +1,101 @@
 import os
 import sys
 import shlex
+import codecs
+import getpass
 from PyQt6.QtWidgets import QTextEdit, QApplication, QMainWindow, QVBoxLayout, QWidget
-from PyQt6.QtGui import QTextCharFormat, QFont, QColor, QTextCursor, QFontDatabase
-from PyQt6.QtCore import Qt, QProcess
+from PyQt6.QtGui import QFont, QColor, QTextCursor, QFontDatabase, QKeySequence
+from PyQt6.QtCore import Qt, QTimer, QCoreApplication, pyqtSignal
+from core.scrollback_log import ScrollbackLog
+from core.input_line import InputLine
+from core.pty_session import create_session
+from core.ansi_parser import (
+    AnsiParser, format_for, PLAIN, TEXT, CARRIAGE_RETURN, BACKSPACE, CURSOR_UP, CURSOR_DOWN,
+    CURSOR_FORWARD, CURSOR_BACK, CURSOR_COLUMN, ERASE_LINE, ERASE_DISPLAY
+)
+
+# Process output is gathered and drawn at most this often (about 60 Hz)
+FLUSH_INTERVAL_MS = 16
+# Characters drawn per flush; a backlog is drawn over the next event loop turns so keys still get through
+MAX_FLUSH_CHARS = 64 * 1024
+# Past this much undrawn output the shell is no longer read until drawing catches up;
+# the program then blocks writing to its full terminal instead of output being lost
+MAX_PENDING_CHARS = 1024 * 1024
+# Lines kept in the terminal; older ones move to a log on disk
+SCROLLBACK_LINES = 10000
+# Matches shown by the search command, the most recent ones
+MAX_SEARCH_RESULTS = 200
+# Looked up once: apply_output runs them for every carriage return and erase
+START_OF_BLOCK = QTextCursor.MoveOperation.StartOfBlock
+END_OF_BLOCK = QTextCursor.MoveOperation.EndOfBlock
+KEEP_ANCHOR = QTextCursor.MoveMode.KeepAnchor
+
+# What a terminal sends for keys that have no text of their own
+KEY_SEQUENCES = {
+    Qt.Key.Key_Return: b"\r", Qt.Key.Key_Enter: b"\r", Qt.Key.Key_Backspace: b"\x7f",
+    Qt.Key.Key_Tab: b"\t", Qt.Key.Key_Escape: b"\x1b", Qt.Key.Key_Up: b"\x1b[A",
+    Qt.Key.Key_Down: b"\x1b[B", Qt.Key.Key_Right: b"\x1b[C", Qt.Key.Key_Left: b"\x1b[D",
+    Qt.Key.Key_Home: b"\x1b[H", Qt.Key.Key_End: b"\x1b[F", Qt.Key.Key_Delete: b"\x1b[3~",
+    Qt.Key.Key_PageUp: b"\x1b[5~", Qt.Key.Key_PageDown: b"\x1b[6~",
+}
+
+
+def utf16_length(text):
+    """Length of text in document positions, which count UTF-16 code units"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def key_bytes(event):
+    """Return what a terminal would send to the program for a key press"""
+    sequence = KEY_SEQUENCES.get(event.key())
+    if sequence is not None:
+        return sequence
+    if event.modifiers() & Qt.KeyboardModifier.ControlModifier and Qt.Key.Key_A <= event.key() <= Qt.Key.Key_Z:
+        # Ctrl+A is 1, Ctrl+Z is 26
+        return bytes([event.key() - Qt.Key.Key_A + 1])
+    return event.text().encode("utf-8")
+
 
 class Terminal(QTextEdit):
-    def __init__(self, parent=None):
+    # The shell's working folder, after each command
+    folder_changed = pyqtSignal(str)
+    # The exit command was entered
+    exit_requested = pyqtSignal()
+
+    def __init__(self, parent=None, scrollback_lines=SCROLLBACK_LINES):
         super().__init__(parent)
+        self.scrollback_lines = scrollback_lines
+        # Trimming waits for this many extra lines, so it happens once per batch of them
+        self.trim_slack = max(1, scrollback_lines // 10)
+        self.scrollback_log = ScrollbackLog()
         # Initialize state variables
         self.current_directory = os.getcwd()
-        self.username = os.getlogin()
+        self.username = getpass.getuser()
         self.hostname = "localhost"
-        self.command_history = []
-        self.history_index = -1
-        self.current_command = ""
-        self.locked = False
-        self.process = QProcess(self)
+        # The command being typed, drawn after the prompt as the document's last line
+        self.input_line = InputLine()
+        self.input_active = False
+        self.input_length = 0
+        self.prompt_text = ""
+        # Where show_input started adding, so hiding takes off exactly what it added
+        self.input_start = 0
+        # A command is running: keys go to it rather than to the prompt
+        self.running = False
+        self.closing = False
         self.pending_lines = []
         self.prompt_position = 0
+        # Output read from the process but not drawn yet
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.pending_output = []
+        self.pending_chars = 0
+        # Exit code of a finished command whose output is still being drawn
+        self.finished_code = None
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush_output)
 
-        # Setup appearance and process
+        # Setup appearance
         self.setup_appearance()
-        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
-        self.process.readyReadStandardOutput.connect(self.read_output)
-        self.process.finished.connect(self.process_finished)
 
         # Define color palette
         self.colors = {
@@ -35,10 +106,76 @@ class Terminal(QTextEdit):
             "warning": QColor("#f1fa8c"),
             "success": QColor("#50fa7b")
         }
+        # Process output is parsed as a stream, and written where the process last left the cursor
+        self.output_parser = AnsiParser(self.colors["output"])
+        self.output_cursor = None
 
         # Display welcome message
         self.append_text("Welcome to Advanced IDE Terminal\n", color="success", parse_ansi=False)
         self.display_prompt()
+        self.start_session()
+
+    def start_session(self):
+        """Start the shell that runs this terminal's commands."""
+        self.session = create_session(self)
+        self.session.output.connect(self.feed)
+        self.session.command_finished.connect(self.on_command_finished)
+        self.session.exited.connect(self.on_session_exited)
+        try:
+            self.session.start(self.current_directory)
+        except OSError as e:
+            self.session = None
+            self.append_text(f"Error starting shell: {e}\n", color="error", parse_ansi=False)
+            return
+        self.resize_session()
+
+    def resize_session(self):
+        """Tell programs how many rows and columns fit in the terminal."""
+        if self.session is None:
+            return
+        metrics = self.fontMetrics()
+        columns = self.viewport().width() // max(1, metrics.horizontalAdvance("M"))
+        rows = self.viewport().height() // max(1, metrics.lineSpacing())
+        self.session.resize(max(rows, 5), max(columns, 20))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resize_session()
+
+    def on_session_exited(self, exit_code):
+        if self.closing:
+            return
+        session = self.session
+        session.deleteLater()
+        self.discard_output()
+        self.finished_code = None
+        self.running = False
+        if not session.started:
+            # Starting again would most likely fail again
+            self.session = None
+            self.append_text(f"\n[Shell could not be started (exit code {exit_code})]\n",
+                             color="error", parse_ansi=False)
+        else:
+            self.append_text(f"\n[Shell exited with code {exit_code}; started a new one]\n",
+                             color="warning", parse_ansi=False)
+            self.start_session()
+        self.display_prompt()
+
+    def shutdown(self):
+        """Hang up on the shell without waiting for it, e.g. because the tab is closing."""
+        self.closing = True
+        session, self.session = self.session, None
+        if session is not None:
+            # Outlive the terminal until the shell has been reaped
+            session.setParent(QCoreApplication.instance())
+            session.exited.connect(session.deleteLater)
+            session.close()
+
+    def kill_command(self):
+        """Kill the running command, and whatever it started, outright."""
+        if self.running and self.session is not None:
+            self.discard_output()
+            self.session.kill()
 
     def setup_appearance(self):
         """Configure the terminal's modern styling."""
@@ -47,103 +184,334 @@ class Terminal(QTextEdit):
         font = QFont(font_name, 10)
         font.setStyleHint(QFont.StyleHint.Monospace)
         self.setFont(font)
+        # Output is not undoable; keeping it on the undo stack would double its memory
+        self.setUndoRedoEnabled(False)
         self.setStyleSheet("QTextEdit { background-color: #282a36; color: #50fa7b; border: none; padding: 8px; }")
         self.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
 
-    def display_prompt(self):
-        """Display the command prompt and track its position."""
-        dir_name = os.path.basename(self.current_directory) or self.current_directory
-        prompt = f"{self.username}@{self.hostname}:{dir_name}$ "
-        self.append_text(prompt, color="prompt", parse_ansi=False)
+    def display_prompt(self, prompt=None):
+        """Display the command prompt, or a continuation prompt, and the command line after it."""
+        if prompt is None:
+            dir_name = os.path.basename(self.current_directory) or self.current_directory
+            prompt = f"{self.username}@{self.hostname}:{dir_name}$ "
+        self.prompt_text = prompt
+        self.show_input()
+
+    def show_input(self, new_line=False):
+        self.hide_input()
+        self.input_start = self.document().characterCount() - 1
+        if new_line and self.document().lastBlock().text():
+            self.append_text("\n", parse_ansi=False)
+        self.append_text(self.prompt_text, color="prompt", parse_ansi=False)
         self.prompt_position = self.textCursor().position()
-        self.move_cursor_to_end()
+        self.input_length = 0
+        self.input_active = True
+        self.render_input()
+
+    def hide_input(self):
+        """Take the prompt and command line off the end; returns whether they were shown."""
+        if not self.input_active:
+            return False
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(self.input_start)
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self.input_active = False
+        return True
+
+    def render_input(self):
+        """Redraw the command line after the prompt, and only that, and place the cursor in it."""
+        line = self.input_line
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(self.prompt_position)
+        cursor.setPosition(self.prompt_position + self.input_length, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(line.text, format_for(PLAIN, self.colors["command"]))
+        self.input_length = cursor.position() - self.prompt_position
+        cursor.setPosition(self.prompt_position + utf16_length(line.text[:line.cursor]))
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
 
     def append_text(self, text, color="output", parse_ansi=True):
         """Append text to the terminal with specified color, optionally parsing ANSI codes."""
+        # Text goes above the command line, which stays last
+        hidden = self.hide_input()
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
-        format_text = QTextCharFormat()
-        format_text.setForeground(self.colors.get(color, QColor("#8be9fd")))
-
+        # One edit block: the document lays out and repaints once for all the inserts
+        cursor.beginEditBlock()
+        color = self.colors.get(color, self.colors["output"])
         if parse_ansi:
-            text = text.replace('\r', '')  # Remove carriage returns
-            parts = text.split('\033[')
-            for part in parts:
-                if not part:
-                    continue
-                if part[0].isdigit() and 'm' in part:
-                    code_str, _, content = part.partition('m')
-                    codes = code_str.split(';')
-                    for code in codes:
-                        if code == '0':
-                            format_text = QTextCharFormat()
-                            format_text.setForeground(self.colors["output"])
-                        elif code in ['30', '31', '32', '33', '34', '35', '36', '37']:
-                            color_index = int(code) - 30
-                            colors = [Qt.GlobalColor.black, Qt.GlobalColor.red, Qt.GlobalColor.green, Qt.GlobalColor.yellow,
-                                      Qt.GlobalColor.blue, Qt.GlobalColor.magenta, Qt.GlobalColor.cyan, Qt.GlobalColor.white]
-                            format_text.setForeground(colors[color_index])
-                    if content:
-                        cursor.insertText(content, format_text)
-                else:
-                    cursor.insertText(part, format_text)
+            self.apply_output(cursor, AnsiParser(color).feed(text, final=True))
         else:
-            cursor.insertText(text, format_text)
+            cursor.insertText(text, format_for(PLAIN, color))
+        cursor.endEditBlock()
         self.setTextCursor(cursor)
+        self.trim_scrollback()
         self.ensureCursorVisible()
+        if hidden:
+            self.show_input(new_line=True)
 
-    def keyPressEvent(self, event):
-        """Handle key presses with proper process termination."""
-        cursor = self.textCursor()
-        if self.locked:
-            if event.key() == Qt.Key.Key_C and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-                self.process.kill()
-                self.process.waitForFinished(1000)  # Wait for process to finish
-                self.append_text("\n[Terminated]", color="error", parse_ansi=False)
-                self.locked = False
-                self.display_prompt()
+    def write_output(self, text, final=False):
+        """Show process output, which may move the cursor about and overwrite itself."""
+        # Output with no command running, e.g. from a background job
+        hidden = self.hide_input()
+        if self.output_cursor is None:
+            self.output_cursor = QTextCursor(self.document())
+            self.output_cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor = self.output_cursor
+        cursor.beginEditBlock()
+        self.apply_output(cursor, self.output_parser.feed(text, final))
+        cursor.endEditBlock()
+        self.setTextCursor(cursor)
+        self.trim_scrollback()
+        self.ensureCursorVisible()
+        if hidden:
+            self.show_input(new_line=True)
+
+    def apply_output(self, cursor, operations):
+        """Carry out parsed output at the cursor; text after it is overwritten, as in a terminal."""
+        document = self.document()
+        for operation in operations:
+            kind = operation[0]
+            if kind == TEXT:
+                if cursor.atEnd():
+                    cursor.insertText(operation[1], operation[2])
+                else:
+                    self.overwrite(cursor, operation[1], operation[2])
+                continue
+            if kind == CARRIAGE_RETURN:
+                cursor.movePosition(START_OF_BLOCK)
+                continue
+            if kind == ERASE_LINE and operation[1] == 0:
+                # Erase to the end of the line, as progress bars do after a carriage return
+                if not cursor.atBlockEnd():
+                    cursor.movePosition(END_OF_BLOCK, KEEP_ANCHOR)
+                    cursor.removeSelectedText()
+                continue
+            count = operation[1]
+            block = cursor.block()
+            column = cursor.positionInBlock()
+            if kind == BACKSPACE:
+                if column:
+                    cursor.movePosition(QTextCursor.MoveOperation.PreviousCharacter)
+            elif kind == CURSOR_UP:
+                self.move_to_column(cursor, document.findBlockByNumber(max(0, block.blockNumber() - count)), column)
+            elif kind == CURSOR_DOWN:
+                number = min(document.blockCount() - 1, block.blockNumber() + count)
+                self.move_to_column(cursor, document.findBlockByNumber(number), column)
+            elif kind == CURSOR_FORWARD:
+                self.move_to_column(cursor, block, column + count)
+            elif kind == CURSOR_BACK:
+                self.move_to_column(cursor, block, max(0, column - count))
+            elif kind == CURSOR_COLUMN:
+                self.move_to_column(cursor, block, count - 1)
+            elif kind == ERASE_LINE:
+                if count == 1:
+                    cursor.movePosition(START_OF_BLOCK, KEEP_ANCHOR)
+                    cursor.insertText(" " * column)
+                else:
+                    cursor.movePosition(START_OF_BLOCK)
+                    cursor.movePosition(END_OF_BLOCK, KEEP_ANCHOR)
+                    cursor.insertText(" " * column)
+            elif kind == ERASE_DISPLAY:
+                if count == 0:
+                    cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+                    cursor.removeSelectedText()
+                elif count >= 2:
+                    # Clearing the screen keeps the scrollback: carry on from a fresh line
+                    cursor.movePosition(QTextCursor.MoveOperation.End)
+                    if not cursor.atBlockStart():
+                        cursor.insertText("\n")
+
+    def overwrite(self, cursor, text, text_format):
+        """Write text over what follows the cursor; newlines move to the next line."""
+        lines = text.split("\n")
+        newline = ""
+        for i, line in enumerate(lines):
+            if i:
+                if cursor.block().next().isValid():
+                    cursor.movePosition(QTextCursor.MoveOperation.NextBlock)
+                else:
+                    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+                    newline = "\n"
+            if cursor.atEnd():
+                # Nothing left to overwrite
+                cursor.insertText(newline + "\n".join(lines[i:]), text_format)
+                return
+            block_end = cursor.block().position() + cursor.block().length() - 1
+            cursor.setPosition(min(cursor.position() + len(line), block_end), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(line, text_format)
+
+    @staticmethod
+    def move_to_column(cursor, block, column):
+        length = block.length() - 1
+        cursor.setPosition(block.position() + min(column, length))
+        if column > length:
+            cursor.insertText(" " * (column - length))
+
+    def trim_scrollback(self):
+        """Move the oldest lines to the scrollback log once there are too many."""
+        document = self.document()
+        excess = document.blockCount() - self.scrollback_lines
+        if excess < self.trim_slack:
             return
+        end = document.findBlockByNumber(excess).position()
+        cursor = QTextCursor(document)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        self.scrollback_log.append(cursor.selection().toPlainText())
+        cursor.removeSelectedText()
+        self.prompt_position = max(0, self.prompt_position - end)
+        self.input_start = max(0, self.input_start - end)
+
+    def clear(self):
+        super().clear()
+        self.scrollback_log.clear()
+        self.prompt_position = self.input_start = 0
+        self.input_active = False
+
+    def clear_screen(self):
+        """Clear everything, keeping the prompt and command line if no command is running."""
+        self.clear()
+        self.output_cursor = None
+        if not self.running:
+            self.show_input()
+
+    def search_output(self, query, limit=MAX_SEARCH_RESULTS):
+        """Return the last limit (line number, line) pairs containing query, ignoring case.
 
-        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+        Lines moved to the scrollback log are searched too, and numbered from
+        the start of the session.
+        """
+        found = [(index + 1, line) for index, line in self.scrollback_log.search(query, limit)]
+        first_line = len(self.scrollback_log) + 1
+        document = self.document()
+        # Not the command line itself
+        prompt_block = document.findBlock(self.prompt_position).blockNumber()
+        cursor = document.find(query, 0)
+        while not cursor.isNull():
+            block = cursor.block()
+            if block.blockNumber() != prompt_block:
+                found.append((first_line + block.blockNumber(), block.text()))
+            # One result per line
+            cursor = document.find(query, block.position() + block.length())
+        return found[-limit:]
+
+    def keyPressEvent(self, event):
+        """Edit the command line at the prompt; while a command runs, keys go to it."""
+        if self.running:
+            self.send_key(event)
+            return
+        if not self.input_active:
+            return
+        key = event.key()
+        control = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        line = self.input_line
+        if event.matches(QKeySequence.StandardKey.Copy) and self.textCursor().hasSelection():
+            self.copy()
+            return
+        if event.matches(QKeySequence.StandardKey.Paste):
+            # Through insertFromMimeData
+            self.paste()
+            return
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
             self.handle_command_entry()
-        elif event.key() == Qt.Key.Key_Up:
-            if self.history_index < len(self.command_history) - 1:
-                self.history_index += 1
-                self.set_current_command(self.command_history[self.history_index])
-        elif event.key() == Qt.Key.Key_Down:
-            if self.history_index > -1:
-                self.history_index -= 1
-                self.set_current_command("" if self.history_index == -1 else self.command_history[self.history_index])
-        elif event.key() == Qt.Key.Key_Tab:
+            return
+        if key == Qt.Key.Key_Tab:
             self.handle_tab_completion()
-        elif event.key() == Qt.Key.Key_Backspace:
-            if cursor.position() > self.prompt_position:
-                super().keyPressEvent(event)
-                self.current_command = self.get_current_command_text()
-        elif event.key() == Qt.Key.Key_Left:
-            if cursor.position() > self.prompt_position:
-                super().keyPressEvent(event)
-        else:
-            if cursor.position() < self.prompt_position:
-                cursor.setPosition(self.prompt_position)
-                self.setTextCursor(cursor)
+            return
+        if key in (Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
             super().keyPressEvent(event)
-            self.current_command = self.get_current_command_text()
+            return
+        if control and key == Qt.Key.Key_C:
+            self.cancel_command_line()
+            return
+        if control and key == Qt.Key.Key_L:
+            self.clear_screen()
+            return
+        if key == Qt.Key.Key_Up:
+            line.previous()
+        elif key == Qt.Key.Key_Down:
+            line.next()
+        elif key == Qt.Key.Key_Left:
+            line.move(line.word_start() if control else line.cursor - 1)
+        elif key == Qt.Key.Key_Right:
+            line.move(line.word_end() if control else line.cursor + 1)
+        elif key == Qt.Key.Key_Home or (control and key == Qt.Key.Key_A):
+            line.move(0)
+        elif key == Qt.Key.Key_End or (control and key == Qt.Key.Key_E):
+            line.move(len(line.text))
+        elif key == Qt.Key.Key_Backspace:
+            if control:
+                line.delete(line.word_start(), line.cursor)
+            else:
+                line.backspace()
+        elif key == Qt.Key.Key_Delete:
+            if control:
+                line.delete(line.cursor, line.word_end())
+            else:
+                line.delete_forward()
+        elif control and key == Qt.Key.Key_U:
+            line.delete(0, line.cursor)
+        elif control and key == Qt.Key.Key_K:
+            line.delete(line.cursor, len(line.text))
+        elif control and key == Qt.Key.Key_W:
+            line.delete(line.word_start(), line.cursor)
+        elif event.text() and event.text().isprintable():
+            line.insert(event.text())
+        else:
+            return
+        self.render_input()
+
+    def insertFromMimeData(self, source):
+        """Paste into the command line, or to the running command."""
+        self.insert_input(source.text())
+
+    def inputMethodEvent(self, event):
+        self.insert_input(event.commitString())
 
-    def get_current_command_text(self):
-        """Extract the current command text after the prompt."""
-        text = self.toPlainText()
-        return text[self.prompt_position:].strip()
+    def insert_input(self, text):
+        if not text:
+            return
+        if self.running:
+            if self.session is not None:
+                self.session.write(text.encode("utf-8"))
+        elif self.input_active:
+            self.input_line.insert(text.replace("\r\n", "\n").replace("\r", "\n"))
+            self.render_input()
+
+    def cancel_command_line(self):
+        """Ctrl+C at the prompt: leave the line as typed and start a new one."""
+        self.input_active = False
+        self.input_line.clear()
+        self.pending_lines = []
+        self.append_text("^C\n", color="warning", parse_ansi=False)
+        self.display_prompt()
+
+    def send_key(self, event):
+        if event.key() == Qt.Key.Key_C and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.discard_output()
+            if self.finished_code is not None:
+                # Already done; only its output was still being drawn
+                self.show_exit_status()
+            elif self.session is not None:
+                # The prompt comes back once the shell reports the command ended
+                self.session.interrupt()
+            return
+        if self.session is None:
+            return
+        if event.matches(QKeySequence.StandardKey.Paste):
+            # Through insertFromMimeData
+            self.paste()
+            return
+        data = key_bytes(event)
+        if data:
+            # The terminal driver echoes what the program wants shown
+            self.session.write(data)
 
     def set_current_command(self, command):
         """Update the displayed command text."""
-        cursor = self.textCursor()
-        cursor.setPosition(self.prompt_position)
-        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
-        cursor.removeSelectedText()
-        self.append_text(command, color="command", parse_ansi=False)
-        self.current_command = command
-        self.move_cursor_to_end()
+        self.input_line.set_text(command)
+        self.render_input()
 
     def move_cursor_to_end(self):
         """Move the cursor to the end of the text."""
@@ -153,7 +521,11 @@ class Terminal(QTextEdit):
 
     def handle_command_entry(self):
         """Process the entered command, supporting multi-line inputs."""
-        command = self.current_command.strip()
+        command = self.input_line.text.strip()
+        # The line stays in the output as typed
+        self.input_active = False
+        self.input_line.clear()
+        self.move_cursor_to_end()
         if not command:
             self.append_text("\n", parse_ansi=False)
             self.display_prompt()
@@ -161,9 +533,8 @@ class Terminal(QTextEdit):
 
         if command.endswith('\\'):
             self.pending_lines.append(command.rstrip('\\'))
-            self.append_text("\n> ", color="prompt", parse_ansi=False)
-            self.current_command = ""
-            self.prompt_position = self.textCursor().position()
+            self.append_text("\n", parse_ansi=False)
+            self.display_prompt("> ")
             return
 
         if self.pending_lines:
@@ -176,95 +547,114 @@ class Terminal(QTextEdit):
 
     def execute_command(self, command):
         """Execute the command, either built-in or external."""
-        self.command_history.insert(0, command)
-        if len(self.command_history) > 100:
-            self.command_history.pop()
-        self.history_index = -1
+        self.input_line.add_history(command)
         self.append_text("\n", parse_ansi=False)
 
         # Built-in commands
         if command == "clear":
-            self.clear()
-            self.display_prompt()
+            self.clear_screen()
         elif command == "exit":
-            QApplication.quit()
-        elif command.startswith("cd "):
-            try:
-                new_dir = os.path.expanduser(command[3:].strip() or "~")
-                new_dir = os.path.normpath(os.path.join(self.current_directory, new_dir))
-                os.chdir(new_dir)
-                self.current_directory = os.getcwd()
-                self.display_prompt()
-            except FileNotFoundError:
-                self.append_text(f"cd: Directory '{new_dir}' not found", color="error", parse_ansi=False)
-                self.append_text("\n", parse_ansi=False)
-                self.display_prompt()
-        elif command == "pwd":
-            self.append_text(self.current_directory, color="output", parse_ansi=False)
-            self.append_text("\n", parse_ansi=False)
-            self.display_prompt()
-        elif command.startswith("echo "):
-            self.append_text(command[5:], color="output", parse_ansi=False)
-            self.append_text("\n", parse_ansi=False)
+            self.exit_requested.emit()
+        elif command.startswith("search "):
+            query = command[7:].strip()
+            found = self.search_output(query) if query else []
+            lines = [f"{number:>7}  {line}" for number, line in found]
+            if len(found) == MAX_SEARCH_RESULTS:
+                lines.append(f"[last {MAX_SEARCH_RESULTS} matching lines]")
+            else:
+                lines.append(f"[{len(found)} matching lines]")
+            self.append_text("\n".join(lines) + "\n", color="output", parse_ansi=False)
             self.display_prompt()
         elif command == "help":
             self.append_text("""
 Built-in commands:
   clear - Clear screen
-  exit - Exit terminal
-  cd <dir> - Change directory
-  pwd - Print working directory
-  echo <text> - Display text
+  exit - Close this terminal
+  search <text> - Find lines of output, including those scrolled off
   help - Show this message
-Run any shell command, including sudo.""", color="output", parse_ansi=False)
+Everything else runs in one bash session, so cd, exported variables
+and aliases carry over between commands. While a command runs, typing
+goes to it; Ctrl+C interrupts it. At the prompt, Ctrl+A/E, Ctrl+U/K/W
+and Ctrl+Left/Right move and delete as in bash.""", color="output", parse_ansi=False)
             self.display_prompt()
         else:
             self.run_external_command(command)
 
     def run_external_command(self, command):
-        """Run an external command, ensuring no process is already running."""
-        self.locked = True
-        self.process.setWorkingDirectory(self.current_directory)
-        
-        # Terminate any running process before starting a new one
-        if self.process.state() != QProcess.ProcessState.NotRunning:
-            self.process.kill()
-            self.process.waitForFinished(1000)  # Wait up to 1 second for termination
-        
-        try:
-            if sys.platform == "win32":
-                self.process.start("cmd.exe", ["/c", command])
-            else:
-                shell_command = command
-                if command.startswith("sudo "):
-                    shell_command = f"pkexec /bin/bash -c '{command[5:]}'"
-                self.process.start("/bin/bash", ["-c", shell_command])
-            if not self.process.waitForStarted(2000):
-                raise RuntimeError(self.process.errorString())
-        except Exception as e:
-            self.append_text(f"Error: {str(e)}", color="error", parse_ansi=False)
-            self.locked = False
+        """Run a command in the shell session; the prompt comes back when the shell reports it done."""
+        if self.session is None:
+            self.append_text("No shell is running\n", color="error", parse_ansi=False)
             self.display_prompt()
+            return
+        self.running = True
+        self.output_parser.reset()
+        self.output_cursor = None
+        self.session.run(command)
 
-    def read_output(self):
-        """Read and display output from the process with ANSI parsing."""
-        data = self.process.readAllStandardOutput()
-        text = bytes(data).decode('utf-8', errors='replace')
+    def feed(self, data, final=False):
+        text = self.decoder.decode(data, final)
         if text:
-            self.append_text(text, parse_ansi=True)
+            self.pending_output.append(text)
+            self.pending_chars += len(text)
+            if self.pending_chars > MAX_PENDING_CHARS and self.session is not None:
+                self.session.set_reading(False)
+        if self.pending_output and not self.flush_timer.isActive():
+            self.flush_timer.start(FLUSH_INTERVAL_MS)
 
-    def process_finished(self, exit_code, _):
-        """Handle process completion and display exit status."""
-        self.read_output()
+    def flush_output(self):
+        """Draw up to MAX_FLUSH_CHARS of queued output in one insert."""
+        text = "".join(self.pending_output)
+        if len(text) > MAX_FLUSH_CHARS:
+            # The parser keeps an escape sequence cut in two until the rest arrives
+            text, rest = text[:MAX_FLUSH_CHARS], text[MAX_FLUSH_CHARS:]
+            self.pending_output = [rest]
+            self.pending_chars = len(rest)
+            # Catch up on the next event loop turn
+            self.flush_timer.start(0)
+        else:
+            self.pending_output = []
+            self.pending_chars = 0
+        if text:
+            self.write_output(text)
+        if self.pending_chars <= MAX_PENDING_CHARS and self.session is not None:
+            self.session.set_reading(True)
+        if self.finished_code is not None and not self.pending_output:
+            self.show_exit_status()
+
+    def discard_output(self):
+        self.flush_timer.stop()
+        self.decoder.reset()
+        self.pending_output = []
+        self.pending_chars = 0
+        self.output_parser.reset()
+        self.output_cursor = None
+        if self.session is not None:
+            self.session.set_reading(True)
+
+    def on_command_finished(self, exit_code, folder):
+        """The shell is done with a command; the exit status follows the last of its output."""
+        if folder != self.current_directory:
+            self.current_directory = folder
+            self.folder_changed.emit(folder)
+        self.finished_code = exit_code
+        if not self.pending_output:
+            self.show_exit_status()
+
+    def show_exit_status(self):
+        exit_code, self.finished_code = self.finished_code, None
+        # Whatever the parser held back, e.g. a cut-off escape sequence
+        self.write_output("", final=True)
+        self.output_parser.reset()
+        self.output_cursor = None
         if exit_code != 0:
             self.append_text(f"\n[Exit code: {exit_code}]", color="warning", parse_ansi=False)
         self.append_text("\n", parse_ansi=False)
-        self.locked = False
+        self.running = False
         self.display_prompt()
 
     def handle_tab_completion(self):
         """Provide tab completion for commands and file paths."""
-        command = self.current_command.strip()
+        command = self.input_line.text.strip()
         if not command:
             return
         parts = shlex.split(command)
@@ -282,10 +672,8 @@ Run any shell command, including sudo.""", color="output", parse_ansi=False)
                 if common != prefix:
                     self.set_current_command(" ".join(parts[:-1] + [common]))
                 else:
-                    self.append_text("\n" + "  ".join(matches), color="output", parse_ansi=False)
-                    self.append_text("\n", parse_ansi=False)
-                    self.display_prompt()
-                    self.set_current_command(command)
+                    # Listed above the command line, which is drawn again below
+                    self.append_text("  ".join(matches) + "\n", color="output", parse_ansi=False)
         except:
             pass
 
@@ -298,9 +686,14 @@ class TerminalWindow(QMainWindow):
         layout = QVBoxLayout(widget)
         layout.setContentsMargins(0, 0, 0, 0)
         self.terminal = Terminal()
+        self.terminal.exit_requested.connect(self.close)
         layout.addWidget(self.terminal)
         self.resize(800, 500)
 
+    def closeEvent(self, event):
+        self.terminal.shutdown()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = TerminalWindow()
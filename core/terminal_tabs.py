@@ -0,0 +1,58 @@
+# core/terminal_tabs.py
+import os
+from PyQt6.QtWidgets import QTabWidget
+from core.terminal import Terminal
+
+
+def folder_title(folder):
+    return os.path.basename(folder.rstrip(os.sep)) or folder
+
+
+class TerminalTabs(QTabWidget):
+    """Terminals side by side in tabs, each with its own shell and output.
+
+    Every terminal reads its shell through the event loop, so a command
+    running in one tab never holds up the others or the editor. Closing a
+    tab hangs up on its shell without waiting for it to exit, and there is
+    always at least one terminal open.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setTabsClosable(True)
+        self.setMovable(True)
+        self.setDocumentMode(True)
+        self.tabCloseRequested.connect(self.close_terminal)
+        self.new_terminal()
+
+    def new_terminal(self):
+        terminal = Terminal()
+        index = self.addTab(terminal, folder_title(terminal.current_directory))
+        # Tabs are found from their terminal, since they can be moved
+        terminal.folder_changed.connect(
+            lambda folder: self.setTabText(self.indexOf(terminal), folder_title(folder))
+        )
+        terminal.exit_requested.connect(lambda: self.close_terminal(self.indexOf(terminal)))
+        self.setCurrentIndex(index)
+        terminal.setFocus()
+        return terminal
+
+    def close_terminal(self, index):
+        terminal = self.widget(index)
+        if terminal is None:
+            return
+        self.removeTab(index)
+        terminal.shutdown()
+        terminal.deleteLater()
+        if self.count() == 0:
+            self.new_terminal()
+
+    def current(self):
+        return self.currentWidget()
+
+    def log(self, text):
+        self.current().append_text(text)
+
+    def shutdown(self):
+        for index in range(self.count()):
+            self.widget(index).shutdown()
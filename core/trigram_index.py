@@ -0,0 +1,269 @@
+# core/trigram_index.py
+import os
+import time
+import pickle
+import hashlib
+import threading
+from array import array
+from itertools import accumulate
+from core.search_worker import UNREADABLE, index_batch
+from core.file_saver import write_atomic
+
+INDEX_VERSION = 1
+INDEX_BATCH_SIZE = 256
+# Postings beyond this many bytes are not kept; later files are always searched
+MAX_INDEX_BYTES = 128 * 1024 * 1024
+MAX_GAP = 0xFFFF
+# Only the rarest trigrams of a query are intersected
+MAX_QUERY_TRIGRAMS = 8
+# Rebuild from scratch once this share of the file ids belong to changed or deleted files
+MAX_DEAD_RATIO = 0.5
+
+
+def cache_dir(root):
+    """Return the per-project cache folder for the index of root"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    key = hashlib.sha1(os.path.realpath(root).encode("utf-8", "surrogateescape")).hexdigest()[:16]
+    return os.path.join(base, "open-code", "search-index", key)
+
+
+def query_trigrams(query, case_sensitive):
+    """Return the trigrams every file matching the literal query must contain"""
+    # Lowercased the way the indexed bytes are: ASCII only
+    data = query.encode("utf-8").lower()
+    trigrams = {data[i:i + 3] for i in range(len(data) - 2)}
+    if not case_sensitive:
+        # Only ASCII lowercases the same in the index and in the pattern
+        trigrams = {trigram for trigram in trigrams if trigram.isascii()}
+    return trigrams
+
+
+class TrigramIndex:
+    """Which files under a folder contain which 3-byte sequences.
+
+    Every indexed file has an id; for each lowercased trigram the index
+    keeps the ids of the files containing it, ascending, as an array of
+    16-bit gaps starting from id -1, so a posting list decodes with
+    `accumulate`. A gap too big for 16 bits is split into several, which
+    only adds ids that were never in the list as false candidates. A file that
+    changes or disappears only has its id retired. It is indexed again
+    under a new id, and the index is rebuilt once too many ids are retired.
+    Files are read and split into trigrams in batches on the search
+    process pool.
+
+    The index is saved under a per-project cache folder and brought up to
+    date by `update`, which only re-reads files whose mtime or size
+    changed. Files saved from the editor since the last update are always
+    candidates, as are files left out because of the size cap.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(cache_dir(root), "trigrams.pickle")
+        self.lock = threading.Lock()
+        self.ready = False
+        self.updating = False
+        self.last_update = 0
+        self.dirty = set()
+        # Changed files waiting for their new trigrams
+        self.indexing = set()
+        self.clear()
+
+    def clear(self):
+        # id -> (path, mtime_ns, size), None once retired
+        self.files = []
+        self.ids = {}
+        self.postings = {}
+        self.last_ids = {}
+        self.size = 0
+        self.dead = 0
+        self.unindexed = set()
+
+    def load(self):
+        """Load the saved index; return False if there is none or it is stale"""
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False
+        if state.get("version") != INDEX_VERSION or state.get("root") != self.root:
+            return False
+        with self.lock:
+            self.files = state["files"]
+            self.postings = state["postings"]
+            self.last_ids = state["last_ids"]
+            self.unindexed = state["unindexed"]
+            self.ids = {entry[0]: file_id for file_id, entry in enumerate(self.files) if entry is not None}
+            self.dead = len(self.files) - len(self.ids)
+            self.size = sum(len(gaps) for gaps in self.postings.values()) * 2
+        return True
+
+    def save(self):
+        with self.lock:
+            state = {
+                "version": INDEX_VERSION, "root": self.root, "files": list(self.files),
+                "postings": dict(self.postings), "last_ids": dict(self.last_ids),
+                "unindexed": set(self.unindexed),
+            }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_atomic(self.path, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def delete(self):
+        with self.lock:
+            self.clear()
+            self.ready = False
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def mark_dirty(self, path):
+        """Treat a file the editor just wrote as a candidate until the next update"""
+        root = os.path.join(os.path.realpath(self.root), "")
+        if not os.path.realpath(path).startswith(root):
+            # Not part of this project
+            return
+        with self.lock:
+            self.dirty.add(path)
+
+    def candidates(self, query, case_sensitive=False):
+        """Return the files that may contain the literal query, or None to search everything"""
+        trigrams = query_trigrams(query, case_sensitive)
+        with self.lock:
+            if not self.ready or not trigrams:
+                return None
+            postings = sorted((self.postings.get(trigram, ()) for trigram in trigrams), key=len)
+            ids = set(accumulate(postings[0], initial=-1))
+            for posting in postings[1:MAX_QUERY_TRIGRAMS]:
+                if len(ids) <= 1:
+                    break
+                ids.intersection_update(accumulate(posting, initial=-1))
+            files = self.files
+            count = len(files)
+            paths = {
+                files[file_id][0] for file_id in ids
+                if 0 <= file_id < count and files[file_id] is not None
+            }
+            paths.update(self.unindexed)
+            paths.update(self.dirty)
+            paths.update(self.indexing)
+        return sorted(paths)
+
+    def update(self, files, executor, stop, progress=None):
+        """Bring the index up to date with a complete (path, mtime_ns, size) listing.
+
+        Runs on a background thread; returns False if stopped early. The
+        index only answers queries once an update has finished. progress,
+        if given, is called with the files read so far and the number to read.
+        """
+        self.updating = True
+        try:
+            return self._update(files, executor, stop, progress)
+        finally:
+            with self.lock:
+                # Files left unindexed by an early stop stay candidates
+                self.dirty.update(self.indexing)
+                self.indexing.clear()
+            self.updating = False
+            self.last_update = time.monotonic()
+
+    def _update(self, files, executor, stop, progress):
+        if not self.ready:
+            self.load()
+        if self.dead > MAX_DEAD_RATIO * max(1, len(self.files)):
+            with self.lock:
+                self.clear()
+                self.ready = False
+        changed = False
+        seen = set()
+        new = []
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            for path, mtime, size in files:
+                seen.add(path)
+                file_id = self.ids.get(path)
+                if file_id is not None:
+                    if self.files[file_id][1:] == (mtime, size):
+                        continue
+                    self.retire(file_id)
+                elif path in self.unindexed and path not in dirty:
+                    continue
+                self.unindexed.discard(path)
+                new.append(path)
+            self.indexing.update(new)
+            for path in [path for path in self.ids if path not in seen]:
+                self.retire(self.ids[path])
+                changed = True
+            gone = self.unindexed - seen
+            if gone:
+                self.unindexed -= gone
+                changed = True
+
+        pending = []
+        merged = 0
+
+        def merge(future, paths):
+            nonlocal merged
+            self.merge(future.result(), paths)
+            merged += len(paths)
+            if progress is not None:
+                progress(merged, len(new))
+
+        for start in range(0, len(new), INDEX_BATCH_SIZE):
+            if stop.is_set():
+                return False
+            if self.size >= MAX_INDEX_BYTES:
+                with self.lock:
+                    self.unindexed.update(new[start:])
+                changed = True
+                break
+            with self.lock:
+                items = []
+                for path in new[start:start + INDEX_BATCH_SIZE]:
+                    items.append((len(self.files), path))
+                    # Not a candidate until its trigrams are merged
+                    self.files.append(None)
+                    self.dead += 1
+            pending.append((executor.submit(index_batch, items), dict(items)))
+            # Keep a few batches queued without getting far ahead of merging
+            while len(pending) > 4:
+                merge(*pending.pop(0))
+            changed = True
+        for future, paths in pending:
+            if stop.is_set():
+                return False
+            merge(future, paths)
+
+        self.ready = True
+        if changed:
+            self.save()
+        return True
+
+    def retire(self, file_id):
+        entry = self.files[file_id]
+        self.files[file_id] = None
+        del self.ids[entry[0]]
+        self.dead += 1
+
+    def merge(self, result, paths):
+        postings, files = result
+        with self.lock:
+            for file_id, mtime, size, state in files:
+                if state == UNREADABLE:
+                    continue
+                self.files[file_id] = (paths[file_id], mtime, size)
+                self.ids[paths[file_id]] = file_id
+                self.dead -= 1
+            self.indexing.difference_update(paths.values())
+            for trigram, (first, gaps) in postings.items():
+                existing = self.postings.get(trigram)
+                if existing is None:
+                    existing = self.postings[trigram] = array("H")
+                gap = first - self.last_ids.get(trigram, -1)
+                while gap > MAX_GAP:
+                    existing.append(MAX_GAP)
+                    gap -= MAX_GAP
+                existing.append(gap)
+                existing.extend(gaps)
+                self.last_ids[trigram] = first + sum(gaps)
+                self.size += (len(gaps) + 1) * 2
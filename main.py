@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
     QTabWidget, QLineEdit, QFileDialog, QMessageBox, QToolBar, QHBoxLayout
 )
 from PyQt6.QtCore import Qt
+from core.file_loader import is_loading
 
 def load_stylesheet(app, stylesheet_path="ui/styles.qss"):
     if os.path.exists(stylesheet_path):
@@ -17,8 +18,16 @@ class CodeIDE(QMainWindow):
         super().__init__()
         self.setWindowTitle("Open Code IDE")
         self.resize(1200, 800)
-        self.open_files = {}
         self.auto_save_enabled = False
+        from core.file_saver import SaveService
+        self.save_service = SaveService(self)
+        self.save_service.saved.connect(self.on_file_saved)
+        self.save_service.failed.connect(self.on_save_failed)
+        # Editors to close once a save of this revision is written, and to rename once saved as
+        self.closing = {}
+        self.renames = {}
+        from core.auto_save import AutoSaveEngine
+        self.auto_save = AutoSaveEngine(self.save_service, self.path_for_editor, self)
 
         # Set up the menu bar.
         from core.menu import create_menu_bar
@@ -39,16 +48,33 @@ class CodeIDE(QMainWindow):
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
         from core.file_explorer_widget import FileExplorerWidget
         self.file_explorer_widget = FileExplorerWidget(self)
-        self.splitter.addWidget(self.file_explorer_widget)
+        from core.search_panel import SearchPanel
+        self.search_panel = SearchPanel(lambda: self.file_explorer_widget.explorer.file_model.root_path, self)
+        self.search_panel.resultActivated.connect(self.open_file_at)
+        self.save_service.saved.connect(lambda job: self.search_panel.search.mark_saved(job.path))
+        self.search_panel.hide()
+        from core.path_index import PathIndex
+        from core.quick_open import QuickOpen
+        # Lives as long as the window so reopening the palette reuses the index
+        self.path_index = PathIndex(self)
+        self.quick_open = QuickOpen(self.path_index, self)
+        self.quick_open.fileChosen.connect(self.open_file_with_path)
+        self.side_splitter = QSplitter(Qt.Orientation.Vertical)
+        self.side_splitter.addWidget(self.file_explorer_widget)
+        self.side_splitter.addWidget(self.search_panel)
+        self.splitter.addWidget(self.side_splitter)
 
         self.code_tabs = QTabWidget()
         self.code_tabs.setTabsClosable(True)
+        self.code_tabs.setMovable(True)
+        from core.document_registry import DocumentRegistry
+        self.documents = DocumentRegistry(self.code_tabs, self)
         self.code_tabs.tabCloseRequested.connect(self.close_tab)
-        from core.terminal import Terminal
-        self.terminal = Terminal()
+        from core.terminal_tabs import TerminalTabs
+        self.terminals = TerminalTabs()
         self.code_splitter = QSplitter(Qt.Orientation.Vertical)
         self.code_splitter.addWidget(self.code_tabs)
-        self.code_splitter.addWidget(self.terminal)
+        self.code_splitter.addWidget(self.terminals)
         self.splitter.addWidget(self.code_splitter)
 
         self.splitter.setSizes([240, 960])
@@ -69,27 +95,28 @@ class CodeIDE(QMainWindow):
 
     # Methods required by menu and file explorer:
     def open_file_in_editor(self, filename, content):
-        for i in range(self.code_tabs.count()):
-            if self.code_tabs.tabText(i) == filename:
-                self.code_tabs.setCurrentIndex(i)
-                return
+        # Content without a file behind it: opens like a new, unsaved file
         from core.code_editor.editor import CodeEditor
         editor = CodeEditor("assets/settings.json", self)
+        editor.set_language_for_path(filename)
         editor.setPlainText(content)
-        index = self.code_tabs.addTab(editor, filename)
-        self.code_tabs.setCurrentIndex(index)
-        self.open_files[index] = filename
+        self.auto_save.watch(editor)
+        self.documents.add(editor, title=filename)
 
     def toggle_auto_save(self, enabled):
         self.auto_save_enabled = enabled
+        self.auto_save.set_enabled(enabled, self.documents.editors())
         print("Auto Save enabled" if enabled else "Auto Save disabled")
 
+    def path_for_editor(self, editor):
+        return self.documents.path_for(editor)
+
     def new_file(self):
         from core.code_editor.editor import CodeEditor
         editor = CodeEditor("assets/settings.json", self)
         editor.setPlainText("")
-        index = self.code_tabs.addTab(editor, "untitled")
-        self.code_tabs.setCurrentIndex(index)
+        self.auto_save.watch(editor)
+        self.documents.add(editor)
         self.log_to_terminal("Created new file")
 
     def open_file(self):
@@ -98,107 +125,144 @@ class CodeIDE(QMainWindow):
             self.open_file_with_path(file_path)
 
     def open_file_with_path(self, file_path):
-        for i in range(self.code_tabs.count()):
-            if file_path == self.open_files.get(i):
-                self.code_tabs.setCurrentIndex(i)
-                return
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            self.log_to_terminal(f"Error: Cannot open file {file_path} as text (binary file?)")
-            return
-        except Exception as e:
-            self.log_to_terminal(f"Error opening file: {str(e)}")
+        editor = self.documents.find(file_path)
+        if editor is not None:
+            self.code_tabs.setCurrentWidget(editor)
             return
         from core.code_editor.editor import CodeEditor
+        from core.file_loader import FileLoader
+        # The file is read on the thread pool; the tab fills in as it loads
         editor = CodeEditor("assets/settings.json", self)
-        editor.setPlainText(content)
-        tab_name = os.path.basename(file_path)
-        index = self.code_tabs.addTab(editor, tab_name)
-        self.open_files[index] = file_path
-        self.code_tabs.setCurrentIndex(index)
-        self.log_to_terminal(f"Opened file: {file_path}")
-
-    def save_file(self):
-        current_index = self.code_tabs.currentIndex()
-        if current_index >= 0:
-            file_path = self.open_files.get(current_index)
-            editor = self.code_tabs.widget(current_index)
-            try:
-                if not file_path:
-                    return self.save_as_file()
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(editor.toPlainText())
-                editor.document().setModified(False)
-                self.log_to_terminal(f"Saved file: {file_path}")
-                return True
-            except Exception as e:
-                self.log_to_terminal(f"Error saving file: {str(e)}")
-                QMessageBox.critical(self, "Error", f"Could not save file: {str(e)}")
+        editor.set_language_for_path(file_path)
+        editor.file_loader = FileLoader(file_path, editor)
+        editor.file_loader.progress.connect(editor.set_load_progress)
+        editor.file_loader.finished.connect(lambda: self.log_to_terminal(f"Opened file: {file_path}"))
+        editor.file_loader.failed.connect(lambda message: self.on_load_failed(editor, file_path, message))
+        self.auto_save.watch(editor)
+        self.documents.add(editor, file_path)
+        editor.file_loader.start()
+
+    def open_file_at(self, file_path, line, column=0):
+        """Open a file and put the cursor on a line, once it has loaded"""
+        self.open_file_with_path(file_path)
+        editor = self.documents.find(file_path)
+        if editor is None:
+            return
+        if is_loading(editor):
+            editor.file_loader.finished.connect(lambda: editor.go_to_line(line, column))
+        else:
+            editor.go_to_line(line, column)
+        editor.setFocus()
+
+    def on_load_failed(self, editor, file_path, message):
+        self.log_to_terminal(f"Error opening file {file_path}: {message}")
+        # Only part of the file was read: never offer to save it over the file
+        if self.code_tabs.indexOf(editor) >= 0:
+            self.remove_tab(editor)
+
+    def save_file(self, editor=None):
+        editor = editor or self.code_tabs.currentWidget()
+        if editor is not None:
+            file_path = self.documents.path_for(editor)
+            if not file_path:
+                return self.save_as_file(editor)
+            if is_loading(editor):
+                self.log_to_terminal(f"Not saved: {file_path} is still loading")
                 return False
+            # Written in the background; on_file_saved reports back
+            return self.save_service.save(editor, file_path)
         return False
 
-    def save_as_file(self):
-        current_index = self.code_tabs.currentIndex()
-        if current_index >= 0:
+    def save_as_file(self, editor=None):
+        editor = editor or self.code_tabs.currentWidget()
+        if is_loading(editor):
+            self.log_to_terminal("Not saved: the file is still loading")
+            return False
+        if editor is not None:
             file_path, _ = QFileDialog.getSaveFileName(self, "Save File As", "", "All Files (*)")
             if file_path:
-                editor = self.code_tabs.widget(current_index)
-                try:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(editor.toPlainText())
-                    tab_name = os.path.basename(file_path)
-                    self.code_tabs.setTabText(current_index, tab_name)
-                    self.open_files[current_index] = file_path
-                    editor.document().setModified(False)
-                    self.log_to_terminal(f"Saved file as: {file_path}")
-                    return True
-                except Exception as e:
-                    self.log_to_terminal(f"Error saving file: {str(e)}")
-                    QMessageBox.critical(self, "Error", f"Could not save file: {str(e)}")
-                    return False
+                # The tab takes the new name once the file has been written
+                self.renames[editor] = (os.path.realpath(file_path), file_path)
+                self.save_service.save(editor, file_path)
+                return True
         return False
 
+    def on_file_saved(self, job):
+        editor = job.editor
+        if editor is not None and editor in self.renames and self.renames[editor][0] == job.path:
+            _, file_path = self.renames.pop(editor)
+            self.documents.rename(editor, file_path)
+            editor.set_language_for_path(file_path)
+        if not job.auto:
+            self.log_to_terminal(f"Saved file: {job.path}")
+        if editor is not None and editor in self.closing and job.revision >= self.closing[editor]:
+            del self.closing[editor]
+            # Not if it was edited again while the save was being written
+            if not editor.document().isModified():
+                self.remove_tab(editor)
+
+    def on_save_failed(self, job, message):
+        self.log_to_terminal(f"Error saving file: {message}")
+        if job.editor is not None:
+            # The tab stays open with its edits, under its old name
+            self.closing.pop(job.editor, None)
+            if job.editor in self.renames and self.renames[job.editor][0] == job.path:
+                del self.renames[job.editor]
+        if not job.auto:
+            QMessageBox.critical(self, "Error", f"Could not save file: {message}")
+
     def close_tab(self, index):
         editor = self.code_tabs.widget(index)
-        if hasattr(editor, "document") and editor.document().isModified():
+        if is_loading(editor):
+            # Closing before the file finished loading: nothing to save
+            editor.file_loader.cancel()
+        elif hasattr(editor, "document") and editor.document().isModified():
             result = QMessageBox.question(
                 self, "Unsaved Changes",
                 "This file has unsaved changes. Save before closing?",
                 QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
             )
             if result == QMessageBox.StandardButton.Save:
-                self.save_file()
+                if self.save_file(editor):
+                    # Closed by on_file_saved once this revision is on disk
+                    self.closing[editor] = editor.document().revision()
+                return
             elif result == QMessageBox.StandardButton.Cancel:
                 return
-        if index in self.open_files:
-            del self.open_files[index]
-        new_open_files = {}
-        for i, path in self.open_files.items():
-            new_open_files[i - 1 if i > index else i] = path
-        self.open_files = new_open_files
-        self.code_tabs.removeTab(index)
+        self.remove_tab(editor)
+
+    def remove_tab(self, editor):
+        self.closing.pop(editor, None)
+        self.renames.pop(editor, None)
+        self.auto_save.forget(editor)
+        self.documents.remove(editor)
 
     def open_settings(self):
         settings_path = "assets/settings.json"
+        editor = self.documents.find(settings_path)
+        if editor is not None:
+            self.code_tabs.setCurrentWidget(editor)
+            return
         try:
             with open(settings_path, "r", encoding="utf-8") as f:
                 content = f.read()
             from core.code_editor.editor import CodeEditor
             editor = CodeEditor(settings_path, self)
             editor.setPlainText(content)
-            index = self.code_tabs.addTab(editor, "settings.json")
-            self.open_files[index] = settings_path
+            self.auto_save.watch(editor)
+            self.documents.add(editor, settings_path)
         except Exception as e:
             self.log_to_terminal(f"Error opening settings: {str(e)}")
 
     def new_terminal(self):
-        self.terminal.clear()
-        self.log_to_terminal("Terminal reset")
+        self.terminals.show()
+        self.terminals.new_terminal()
 
     def clear_terminal(self):
-        self.terminal.clear()
+        self.terminals.current().clear_screen()
+
+    def kill_terminal_command(self):
+        self.terminals.current().kill_command()
 
     def toggle_file_explorer(self):
         if self.file_explorer_widget.isVisible():
@@ -208,10 +272,10 @@ class CodeIDE(QMainWindow):
         self.log_to_terminal("Toggled file explorer")
 
     def toggle_terminal(self):
-        if self.terminal.isVisible():
-            self.terminal.hide()
+        if self.terminals.isVisible():
+            self.terminals.hide()
         else:
-            self.terminal.show()
+            self.terminals.show()
         self.log_to_terminal("Toggled terminal")
 
     def change_theme(self):
@@ -227,29 +291,24 @@ class CodeIDE(QMainWindow):
         self.log_to_terminal("Increased font size")
 
     def search_in_files(self):
-        search_term = self.search_bar.text()
-        if not search_term:
-            return
-        self.log_to_terminal(f"Searching for: {search_term}")
-        for i in range(self.code_tabs.count()):
-            editor = self.code_tabs.widget(i)
-            file_path = self.open_files.get(i, f"Tab {i+1}")
-            if hasattr(editor, "find"):
-                cursor = editor.textCursor()
-                cursor.movePosition(cursor.MoveOperation.Start)
-                editor.setTextCursor(cursor)
-                count = 0
-                while editor.find(search_term):
-                    count += 1
-                if count > 0:
-                    self.log_to_terminal(f"Found {count} matches in {file_path}")
-                cursor.movePosition(cursor.MoveOperation.Start)
-                editor.setTextCursor(cursor)
+        self.search_panel.show()
+        self.search_panel.focus_search()
+
+    def go_to_file(self):
+        self.quick_open.popup(self.file_explorer_widget.explorer.file_model.root_path)
+
+    def closeEvent(self, event):
+        # Let saves still being written finish before the process exits
+        self.save_service.wait()
+        self.search_panel.shutdown()
+        self.path_index.shutdown()
+        self.terminals.shutdown()
+        super().closeEvent(event)
 
     def log_to_terminal(self, message):
         import datetime
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.terminal.append_text(f"[{timestamp}] {message}\n")
+        self.terminals.log(f"[{timestamp}] {message}\n")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
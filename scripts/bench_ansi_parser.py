@@ -0,0 +1,184 @@
+# scripts/bench_ansi_parser.py
+"""Measure the streaming ANSI parser on colored pytest and cargo style logs.
+
+Prints parsing throughput on its own and with the output written to a
+document, next to the old split-on-ESC path, and checks that feeding the
+log in pipe-sized reads gives the same text and formats as feeding it
+whole.
+
+    python scripts/bench_ansi_parser.py [--mb N] [--read-size BYTES]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextCharFormat, QTextCursor
+from PyQt6.QtCore import Qt
+from core.ansi_parser import AnsiParser
+from core.terminal import Terminal
+
+
+def pytest_log(size):
+    lines = []
+    total = n = 0
+    while total < size:
+        n += 1
+        if n % 500 == 0:
+            line = f"\x1b[1m{'=' * 30} test session {n} {'=' * 30}\x1b[0m\n"
+        elif n % 40 == 0:
+            line = (f"tests/test_api_{n % 31}.py::test_case_{n} \x1b[31mFAILED\x1b[0m"
+                    f"\x1b[31m{' ' * 10}[{n % 100:3d}%]\x1b[0m\n"
+                    f"\x1b[1m\x1b[31mE       AssertionError: assert {n} == {n + 1}\x1b[0m\n")
+        else:
+            line = f"tests/test_api_{n % 31}.py::test_case_{n} \x1b[32mPASSED\x1b[0m\x1b[32m{' ' * 10}[{n % 100:3d}%]\x1b[0m\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+
+def cargo_log(size):
+    lines = []
+    total = n = 0
+    while total < size:
+        n += 1
+        if n % 7 == 0:
+            line = (f"\x1b[0m\x1b[1m\x1b[33mwarning\x1b[0m\x1b[0m\x1b[1m: unused variable: `x{n}`\x1b[0m\n"
+                    f"\x1b[0m   \x1b[0m\x1b[0m\x1b[1m\x1b[38;5;12m--> \x1b[0m\x1b[0msrc/lib_{n % 13}.rs:{n % 400}:9\x1b[0m\n")
+        elif n % 5 == 0:
+            # Progress bar redrawn in place
+            line = f"\r\x1b[K\x1b[1m\x1b[36m    Building\x1b[0m [{'=' * (n % 40)}>{' ' * (40 - n % 40)}] {n % 300}/300: crate-{n % 211}"
+        elif n % 11 == 0:
+            line = f"\x1b[38;2;{n % 256};{n * 7 % 256};200m    Finished\x1b[0m dev [unoptimized] target(s) in {n % 60}.{n % 100:02d}s\n"
+        else:
+            line = f"\r\x1b[K\x1b[0m\x1b[1m\x1b[32m   Compiling\x1b[0m crate-{n % 211} v0.{n % 9}.{n % 17}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+
+def legacy_write(cursor, text, default_color):
+    """The previous parser: split on ESC [ and insert every piece"""
+    format_text = QTextCharFormat()
+    format_text.setForeground(default_color)
+    text = text.replace('\r', '')
+    parts = text.split('\033[')
+    for part in parts:
+        if not part:
+            continue
+        if part[0].isdigit() and 'm' in part:
+            code_str, _, content = part.partition('m')
+            codes = code_str.split(';')
+            for code in codes:
+                if code == '0':
+                    format_text = QTextCharFormat()
+                    format_text.setForeground(default_color)
+                elif code in ['30', '31', '32', '33', '34', '35', '36', '37']:
+                    color_index = int(code) - 30
+                    colors = [Qt.GlobalColor.black, Qt.GlobalColor.red, Qt.GlobalColor.green, Qt.GlobalColor.yellow,
+                              Qt.GlobalColor.blue, Qt.GlobalColor.magenta, Qt.GlobalColor.cyan, Qt.GlobalColor.white]
+                    format_text.setForeground(colors[color_index])
+            if content:
+                cursor.insertText(content, format_text)
+        else:
+            cursor.insertText(part, format_text)
+
+
+def reads(text, read_size):
+    return [text[i:i + read_size] for i in range(0, len(text), read_size)]
+
+
+def parse_only(text, read_size, color):
+    parser = AnsiParser(color)
+    start = time.perf_counter()
+    runs = 0
+    for piece in reads(text, read_size):
+        runs += len(parser.feed(piece))
+    runs += len(parser.feed("", final=True))
+    return time.perf_counter() - start, runs
+
+
+def render_new(text, read_size, terminal):
+    terminal.clear()
+    parser = AnsiParser(terminal.colors["output"])
+    cursor = QTextCursor(terminal.document())
+    start = time.perf_counter()
+    for piece in reads(text, read_size) + [""]:
+        # As Terminal.write_output does
+        cursor.beginEditBlock()
+        terminal.apply_output(cursor, parser.feed(piece, final=not piece))
+        cursor.endEditBlock()
+    return time.perf_counter() - start, snapshot(terminal.document())
+
+
+def render_legacy(text, read_size, terminal):
+    terminal.clear()
+    cursor = QTextCursor(terminal.document())
+    start = time.perf_counter()
+    for piece in reads(text, read_size):
+        cursor.beginEditBlock()
+        legacy_write(cursor, piece, terminal.colors["output"])
+        cursor.endEditBlock()
+    return time.perf_counter() - start
+
+
+def snapshot(document):
+    """Every line's text and styled fragments"""
+    lines = []
+    block = document.begin()
+    while block.isValid():
+        fragments = []
+        it = block.begin()
+        while not it.atEnd():
+            fragment = it.fragment()
+            text_format = fragment.charFormat()
+            fragments.append((fragment.position() - block.position(), fragment.length(),
+                              text_format.foreground().color().name(), text_format.fontWeight()))
+            it += 1
+        lines.append((block.text(), fragments))
+        block = block.next()
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=4)
+    parser.add_argument("--read-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    size = int(args.mb * 1024 * 1024)
+    # The document is checked separately; no scrollback limit or widget in the way
+    terminal = Terminal(scrollback_lines=sys.maxsize)
+    # No shell needed: output is written directly
+    terminal.shutdown()
+    color = terminal.colors["output"]
+    mismatches = 0
+    for name, text in (("pytest", pytest_log(size)), ("cargo", cargo_log(size))):
+        mb = len(text.encode("utf-8")) / (1024 * 1024)
+        # Untimed first pass: loading fonts and laying out the first styles would count against whichever path goes first
+        render_new(text[:256 * 1024], args.read_size, terminal)
+        render_legacy(text[:256 * 1024], args.read_size, terminal)
+        parse_time, runs = parse_only(text, args.read_size, color)
+        new_time, chunked = render_new(text, args.read_size, terminal)
+        _, whole = render_new(text, len(text), terminal)
+        legacy_time = render_legacy(text, args.read_size, terminal)
+        print(f"{name}: {mb:.1f} MB in {args.read_size}-byte reads, {runs} runs")
+        print(f"  parse only:       {mb / parse_time:8.1f} MB/s")
+        print(f"  parse + insert:   {mb / new_time:8.1f} MB/s")
+        print(f"  legacy + insert:  {mb / legacy_time:8.1f} MB/s")
+        if chunked != whole:
+            mismatches += 1
+            first = next(i for i, (a, b) in enumerate(zip(chunked, whole)) if a != b)
+            print(f"  reads differ from the whole log, first at line {first + 1}")
+        else:
+            print("  reads match the whole log")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
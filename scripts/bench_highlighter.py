@@ -0,0 +1,111 @@
+# scripts/bench_highlighter.py
+"""Compare the single-pass tokenizer against the old one-regex-per-rule path.
+
+Checks that both produce identical formats for every block and prints the
+average highlighting time per block for each.
+
+    python scripts/bench_highlighter.py [file ...] [--lines N]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QGuiApplication, QTextDocument
+from PyQt6.QtCore import QRegularExpression
+from core.code_editor.syntax_highlighter import Highlighter
+from core.code_editor.tokenizer import rule_list, utf16_runs
+from core.code_editor.lexers import RuleLexer, multiline_string_runs
+
+
+class LegacyHighlighter(Highlighter):
+    """The previous highlighter: one QRegularExpression scan per rule"""
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.highlighting_rules = [
+            (QRegularExpression(pattern), self.formats[format_name])
+            for pattern, format_name in rule_list()
+        ]
+
+    def highlightBlock(self, text):
+        for pattern, text_format in self.highlighting_rules:
+            match_iterator = pattern.globalMatch(text)
+            while match_iterator.hasNext():
+                match = match_iterator.next()
+                self.setFormat(match.capturedStart(), match.capturedLength(), text_format)
+        runs, state = multiline_string_runs(text, self.previousBlockState())
+        for start, length, format_name in utf16_runs(text, runs):
+            self.setFormat(start, length, self.formats[format_name])
+        self.setCurrentBlockState(state)
+
+
+def load_sample(paths, lines):
+    if not paths:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        paths = [
+            os.path.join(folder, name)
+            for folder, _, names in os.walk(root)
+            for name in sorted(names) if name.endswith(".py")
+        ]
+    sample = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            sample.extend(f.read().splitlines())
+    text = []
+    while len(text) < lines:
+        text.extend(sample)
+    return "\n".join(text[:lines])
+
+
+def highlight(highlighter_class, text):
+    document = QTextDocument()
+    document.setPlainText(text)
+    start = time.perf_counter()
+    highlighter_class(document)
+    # Highlighting runs on the next rehighlight; force it synchronously.
+    # The line cache is disabled so repeated sample lines are not free.
+    highlighter = document.findChildren(Highlighter)[0]
+    highlighter.lexer = RuleLexer(cache_size=0)
+    highlighter.rehighlight()
+    elapsed = time.perf_counter() - start
+    formats = []
+    block = document.begin()
+    while block.isValid():
+        formats.append([
+            (r.start, r.length, r.format.foreground().color().name(),
+             r.format.fontWeight(), r.format.fontItalic(), r.format.fontUnderline())
+            for r in block.layout().formats()
+        ])
+        block = block.next()
+    return elapsed, formats, document.blockCount()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--lines", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    text = load_sample(args.files, args.lines)
+    legacy_time, legacy_formats, blocks = highlight(LegacyHighlighter, text)
+    new_time, new_formats, _ = highlight(Highlighter, text)
+
+    mismatches = [i for i, (a, b) in enumerate(zip(legacy_formats, new_formats)) if a != b]
+    print(f"blocks:        {blocks}")
+    print(f"legacy:        {legacy_time * 1e6 / blocks:8.1f} us/block  ({legacy_time:.3f} s)")
+    print(f"single-pass:   {new_time * 1e6 / blocks:8.1f} us/block  ({new_time:.3f} s)")
+    print(f"speedup:       {legacy_time / new_time:8.1f}x")
+    if mismatches:
+        print(f"format mismatches in {len(mismatches)} blocks, first at line {mismatches[0] + 1}")
+        return 1
+    print("formats:       identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# scripts/bench_input_line.py
+"""Measure the cost of a keystroke at the prompt as the scrollback grows.
+
+Fills a Terminal with lines of output, then types a command and
+backspaces over it, and prints the time per key for the input line
+model next to the old path, which read the whole document back after
+every key.
+
+    python scripts/bench_input_line.py [--lines N,N,...] [--keys N]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QTextEdit
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtCore import Qt, QEvent
+from core.terminal import Terminal
+
+
+class LegacyTerminal(Terminal):
+    """The previous prompt: keys edit the document, and the command is read back from it"""
+
+    def keyPressEvent(self, event):
+        cursor = self.textCursor()
+        if event.key() == Qt.Key.Key_Backspace:
+            if cursor.position() > self.prompt_position:
+                QTextEdit.keyPressEvent(self, event)
+                self.current_command = self.get_current_command_text()
+        else:
+            if cursor.position() < self.prompt_position:
+                cursor.setPosition(self.prompt_position)
+                self.setTextCursor(cursor)
+            QTextEdit.keyPressEvent(self, event)
+            self.current_command = self.get_current_command_text()
+
+    def get_current_command_text(self):
+        text = self.toPlainText()
+        return text[self.prompt_position:].strip()
+
+
+def keys(count):
+    command = "git log --oneline --graph --decorate"
+    events = []
+    for i in range(count // 2):
+        char = command[i % len(command)]
+        events.append(QKeyEvent(QEvent.Type.KeyPress, 0, Qt.KeyboardModifier.NoModifier, char))
+    for _ in range(count - len(events)):
+        events.append(QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Backspace, Qt.KeyboardModifier.NoModifier))
+    return events
+
+
+def run(app, terminal_class, lines, events):
+    terminal = terminal_class(scrollback_lines=sys.maxsize)
+    terminal.resize(800, 500)
+    terminal.show()
+    # No shell needed: only the prompt is timed
+    terminal.shutdown()
+    terminal.append_text("".join(f"{n:>8}  Compiling crate-{n % 211} v0.{n % 9}.{n % 17}\n" for n in range(lines)),
+                         parse_ansi=False)
+    terminal.display_prompt()
+    app.processEvents()
+    start = time.perf_counter()
+    for event in events:
+        terminal.keyPressEvent(event)
+    elapsed = time.perf_counter() - start
+    terminal.close()
+    terminal.deleteLater()
+    app.processEvents()
+    return elapsed / len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", default="1000,10000,100000")
+    parser.add_argument("--keys", type=int, default=400)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    events = keys(args.keys)
+    print(f"{'lines':>8}  {'old path':>12}  {'input line':>12}")
+    for lines in (int(value) for value in args.lines.split(",")):
+        legacy = run(app, LegacyTerminal, lines, events)
+        new = run(app, Terminal, lines, events)
+        print(f"{lines:>8}  {legacy * 1000:9.3f} ms  {new * 1000:9.3f} ms  per key")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
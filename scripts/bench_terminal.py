@@ -0,0 +1,135 @@
+# scripts/bench_terminal.py
+"""Measure terminal output throughput, batched against drawing every read.
+
+Feeds generated build-style output, with some colour codes, to a Terminal
+in pipe-sized reads, running the event loop after each read the way
+QProcess does, and prints MB/s and the longest event loop turn for each.
+
+    python scripts/bench_terminal.py [--mb N] [--read-size BYTES]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QTextCharFormat, QColor, QTextCursor
+from PyQt6.QtCore import Qt
+from core.terminal import Terminal
+
+
+class LegacyTerminal(Terminal):
+    """The previous output path: every read is decoded and drawn straight away"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setUndoRedoEnabled(True)
+
+    def feed(self, data, final=False):
+        text = data.decode("utf-8", errors="replace")
+        if text:
+            self.append_text(text, parse_ansi=True)
+
+    def append_text(self, text, color="output", parse_ansi=True):
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        format_text = QTextCharFormat()
+        format_text.setForeground(self.colors.get(color, QColor("#8be9fd")))
+
+        if parse_ansi:
+            text = text.replace('\r', '')
+            parts = text.split('\033[')
+            for part in parts:
+                if not part:
+                    continue
+                if part[0].isdigit() and 'm' in part:
+                    code_str, _, content = part.partition('m')
+                    codes = code_str.split(';')
+                    for code in codes:
+                        if code == '0':
+                            format_text = QTextCharFormat()
+                            format_text.setForeground(self.colors["output"])
+                        elif code in ['30', '31', '32', '33', '34', '35', '36', '37']:
+                            color_index = int(code) - 30
+                            colors = [Qt.GlobalColor.black, Qt.GlobalColor.red, Qt.GlobalColor.green, Qt.GlobalColor.yellow,
+                                      Qt.GlobalColor.blue, Qt.GlobalColor.magenta, Qt.GlobalColor.cyan, Qt.GlobalColor.white]
+                            format_text.setForeground(colors[color_index])
+                    if content:
+                        cursor.insertText(content, format_text)
+                else:
+                    cursor.insertText(part, format_text)
+        else:
+            cursor.insertText(text, format_text)
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
+
+
+def sample_output(size):
+    lines = []
+    n = 0
+    total = 0
+    while total < size:
+        n += 1
+        if n % 10 == 0:
+            line = f"\033[32mPASSED\033[0m tests/test_module_{n % 97}.py::test_case_{n} [{n % 100:3d}%]\n"
+        elif n % 25 == 0:
+            line = f"\033[1;33mwarning\033[0m: unused variable `x{n}` in src/lib_{n % 13}.rs:{n % 400}\n"
+        else:
+            line = f"   Compiling crate-{n % 211} v0.{n % 9}.{n % 17} (/home/user/project/crates/crate-{n % 211})\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines).encode("utf-8")
+
+
+def run(app, terminal_class, data, read_size):
+    terminal = terminal_class()
+    terminal.resize(800, 500)
+    terminal.show()
+    # No shell: its startup output would land in the timing. Output is drawn as while a command runs
+    terminal.shutdown()
+    terminal.running = True
+    app.processEvents()
+    longest = 0.0
+    start = time.perf_counter()
+    for offset in range(0, len(data), read_size):
+        turn = time.perf_counter()
+        terminal.feed(data[offset:offset + read_size])
+        app.processEvents()
+        longest = max(longest, time.perf_counter() - turn)
+    # Let the last batches be drawn
+    while terminal.pending_output or terminal.flush_timer.isActive():
+        turn = time.perf_counter()
+        app.processEvents()
+        longest = max(longest, time.perf_counter() - turn)
+    elapsed = time.perf_counter() - start
+    blocks = terminal.document().blockCount()
+    terminal.close()
+    terminal.deleteLater()
+    return elapsed, longest, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=4)
+    parser.add_argument("--read-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    data = sample_output(int(args.mb * 1024 * 1024))
+    mb = len(data) / (1024 * 1024)
+    print(f"output:        {mb:.1f} MB in {args.read_size}-byte reads")
+    results = {}
+    for label, terminal_class in (("per read", LegacyTerminal), ("batched", Terminal)):
+        elapsed, longest, blocks = run(app, terminal_class, data, args.read_size)
+        results[label] = elapsed
+        print(f"{label + ':':<14} {mb / elapsed:8.2f} MB/s  ({elapsed:.2f} s, "
+              f"longest turn {longest * 1000:.0f} ms, {blocks} lines)")
+    print(f"speedup:       {results['per read'] / results['batched']:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())